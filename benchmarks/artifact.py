@@ -0,0 +1,109 @@
+"""
+Size, write time and read cost of the result artifact (artifact.write_artifact) of large results.
+
+Each --sizes sphere patch is written as an artifact with its mesh, a planar unwrap, the four per-face metrics and the
+boundary loops. Every read case then runs in a fresh interpreter so that its peak RSS is its own: the header only
+(the baseline), the metric of 1000 consecutive faces memory-mapped (open_artifact) and through np.load (which reads the
+member whole), the mean of one per-face field both ways, every field through np.load, and the SVG/DXF regeneration
+from the artifact (export_artifact).
+
+Usage:
+    python benchmarks/artifact.py [--sizes 100000 2000000] [--directory DIR]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CASES = ('header', 'mmap_slice', 'npload_slice', 'mmap_field', 'npload_field', 'npload_all', 'export')
+
+# Consecutive faces (from the middle of the mesh) read by the slice cases
+SLICE_FACES = 1000
+
+
+def write_case(num_faces, path):
+    from benchmarks.meshes import sphere_patch
+    from flatten_surface import MeshTopology
+    from flatten_surface.artifact import write_artifact
+
+    vertices, faces = sphere_patch(num_faces)
+    topology = MeshTopology(vertices, faces)
+    unwrap = np.ascontiguousarray(vertices[:, 1:])
+    face_metrics = topology.distortion_metrics.per_face(unwrap)
+    start = time.perf_counter()
+    write_artifact(path, vertices, faces, unwrap, topology.boundary_loops, face_metrics)
+    return {'faces': len(faces), 'write_seconds': time.perf_counter() - start, 'mib': os.path.getsize(path) / 2 ** 20}
+
+
+def run_case(case, path):
+    """Run one read case in this process."""
+    from flatten_surface.artifact import open_artifact
+    from flatten_surface.profiling import peak_rss
+
+    start = time.perf_counter()
+    first = open_artifact(path).header['num_faces'] // 2
+    rows = slice(first, first + SLICE_FACES)
+    if case == 'header':
+        value = open_artifact(path).header['num_faces']
+    elif case == 'mmap_slice':
+        value = float(np.mean(open_artifact(path)['face_area'][rows]))
+    elif case == 'npload_slice':
+        with np.load(path) as data:
+            value = float(np.mean(data['face_area'][rows]))
+    elif case == 'mmap_field':
+        value = float(np.mean(open_artifact(path)['face_area']))
+    elif case == 'npload_field':
+        with np.load(path) as data:
+            value = float(np.mean(data['face_area']))
+    elif case == 'npload_all':
+        with np.load(path) as data:
+            value = sum(float(np.mean(data[name])) for name in data.files if name != 'header')
+    else:
+        from flatten_surface.artifact import export_artifact
+
+        directory = os.path.dirname(path)
+        export_artifact(path, os.path.join(directory, 'out.svg'), os.path.join(directory, 'out.dxf'))
+        value = None
+    return {'seconds': time.perf_counter() - start, 'peak_rss_mib': peak_rss() / 2 ** 20, 'value': value}
+
+
+def run_isolated(case, path):
+    process = subprocess.run([sys.executable, os.path.abspath(__file__), '--case', case, '--path', path],
+                             capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1] if process.stderr.strip()
+                           else f"exit {process.returncode}")
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=int, default=[100000, 2000000])
+    parser.add_argument('--directory', help='Directory of the artifacts (default: a temporary directory)')
+    parser.add_argument('--case', choices=CASES, help=argparse.SUPPRESS)
+    parser.add_argument('--path', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.case:
+        print(json.dumps(run_case(args.case, args.path)))
+        return
+
+    with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+        for size in args.sizes:
+            path = os.path.join(directory, f"sphere_patch_{size}.npz")
+            row = write_case(size, path)
+            print(f"{row['faces']} faces: {row['mib']:.0f} MiB written in {row['write_seconds']:.2f}s")
+            for case in CASES:
+                result = run_isolated(case, path)
+                print(f"  {case}: {result['seconds']:.3f}s, peak RSS {result['peak_rss_mib']:.0f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Compare the coarse-to-fine search (--coarse-faces) with the brute-force search on the same meshes.
+
+For every mesh both searches run with the same attempts, seed and objective. The report gives the best distortion
+of each, the gap of the coarse result, the number of full-resolution evaluations and the times. With --exhaustive
+every face of the mesh is also evaluated, and the rank of each result among all faces is reported.
+
+Usage:
+    python benchmarks/coarse_search.py [STL ...] [--coarse-faces 400] [--attempts 50] [--exhaustive]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flatten_surface import load, optimize_initial_points, MeshTopology  # noqa: E402
+from flatten_surface.flatten_surface import _evaluate_face  # noqa: E402
+
+
+def compare(path, coarse_faces, attempts, seed, objective, exhaustive):
+    vertices, faces = load(path)
+    options = dict(verbose=False, seed=seed, objective=objective)
+    row = {'mesh': os.path.basename(path), 'faces': len(faces)}
+
+    start = time.perf_counter()
+    brute = optimize_initial_points(vertices, faces, attempts, **options)
+    row['brute_seconds'] = time.perf_counter() - start
+    start = time.perf_counter()
+    coarse = optimize_initial_points(vertices, faces, attempts, coarse_faces=coarse_faces, **options)
+    row['coarse_seconds'] = time.perf_counter() - start
+
+    row['brute_distortion'] = brute['best_distortion']
+    row['coarse_distortion'] = coarse['best_distortion']
+    row['gap_percent'] = (coarse['best_distortion'] - brute['best_distortion']) / brute['best_distortion'] * 100
+    row['brute_evaluations'] = len(brute['optimization_history'])
+    row['coarse_evaluations'] = len(coarse['optimization_history'])
+    if exhaustive:
+        topology = MeshTopology(vertices, faces)
+        distortions = np.array([_evaluate_face(topology, face_id, objective)[0] for face_id in range(len(faces))])
+        row['global_best_distortion'] = float(distortions.min())
+        row['brute_rank_percent'] = float(np.mean(distortions < brute['best_distortion']) * 100)
+        row['coarse_rank_percent'] = float(np.mean(distortions < coarse['best_distortion']) * 100)
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the coarse-to-fine and brute-force optimizations")
+    parser.add_argument('meshes', nargs='*', help='STL files (default: data/*.STL)')
+    parser.add_argument('--coarse-faces', type=int, default=400, help='Proxy size (default: 400)')
+    parser.add_argument('--attempts', type=int, default=50, help='Optimization attempts (default: 50)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--objective', default='area')
+    parser.add_argument('--exhaustive', action='store_true', help='Also evaluate every face (small meshes only)')
+    parser.add_argument('--output', metavar='PATH', help='Write the rows as JSON')
+    args = parser.parse_args()
+
+    paths = args.meshes or sorted(glob.glob(os.path.join(ROOT, 'data', '*.STL')))
+    rows = []
+    for path in paths:
+        row = compare(path, args.coarse_faces, args.attempts, args.seed, args.objective, args.exhaustive)
+        rows.append(row)
+        line = (f"{row['mesh']}: {row['faces']} faces, brute {row['brute_distortion']:.4f} "
+                f"({row['brute_evaluations']} evaluations, {row['brute_seconds']:.2f}s), coarse "
+                f"{row['coarse_distortion']:.4f} ({row['coarse_evaluations']} evaluations, "
+                f"{row['coarse_seconds']:.2f}s), gap {row['gap_percent']:+.1f}%")
+        if args.exhaustive:
+            line += (f", global best {row['global_best_distortion']:.4f}, faces better than brute "
+                     f"{row['brute_rank_percent']:.1f}% / coarse {row['coarse_rank_percent']:.1f}%")
+        print(line)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Import-time regression check of the flatten_surface package.
+
+Importing the package (and the pure compute API) must stay cheap: the heavy dependencies are only imported when
+first used. Each measurement runs in a fresh interpreter, the fastest of --repeat runs is reported.
+
+Usage:
+    python benchmarks/import_time.py [--budget-ms 400] [--repeat 5]
+
+Exits with status 1 if a heavy module is imported eagerly or the import takes longer than the budget.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules only needed by optional stages: solver fallback, GUI, display and exporters
+HEAVY_MODULES = ['igl', 'scipy', 'trimesh', 'svgwrite', 'ezdxf', 'matplotlib', 'tkinter']
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from flatten_surface import flatten, load, compute_deformation, MeshTopology
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed, 'modules': [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def measure(repeat):
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', PROBE], env=env, cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return min(run['seconds'] for run in runs), sorted({m for run in runs for m in run['modules']})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import time of the flatten_surface package")
+    parser.add_argument('--budget-ms', type=float, default=400, help='Maximum import time (default: 400 ms)')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of fresh interpreters (default: 5)')
+    args = parser.parse_args()
+
+    seconds, modules = measure(args.repeat)
+    print(f"import flatten_surface: {seconds * 1000:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    failed = False
+    if modules:
+        print(f"FAIL: heavy modules imported eagerly: {', '.join(modules)}")
+        failed = True
+    if seconds * 1000 > args.budget_ms:
+        print("FAIL: import time over budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Latency and accuracy of the incremental re-flatten (IncrementalFlattener) against a full flatten of each edit.
+
+Every mesh is edited --edits times, each edit a smooth bump of the vertices around a random center. Both the 'warm'
+and the 'local' methods follow the same edits, and each result is compared with a full flatten of the edited mesh
+from the same face. The report gives the update times, the conjugate gradient iterations, the largest UV difference
+relative to the size of the unwrap and the overall distortion.
+
+Usage:
+    python benchmarks/incremental.py [STL ...] [--sizes 100000] [--edits 4] [--radius 0.05] [--seed 0]
+
+Without meshes, data/*.STL are used. --sizes adds synthetic sphere patches of these face counts.
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flatten_surface import load, flatten  # noqa: E402
+from flatten_surface.incremental import IncrementalFlattener  # noqa: E402
+
+
+def bump(vertices, rng, radius):
+    """Ids and new positions of the vertices within radius (relative to the mesh size) of a random vertex."""
+    size = np.ptp(vertices, axis=0).max()
+    distances = np.linalg.norm(vertices - vertices[rng.integers(len(vertices))], axis=1)
+    ids = np.flatnonzero(distances < radius * size)
+    height = 1 - distances[ids] / (radius * size)
+    return ids, vertices[ids] + height[:, None] * np.array([0, 0, 0.2 * radius * size])
+
+
+def compare(path, edits, radius, seed):
+    vertices, faces = load(path)
+    print(f"{os.path.basename(path)} ({len(faces)} faces)")
+    start = time.perf_counter()
+    result = flatten(vertices, faces, face_id=0, verbose=False)
+    print(f"  full flatten {time.perf_counter() - start:.3f}s")
+    flatteners = {method: IncrementalFlattener(result) for method in ('warm', 'local')}
+    rng = np.random.default_rng(seed)
+    for edit in range(edits):
+        ids, positions = bump(vertices, rng, radius)
+        vertices = vertices.copy()
+        vertices[ids] = positions
+        updates = {method: flattener.update(changed=ids, positions=positions, method=method)
+                   for method, flattener in flatteners.items()}
+        start = time.perf_counter()
+        reference = flatten(vertices, faces, face_id=0, verbose=False)
+        seconds = time.perf_counter() - start
+        size = np.ptp(reference['unwrap'], axis=0).max()
+        print(f"  edit {edit} ({len(ids)} vertices moved): full {seconds * 1000:.1f}ms, "
+              f"distortion {reference['distortion']:.4f}")
+        for method, update in updates.items():
+            error = np.abs(update['unwrap'] - reference['unwrap']).max() / size
+            print(f"    {method}: {update['seconds'] * 1000:.1f}ms ({update['method']}, "
+                  f"{update['iterations']} iterations), max UV error {error:.1e}, "
+                  f"distortion {update['distortion']:.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare incremental re-flattening with full flattening")
+    parser.add_argument('meshes', nargs='*', help='STL files (default: data/*.STL)')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[], help='Also run sphere patches of these face counts')
+    parser.add_argument('--edits', type=int, default=4, help='Successive edits per mesh')
+    parser.add_argument('--radius', type=float, default=0.05, help='Radius of each edit relative to the mesh size')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    paths = args.meshes or sorted(glob.glob(os.path.join(ROOT, 'data', '*.STL')))
+    with tempfile.TemporaryDirectory() as directory:
+        if args.sizes:
+            from benchmarks.meshes import sphere_patch, write_stl
+
+            for size in args.sizes:
+                paths.append(os.path.join(directory, f"sphere_patch_{size}.stl"))
+                write_stl(paths[-1], *sphere_patch(size))
+        for path in paths:
+            compare(path, args.edits, args.radius, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
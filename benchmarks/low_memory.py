@@ -0,0 +1,112 @@
+"""
+Accuracy and memory of the low-memory mode (float32 vertices, int32 faces) against the default float64 pipeline.
+
+Every mesh runs in both modes, each in a fresh interpreter so that its peak RSS is its own: load, unfold from
+--face-id, area/length/angle/conformal distortion, SVG and DXF export. The report gives the peak RSS and time of
+each mode, the largest UV difference relative to the size of the unwrap and the difference of each distortion
+metric (in percentage points).
+
+Usage:
+    python benchmarks/low_memory.py [STL ...] [--sizes 1000000] [--face-id 0]
+
+Without meshes, data/*.STL are used. --sizes adds synthetic sphere patches of these face counts.
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def run_case(path, low_memory, face_id, directory):
+    """Run the pipeline on one mesh in this process, the unwrap is saved in directory."""
+    from flatten_surface import load, MeshTopology
+    from flatten_surface.igl_api import init_unfold, unfold
+    from flatten_surface.import_export import export_svg, export_dxf
+    from flatten_surface.profiling import peak_rss
+
+    start = time.perf_counter()
+    vertices, faces = load(path, low_memory=low_memory)
+    topology = MeshTopology(vertices, faces)
+    init_points_ids, init_points_pos, _ = init_unfold(vertices, faces, face_id, topology)
+    unwrap = unfold(vertices, faces, init_points_ids, init_points_pos, topology=topology)
+    metrics = topology.distortion_metrics.overall(unwrap)
+    export_svg(unwrap, None, os.path.join(directory, 'out.svg'), topology)
+    export_dxf(unwrap, None, os.path.join(directory, 'out.dxf'), topology)
+    seconds = time.perf_counter() - start
+    np.save(os.path.join(directory, 'unwrap.npy'), unwrap)
+    return {'metrics': metrics, 'seconds': seconds, 'peak_rss_mib': peak_rss() / 2 ** 20,
+            'dtypes': [str(vertices.dtype), str(faces.dtype), str(unwrap.dtype)]}
+
+
+def run_isolated(path, low_memory, face_id, directory):
+    command = [sys.executable, os.path.abspath(__file__), path, '--face-id', str(face_id), '--case-dir', directory]
+    if low_memory:
+        command.append('--low-memory')
+    process = subprocess.run(command, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1] if process.stderr.strip()
+                           else f"exit {process.returncode}")
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def compare(path, face_id):
+    row = {'mesh': os.path.basename(path)}
+    unwraps = {}
+    for mode, low_memory in (('default', False), ('low_memory', True)):
+        with tempfile.TemporaryDirectory() as directory:
+            row[mode] = run_isolated(path, low_memory, face_id, directory)
+            unwraps[mode] = np.load(os.path.join(directory, 'unwrap.npy')).astype(np.float64)
+    size = np.ptp(unwraps['default'], axis=0).max()
+    row['uv_error'] = float(np.abs(unwraps['low_memory'] - unwraps['default']).max() / size)
+    row['metric_errors'] = {name: row['low_memory']['metrics'][name] - value
+                            for name, value in row['default']['metrics'].items()}
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the low-memory mode with the default pipeline")
+    parser.add_argument('meshes', nargs='*', help='STL files (default: data/*.STL)')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[], help='Also run sphere patches of these face counts')
+    parser.add_argument('--face-id', type=int, default=0)
+    parser.add_argument('--low-memory', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--case-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case_dir:
+        # Worker mode: one mesh in one mode, result as the last line of stdout
+        print(json.dumps(run_case(args.meshes[0], args.low_memory, args.face_id, args.case_dir)))
+        return 0
+
+    paths = args.meshes or sorted(glob.glob(os.path.join(ROOT, 'data', '*.STL')))
+    with tempfile.TemporaryDirectory() as directory:
+        if args.sizes:
+            from benchmarks.meshes import sphere_patch, write_stl
+
+            for size in args.sizes:
+                paths.append(os.path.join(directory, f"sphere_patch_{size}.stl"))
+                write_stl(paths[-1], *sphere_patch(size))
+        for path in paths:
+            try:
+                row = compare(path, args.face_id)
+            except RuntimeError as e:
+                print(f"{os.path.basename(path)}: FAILED {e}")
+                continue
+            default, low = row['default'], row['low_memory']
+            print(f"{row['mesh']}: peak RSS {default['peak_rss_mib']:.0f} -> {low['peak_rss_mib']:.0f} MiB, "
+                  f"{default['seconds']:.2f}s -> {low['seconds']:.2f}s, max UV error {row['uv_error']:.1e} of the size")
+            print("  distortion " + ", ".join(f"{name} {default['metrics'][name]:.4f}% ({error:+.1e})"
+                                              for name, error in row['metric_errors'].items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Parametric surfaces of any size for the benchmarks, as (vertices, faces) grids of about the requested face count.
+"""
+import numpy as np
+
+from flatten_surface.import_export import STL_RECORD, STL_HEADER_SIZE
+
+
+def _grid(num_faces):
+    """(s, t) parameters in [0, 1]² and faces of a regular grid with about num_faces triangles."""
+    n = max(2, int(round(np.sqrt(num_faces / 2))) + 1)
+    s, t = np.meshgrid(np.linspace(0, 1, n), np.linspace(0, 1, n), indexing='ij')
+    i, j = np.meshgrid(np.arange(n - 1), np.arange(n - 1), indexing='ij')
+    a = (i * n + j).ravel()
+    b, c = a + n, a + 1
+    faces = np.concatenate([np.stack([a, b, c], axis=1), np.stack([c, b, b + 1], axis=1)])
+    return s.ravel(), t.ravel(), faces.astype(np.int64)
+
+
+def sphere_patch(num_faces, radius=50.0):
+    """Eighth of a sphere like data/eighth_of_a_sphere.STL, from a cube face grid (no pole)."""
+    s, t, faces = _grid(num_faces)
+    points = np.stack([np.ones_like(s), s, t], axis=1)
+    return radius * points / np.linalg.norm(points, axis=1)[:, None], faces
+
+
+def cylinder(num_faces, radius=20.0, height=60.0):
+    """Half cylinder, developable with a straight seam."""
+    s, t, faces = _grid(num_faces)
+    angle = np.pi * s
+    return np.stack([radius * np.cos(angle), radius * np.sin(angle), height * t], axis=1), faces
+
+
+def saddle(num_faces, size=50.0, depth=10.0):
+    """Hyperbolic paraboloid, negative curvature everywhere."""
+    s, t, faces = _grid(num_faces)
+    x, y = size * (s - 0.5), size * (t - 0.5)
+    return np.stack([x, y, depth * (x ** 2 - y ** 2) / (size / 2) ** 2], axis=1), faces
+
+
+def developable_strip(num_faces, length=200.0, width=30.0, amplitude=20.0):
+    """Wavy strip bent around one direction, flattens without distortion."""
+    s, t, faces = _grid(num_faces)
+    x = length * s
+    return np.stack([x, width * t, amplitude * np.sin(4 * np.pi * s)], axis=1), faces
+
+
+SURFACES = {
+    'sphere_patch': sphere_patch,
+    'cylinder': cylinder,
+    'saddle': saddle,
+    'developable_strip': developable_strip,
+}
+
+
+def write_stl(path, vertices, faces):
+    """Write a binary STL file."""
+    records = np.zeros(len(faces), dtype=STL_RECORD)
+    corners = vertices[faces]
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+    records['normal'] = normals / np.where(lengths > 0, lengths, 1)[:, None]
+    records['vertices'] = corners
+    with open(path, 'wb') as f:
+        f.write(b'flatten_surface benchmark'.ljust(STL_HEADER_SIZE - 4, b' '))
+        f.write(np.uint32(len(faces)).tobytes())
+        records.tofile(f)
@@ -0,0 +1,51 @@
+"""
+Runtime and utilization of the sheet nesting (nesting.nest) for growing numbers of parts.
+
+Parts are random lobed outlines of 200 to 2000 points and 20 to 120 mm, as flattened panels of scans look after
+export. Each part count is nested with every --rotations value, the report gives the runtime, the number of outline
+collision tests, the roll length used and the utilization.
+
+Usage:
+    python benchmarks/nesting.py [--parts 50 100 300] [--width 1500] [--rotations 1 4] [--seed 0]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flatten_surface.nesting import nest  # noqa: E402
+
+
+def random_part(rng, name):
+    num_points = int(rng.integers(200, 2000))
+    angles = np.sort(rng.uniform(0, 2 * np.pi, num_points))
+    size = rng.uniform(20, 120)
+    radii = size * (0.6 + 0.4 * np.abs(np.sin(rng.integers(1, 4) * angles + rng.uniform(0, 2 * np.pi))))
+    loop = np.column_stack([radii * np.cos(angles) * rng.uniform(0.5, 1.5), radii * np.sin(angles)])
+    return {'name': name, 'loops': [loop]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--parts', type=int, nargs='+', default=[50, 100, 300])
+    parser.add_argument('--width', type=float, default=1500)
+    parser.add_argument('--rotations', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for num_parts in args.parts:
+        rng = np.random.default_rng(args.seed)
+        parts = [random_part(rng, f"part_{i}") for i in range(num_parts)]
+        for rotations in args.rotations:
+            result = nest(parts, args.width, rotations=rotations)
+            print(f"{num_parts} parts, {rotations} rotations: {result['seconds']:.2f}s, "
+                  f"{result['collision_tests']} collision tests, length {result['length']:.0f} mm, "
+                  f"utilization {100 * result['utilization']:.1f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+"""
+Benchmark every stage of the pipeline on synthetic surfaces from 1k to 2M faces.
+
+Each (surface, size) case runs in a fresh interpreter so its peak RSS is its own and a case killed for lack of
+memory is reported as failed without stopping the others. Within a case every stage is timed on its own, with the
+peak resident memory sampled during the stage (native solver buffers included). Modules are imported before the
+timings, import time is checked by benchmarks/import_time.py.
+
+Usage:
+    python benchmarks/pipeline.py [--surfaces sphere_patch saddle] [--sizes 1000 10000] [--output results.json]
+                                  [--baseline baseline.json] [--tolerance 0.25]
+
+With --baseline, stages slower than the baseline by more than the tolerance (and by more than --min-seconds) are
+listed and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from benchmarks.meshes import SURFACES, write_stl  # noqa: E402
+from flatten_surface.profiling import current_rss, peak_rss  # noqa: E402
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000, 2000000]
+
+
+class StageTimer:
+    """Time stages one after the other and record the peak resident memory of each, sampled by a thread."""
+
+    def __init__(self, interval=0.005):
+        self.stages = {}
+        self.interval = interval
+
+    def run(self, name, function, *args, **kwargs):
+        peak = [current_rss()]
+        done = threading.Event()
+
+        def sample():
+            while not done.wait(self.interval):
+                peak[0] = max(peak[0], current_rss())
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            done.set()
+            sampler.join()
+        peak[0] = max(peak[0], current_rss())
+        self.stages[name] = {'seconds': seconds, 'peak_rss_mib': peak[0] / 2 ** 20}
+        return result
+
+
+def run_case(surface, size, attempts, directory):
+    """Run every stage on one surface, in this process."""
+    from flatten_surface import load, optimize_initial_points, MeshTopology
+    from flatten_surface.igl_api import get_all_bounds, init_unfold, unfold
+    from flatten_surface.import_export import export_svg, export_dxf
+    from flatten_surface.score import compute_deformation
+    # Lazily imported dependencies, imported here so that stages are timed without them
+    import igl, scipy.sparse.linalg, scipy.spatial  # noqa: E401, F401
+    from flatten_surface import lscm, metrics  # noqa: F401
+
+    vertices, faces = SURFACES[surface](size)
+    path = os.path.join(directory, f"{surface}_{size}.stl")
+    write_stl(path, vertices, faces)
+    del vertices, faces
+
+    timer = StageTimer()
+    vertices, faces = timer.run('load', load, path)
+    topology = MeshTopology(vertices, faces)
+    bounds = timer.run('get_all_bounds', get_all_bounds, faces, topology)
+    ids, positions, _ = timer.run('init_unfold', init_unfold, vertices, faces, 0, topology)
+    # The first solve factorizes the LSCM system, the warm one reuses the factorization
+    unwrap = timer.run('unfold', unfold, vertices, faces, ids, positions, topology=topology)
+    timer.run('unfold_warm', unfold, vertices, faces, ids, positions, topology=topology)
+    timer.run('compute_deformation', compute_deformation, vertices, faces, unwrap, topology)
+    timer.run('optimize_initial_points', optimize_initial_points, vertices, faces, attempts, verbose=False, seed=0,
+              topology=topology)
+    timer.run('export_svg', export_svg, unwrap, bounds, os.path.join(directory, 'out.svg'), topology)
+    timer.run('export_dxf', export_dxf, unwrap, bounds, os.path.join(directory, 'out.dxf'), topology)
+    return {
+        'surface': surface,
+        'faces': len(faces),
+        'vertices': len(vertices),
+        'status': 'ok',
+        'stages': timer.stages,
+        'max_rss_mib': peak_rss() / 2 ** 20,
+    }
+
+
+def run_isolated(surface, size, attempts, timeout):
+    """Run a case in a fresh interpreter, returns its result or a failed entry."""
+    with tempfile.TemporaryDirectory() as directory:
+        command = [sys.executable, os.path.abspath(__file__), '--case', surface, str(size),
+                   '--attempts', str(attempts), '--case-dir', directory]
+        try:
+            process = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return {'surface': surface, 'size': size, 'status': 'error', 'error': f"timeout after {timeout}s"}
+    if process.returncode != 0:
+        error = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else f"exit {process.returncode}"
+        if process.returncode < 0 or process.returncode == 137:
+            error = f"killed (exit {process.returncode}), most likely out of memory"
+        return {'surface': surface, 'size': size, 'status': 'error', 'error': error}
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, tolerance, min_seconds):
+    """Stages slower than in the baseline, as (surface, faces, stage, baseline seconds, seconds)."""
+    reference = {(case['surface'], case['faces'], stage): timing['seconds']
+                 for case in baseline['cases'] if case['status'] == 'ok'
+                 for stage, timing in case['stages'].items()}
+    regressions = []
+    for case in results['cases']:
+        if case['status'] != 'ok':
+            continue
+        for stage, timing in case['stages'].items():
+            before = reference.get((case['surface'], case['faces'], stage))
+            if before is None:
+                continue
+            seconds = timing['seconds']
+            if seconds > before * (1 + tolerance) and seconds - before > min_seconds:
+                regressions.append((case['surface'], case['faces'], stage, before, seconds))
+    return regressions
+
+
+def print_case(case):
+    if case['status'] != 'ok':
+        print(f"{case['surface']} ({case['size']} faces): FAILED {case['error']}")
+        return
+    print(f"{case['surface']} ({case['faces']} faces, {case['vertices']} vertices, "
+          f"max RSS {case['max_rss_mib']:.0f} MiB)")
+    for stage, timing in case['stages'].items():
+        print(f"  {stage:<24}{timing['seconds']:>10.4f}s {timing['peak_rss_mib']:>10.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic surfaces")
+    parser.add_argument('--surfaces', nargs='+', choices=sorted(SURFACES), default=sorted(SURFACES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help='Face counts (default: 1k to 2M)')
+    parser.add_argument('--attempts', type=int, default=8, help='Attempts of the optimization stage (default: 8)')
+    parser.add_argument('--timeout', type=float, default=3600, help='Time limit of each case in seconds')
+    parser.add_argument('--output', metavar='PATH', help='Write the results as JSON (usable as a baseline)')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare the stage timings with a previous output')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown ratio (default: 0.25)')
+    parser.add_argument('--min-seconds', type=float, default=0.05,
+                        help='Slowdowns smaller than this are ignored as noise (default: 0.05)')
+    parser.add_argument('--case', nargs=2, metavar=('SURFACE', 'SIZE'), help=argparse.SUPPRESS)
+    parser.add_argument('--case-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        # Worker mode: one case, result as the last line of stdout
+        print(json.dumps(run_case(args.case[0], int(args.case[1]), args.attempts, args.case_dir)))
+        return 0
+
+    results = {
+        'version': RESULTS_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'cpu_count': os.cpu_count(),
+        'attempts': args.attempts,
+        'cases': [],
+    }
+    for size in sorted(args.sizes):
+        for surface in args.surfaces:
+            case = run_isolated(surface, size, args.attempts, args.timeout)
+            results['cases'].append(case)
+            print_case(case)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_seconds)
+        for surface, faces, stage, before, seconds in regressions:
+            print(f"REGRESSION {surface} ({faces} faces) {stage}: {before:.4f}s -> {seconds:.4f}s "
+                  f"({(seconds / before - 1) * 100:+.0f}%)")
+        if regressions:
+            return 1
+        print(f"No stage slower than the baseline by more than {args.tolerance * 100:.0f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Point reduction, deviation and export time of the outline simplification (simplify.simplify_outlines).
+
+Each outline is a scan-like closed loop: a rounded rectangle with a circular hole outline and a wavy side, sampled
+with --points points and radial noise of --noise mm. Every tolerance is run with straight segments only and with arcs,
+the report gives the kept points, the arcs, the largest deviation from the original points, the simplification time
+and the SVG/DXF export time and size against the unsimplified export.
+
+Usage:
+    python benchmarks/simplify.py [--points 50000 200000] [--tolerances 0.01 0.05 0.1] [--noise 0.002]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flatten_surface.import_export import export_outlines  # noqa: E402
+from flatten_surface.simplify import simplify_outlines  # noqa: E402
+
+
+def scan_outline(num_points, noise, rng):
+    """Closed loop of a 200 by 120 mm rounded rectangle (15 mm corners) with a wavy top side, in mm."""
+    straight = np.array([170, 90, 170, 90], dtype=float)
+    corner = 15 * np.pi / 2
+    perimeter = 2 * straight.sum() / 2 + 4 * corner
+    s = np.linspace(0, perimeter, num_points, endpoint=False)
+    points = np.empty((num_points, 2))
+    position = 0.0
+    centers = [(185, 15), (185, 105), (15, 105), (15, 15)]
+    starts = [(15, 0), (200, 15), (185, 120), (0, 105)]
+    directions = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+    for side in range(4):
+        length = straight[side]
+        on_side = (s >= position) & (s < position + length)
+        t = s[on_side] - position
+        points[on_side] = np.array(starts[side]) + t[:, None] * np.array(directions[side])
+        if side == 2:
+            points[on_side, 1] += 2 * np.sin(t / 170 * 6 * np.pi)
+        position += length
+        on_corner = (s >= position) & (s < position + corner)
+        angle = (s[on_corner] - position) / 15 + (side - 1) * np.pi / 2
+        points[on_corner] = np.array(centers[side]) + 15 * np.column_stack([np.cos(angle), np.sin(angle)])
+        position += corner
+    return points + rng.normal(scale=noise, size=points.shape)
+
+
+def export_seconds(unwrap, bounds, bulges, directory):
+    path_svg, path_dxf = os.path.join(directory, 'outline.svg'), os.path.join(directory, 'outline.dxf')
+    start = time.perf_counter()
+    export_outlines(unwrap, bounds, path_svg, path_dxf, bulges=bulges)
+    return time.perf_counter() - start, (os.path.getsize(path_svg) + os.path.getsize(path_dxf)) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--points', type=int, nargs='+', default=[50000, 200000])
+    parser.add_argument('--tolerances', type=float, nargs='+', default=[0.01, 0.05, 0.1])
+    parser.add_argument('--noise', type=float, default=0.002)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        for num_points in args.points:
+            unwrap = scan_outline(num_points, args.noise, rng)
+            bounds = [np.arange(num_points)]
+            seconds, size = export_seconds(unwrap, bounds, None, directory)
+            print(f"{num_points} points: export {seconds:.3f}s, {size:.1f} MB")
+            for tolerance in args.tolerances:
+                for arcs in (False, True):
+                    start = time.perf_counter()
+                    simplified, bulges, stats = simplify_outlines(unwrap, bounds, tolerance, arcs)
+                    simplify_seconds = time.perf_counter() - start
+                    seconds, size = export_seconds(unwrap, simplified, bulges, directory)
+                    print(f"  tolerance {tolerance} mm{' with arcs' if arcs else ''}: {stats['points_after']} points "
+                          f"({stats['reduction_percent']:.2f}% fewer, {stats['arcs']} arcs), "
+                          f"max deviation {stats['max_deviation']:.4f} mm, simplify {simplify_seconds:.3f}s, "
+                          f"export {seconds:.3f}s, {size:.3f} MB")
+
+
+if __name__ == '__main__':
+    main()
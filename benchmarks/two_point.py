@@ -0,0 +1,119 @@
+"""
+Compare two-point pins (flatten(pins='two-point')) with the brute-force search of the pinned face.
+
+For every mesh the brute-force search (optimize_initial_points) evaluates --attempts faces (default: every face), the
+default two-point pins run one solve followed by the closed-form scale normalization, and the two-point search
+(optimize_initial_points with two-point pins) evaluates --attempts anchor vertices (default: every vertex). All start
+from a new topology, so all times include the LSCM factorization. The report gives the area, length and angle
+distortion (RMS over faces, %) of the best face, of the best face once scaled the same way, of the default two-point
+unwrap and of the best anchor, with the runtimes. The distortion of --pairs random pairs of boundary pins, each
+scaled, measures how much the result depends on the pinned vertices: it does not depend on where they are placed (a
+similarity), but it does on which ones they are when the mesh is not developable.
+
+Usage:
+    python benchmarks/two_point.py [STL ...] [--attempts 0] [--pairs 20] [--sphere-faces 100000] [--scale area]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flatten_surface import load, flatten, optimize_initial_points, MeshTopology  # noqa: E402
+from flatten_surface.igl_api import init_unfold, normalize_scale, unfold  # noqa: E402
+from benchmarks.meshes import sphere_patch  # noqa: E402
+
+NAMES = ('area', 'length', 'angle')
+
+
+def compare(name, vertices, faces, attempts, pairs, scale, seed):
+    row = {'mesh': name, 'faces': len(faces)}
+    anchor_attempts = attempts or len(vertices)
+    attempts = attempts or len(faces)
+
+    start = time.perf_counter()
+    brute = optimize_initial_points(vertices, faces, attempts, verbose=False, seed=seed)
+    row['brute_seconds'] = time.perf_counter() - start
+    row['brute_evaluations'] = len(brute['optimization_history'])
+    topology = MeshTopology(vertices, faces)
+    ids, pos, _ = init_unfold(vertices, faces, brute['best_face_id'], topology)
+    unwrap = unfold(vertices, faces, ids, pos, topology=topology)
+    row['brute'] = topology.distortion_metrics.overall(unwrap, NAMES)
+    row['brute_scaled'] = topology.distortion_metrics.overall(
+        normalize_scale(vertices, faces, unwrap, scale, topology)[0], NAMES)
+
+    start = time.perf_counter()
+    result = flatten(vertices, faces, topology=MeshTopology(vertices, faces), verbose=False, pins='two-point',
+                     scale=scale)
+    row['two_point_seconds'] = time.perf_counter() - start
+    row['two_point'] = topology.distortion_metrics.overall(result['unwrap'], NAMES)
+    row['scale_factor'] = result['scale_factor']
+
+    start = time.perf_counter()
+    result = flatten(vertices, faces, optimize=True, max_attempts=anchor_attempts, topology=MeshTopology(vertices, faces),
+                     verbose=False, pins='two-point', scale=scale, seed=seed)
+    row['search_seconds'] = time.perf_counter() - start
+    row['search_evaluations'] = len(result['optimization_results']['optimization_history'])
+    row['search'] = topology.distortion_metrics.overall(result['unwrap'], NAMES)
+
+    # Random boundary pins, placed anywhere: only the choice of the vertices can change the scaled distortion
+    rng = np.random.default_rng(seed)
+    boundary = np.unique(np.concatenate(topology.boundary_loops))
+    distortions = []
+    for _ in range(pairs):
+        ids = rng.choice(boundary, 2, replace=False)
+        unwrap = unfold(vertices, faces, ids, rng.uniform(-100, 100, (2, 2)), topology=topology)
+        distortions.append(topology.distortion_metrics.overall(
+            normalize_scale(vertices, faces, unwrap, scale, topology)[0], ('area',))['area'])
+    row['pairs_area'] = [float(min(distortions)), float(max(distortions))] if distortions else None
+    return row
+
+
+def metrics_text(metrics):
+    return "/".join(f"{metrics[name]:.4f}" for name in NAMES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('meshes', nargs='*', help='STL files (default: data/*.STL)')
+    parser.add_argument('--attempts', type=int, default=0,
+                        help='Attempts of both searches (default: 0, every face and every anchor vertex)')
+    parser.add_argument('--pairs', type=int, default=20, help='Random pin pairs (default: 20)')
+    parser.add_argument('--sphere-faces', type=int, nargs='*', default=[],
+                        help='Also compare on synthetic sphere patches of these sizes')
+    parser.add_argument('--scale', default='area', help='Scale normalization (default: area)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', metavar='PATH', help='Write the rows as JSON')
+    args = parser.parse_args()
+
+    cases = [(os.path.basename(path), path) for path in
+             (args.meshes or sorted(glob.glob(os.path.join(ROOT, 'data', '*.STL'))))]
+    cases += [(f"sphere_patch_{size}", size) for size in args.sphere_faces]
+    rows = []
+    print(f"Distortion area/length/angle (RMS %), {args.scale} scale")
+    for name, source in cases:
+        vertices, faces = load(source) if isinstance(source, str) else sphere_patch(source)
+        row = compare(name, vertices, faces, args.attempts, args.pairs, args.scale, args.seed)
+        rows.append(row)
+        pairs = (f", {args.pairs} random pin pairs {row['pairs_area'][0]:.4f} to {row['pairs_area'][1]:.4f}"
+                 if row['pairs_area'] else "")
+        print(f"{name}: {row['faces']} faces\n"
+              f"  brute force {metrics_text(row['brute'])} (scaled {metrics_text(row['brute_scaled'])}), "
+              f"{row['brute_evaluations']} evaluations in {row['brute_seconds']:.2f}s\n"
+              f"  two-point   {metrics_text(row['two_point'])}, scale {row['scale_factor']:.4f}, "
+              f"{row['two_point_seconds']:.3f}s{pairs}\n"
+              f"  two-point search {metrics_text(row['search'])}, {row['search_evaluations']} evaluations in "
+              f"{row['search_seconds']:.2f}s")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,8 @@
-from .flatten_surface import main as flatten_surface
+# Importing the package only loads numpy: igl, scipy, the exporters and the GUI are imported when first used
+from .flatten_surface import main as flatten_surface, flatten, optimize_initial_points
+from .import_export import load
+from .score import compute_deformation, compute_overall_distortion
+from .topology import MeshTopology
+from .incremental import IncrementalFlattener, reflatten
+from .simplify import simplify_outlines
+from .artifact import open_artifact, export_artifact
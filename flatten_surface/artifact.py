@@ -0,0 +1,262 @@
+import json
+import os
+import struct
+import tempfile
+import time
+
+import numpy as np
+
+from .render import DEFAULT_DPI
+
+
+ARTIFACT_FORMAT = 'flatten_surface.result'
+ARTIFACT_VERSION = 1
+
+# Zip local file header: signature, versions, flags, compression, times, crc, sizes, name and extra field lengths
+_LOCAL_HEADER = struct.Struct('<4s5H3I2H')
+
+
+def _to_builtin(value):
+    """JSON-serializable copy of value: numpy scalars and arrays to Python ones, non-finite floats to None."""
+    if isinstance(value, dict):
+        return {str(key): _to_builtin(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_to_builtin(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+def write_artifact(path, vertices, faces, unwrap, bounds, face_metrics=None, layers=None, optimization_results=None,
+                   info=None):
+    """
+    Write a flatten result to a versioned binary artifact.
+
+    The artifact is an uncompressed .npz (readable by np.load): one .npy member per field and a JSON 'header' member
+    with the format, version, field shapes and metadata. Fields: 'vertices', 'faces', 'unwrap', 'face_<metric>' for
+    each per-face metric, the boundary loops as 'bound_vertices' (all loops concatenated) and 'bound_offsets' (start
+    of each loop, then the total length), and the optimization history as 'history_faces' and 'history_distortions'.
+    The file is written to a temporary file then renamed, a reader never sees a partial artifact.
+
+    Args:
+        path: Output .npz path
+        vertices: 3D vertices
+        faces: Faces
+        unwrap: UVs of the vertices
+        bounds: Boundary loops (vertex ids) of the exported outlines
+        face_metrics: {metric: per-face distortion in percent} (see metrics.DistortionMetrics.per_face)
+        layers: Layer name of each loop (charts)
+        optimization_results: Result of optimize_initial_points, its history and summary are stored
+        info: JSON-serializable metadata stored in the header (face used, distortion, source file, ...)
+
+    Returns:
+        str: path
+    """
+    bounds = [np.asarray(bound, dtype=np.int64) for bound in bounds]
+    lengths = np.array([len(bound) for bound in bounds], dtype=np.int64)
+    arrays = {
+        'vertices': np.asarray(vertices),
+        'faces': np.asarray(faces),
+        'unwrap': np.asarray(unwrap),
+        'bound_vertices': np.concatenate(bounds) if bounds else np.empty(0, dtype=np.int64),
+        'bound_offsets': np.concatenate([[0], np.cumsum(lengths)]),
+    }
+    for name, values in (face_metrics or {}).items():
+        arrays[f'face_{name}'] = np.asarray(values)
+    optimization = None
+    if optimization_results is not None:
+        history = optimization_results['optimization_history']
+        arrays['history_faces'] = np.array([face_id for face_id, _ in history], dtype=np.int64)
+        arrays['history_distortions'] = np.array([distortion for _, distortion in history], dtype=np.float64)
+        # Timings describe the run, not the result
+        optimization = _to_builtin({key: value for key, value in optimization_results.items()
+                                    if key not in ('optimization_history', 'candidate_timings', 'coarse')})
+    header = {
+        'format': ARTIFACT_FORMAT,
+        'version': ARTIFACT_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'units': 'mm',
+        'num_vertices': len(arrays['vertices']),
+        'num_faces': len(arrays['faces']),
+        'num_loops': len(bounds),
+        'fields': {name: {'dtype': array.dtype.str, 'shape': list(array.shape)} for name, array in arrays.items()},
+        'layers': list(layers) if layers is not None else None,
+        'optimization': optimization,
+        'info': _to_builtin(info or {}),
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, header=np.array(json.dumps(header)), **arrays)
+        # mkstemp creates the file readable by its owner only, artifacts are meant to be shared like the exports
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+class Artifact:
+    """
+    Flatten result artifact (see write_artifact) opened for reading, each field read on first access.
+
+    With mmap, fields are read-only np.memmap views of their member in the file: reading one field of a 2M-face
+    result maps only that member, and only the pages actually accessed are read from disk. Without mmap (or for a
+    compressed member) a field is read into memory when accessed.
+
+    Args:
+        path: Artifact .npz path
+        mmap: Memory-map the fields instead of reading them
+
+    Raises:
+        ValueError: The file is not an artifact, or an artifact of a newer version
+    """
+
+    def __init__(self, path, mmap=True):
+        import zipfile
+
+        self.path = path
+        self.mmap = mmap
+        self._fields = {}
+        try:
+            with zipfile.ZipFile(path) as archive:
+                self._members = {info.filename[:-len('.npy')]: info for info in archive.infolist()
+                                 if info.filename.endswith('.npy')}
+                if 'header' not in self._members:
+                    raise ValueError(f"{path} is not a {ARTIFACT_FORMAT} artifact")
+                header = self._read_member(archive, 'header')
+        except ValueError:
+            raise
+        except (OSError, KeyError, zipfile.BadZipFile) as e:
+            raise ValueError(f"Unreadable artifact {path}: {e}")
+        self.header = json.loads(str(header))
+        if self.header.get('format') != ARTIFACT_FORMAT:
+            raise ValueError(f"{path} is not a {ARTIFACT_FORMAT} artifact")
+        if self.header.get('version', 0) > ARTIFACT_VERSION:
+            raise ValueError(f"Artifact {path} has version {self.header.get('version')}, this version reads up to "
+                             f"{ARTIFACT_VERSION}")
+
+    def _read_member(self, archive, name):
+        with archive.open(self._members[name]) as f:
+            return np.lib.format.read_array(f, allow_pickle=False)
+
+    def _map_member(self, name):
+        """np.memmap of an uncompressed member, None if it cannot be mapped."""
+        import zipfile
+
+        info = self._members[name]
+        if info.compress_type != zipfile.ZIP_STORED:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(info.header_offset)
+            local = _LOCAL_HEADER.unpack(f.read(_LOCAL_HEADER.size))
+            f.seek(local[-2] + local[-1], os.SEEK_CUR)
+            version = np.lib.format.read_magic(f)
+            read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else \
+                np.lib.format.read_array_header_2_0
+            shape, fortran_order, dtype = read_header(f)
+            offset = f.tell()
+        if dtype.hasobject:
+            return None
+        if not np.prod(shape, dtype=np.int64):
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode='r', offset=offset, shape=shape,
+                         order='F' if fortran_order else 'C')
+
+    @property
+    def fields(self):
+        """Names of the stored fields."""
+        return [name for name in self._members if name != 'header']
+
+    def __contains__(self, name):
+        return name in self._members and name != 'header'
+
+    def __getitem__(self, name):
+        import zipfile
+
+        if name not in self:
+            raise KeyError(f"No field '{name}' in artifact {self.path}, it has {self.fields}")
+        if name not in self._fields:
+            array = self._map_member(name) if self.mmap else None
+            if array is None:
+                with zipfile.ZipFile(self.path) as archive:
+                    array = self._read_member(archive, name)
+            self._fields[name] = array
+        return self._fields[name]
+
+    @property
+    def bounds(self):
+        """Boundary loops as a list of vertex id arrays."""
+        offsets = np.asarray(self['bound_offsets'])
+        vertices = self['bound_vertices']
+        return [np.asarray(vertices[start:end]) for start, end in zip(offsets[:-1], offsets[1:])]
+
+    @property
+    def layers(self):
+        return self.header['layers']
+
+    def face_metrics(self):
+        """{metric: per-face distortion} of the stored metrics."""
+        return {name[len('face_'):]: self[name] for name in self.fields if name.startswith('face_')}
+
+    @property
+    def optimization_results(self):
+        """Optimization summary with its 'optimization_history' (as render.render_preview uses it), None if none."""
+        if self.header['optimization'] is None:
+            return None
+        results = dict(self.header['optimization'])
+        results['optimization_history'] = [(int(face_id), float(distortion)) for face_id, distortion in
+                                           zip(self['history_faces'], self['history_distortions'])]
+        return results
+
+
+def open_artifact(path, mmap=True):
+    """Open a flatten result artifact for reading, see Artifact."""
+    return Artifact(path, mmap)
+
+
+def export_artifact(path, path_svg=None, path_dxf=None, path_png=None, scale=1.0, simplify_tolerance=None,
+                    fit_arcs=False, dpi=DEFAULT_DPI):
+    """
+    Regenerate the SVG, DXF and PNG outputs of a flatten result from its artifact alone.
+
+    Args:
+        path: Artifact .npz path
+        path_svg, path_dxf, path_png: Outputs to write (None to skip)
+        scale: Factor applied to the unwrap, to export at another scale
+        simplify_tolerance: Simplify the outlines within this distance (after scaling, see simplify.simplify_outlines)
+        fit_arcs: Also fit arcs to the simplified outlines
+
+    Returns:
+        dict: {'svg', 'dxf', 'png': written paths, 'simplification': stats or None}
+    """
+    from .import_export import export_outlines
+    from .simplify import simplify_outlines
+
+    artifact = open_artifact(path)
+    unwrap = np.asarray(artifact['unwrap'])
+    if scale != 1.0:
+        unwrap = unwrap * unwrap.dtype.type(scale)
+    bounds = artifact.bounds
+    outputs = {}
+    if path_png:
+        from .render import render_preview
+
+        deformation = artifact['face_area'] if 'face_area' in artifact else None
+        if deformation is not None and scale != 1.0:
+            # Area change of the scaled unwrap
+            deformation = (np.asarray(deformation, dtype=np.float64) + 100) * scale ** 2 - 100
+        outputs['png'] = render_preview(path_png, artifact['vertices'], artifact['faces'], unwrap, deformation,
+                                        artifact.optimization_results, bounds, dpi)
+    stats = bulges = None
+    if path_svg or path_dxf:
+        if simplify_tolerance is not None:
+            bounds, bulges, stats = simplify_outlines(unwrap, bounds, simplify_tolerance, fit_arcs)
+        outputs.update(export_outlines(unwrap, bounds, path_svg, path_dxf, layers=artifact.layers, bulges=bulges))
+    outputs['simplification'] = stats
+    return outputs
@@ -0,0 +1,229 @@
+import glob
+import json
+import math
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .artifact import write_artifact
+from .igl_api import init_unfold, init_two_point_unfold, normalize_scale, unfold
+from .import_export import load, export_outlines
+from .render import DEFAULT_DPI, render_preview
+from .score import compute_deformation, compute_overall_distortion
+from .simplify import simplify_outlines
+from .topology import MeshTopology
+
+
+MANIFEST_VERSION = 1
+
+
+def find_stl_files(inputs):
+    """
+    Expand directories (their *.stl files) and glob patterns into a sorted list of STL paths without duplicates.
+
+    Args:
+        inputs: Directories, glob patterns or file paths
+    """
+    paths = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            matches = [os.path.join(entry, name) for name in os.listdir(entry) if name.lower().endswith('.stl')]
+        elif glob.has_magic(entry):
+            matches = glob.glob(entry, recursive=True)
+        else:
+            matches = [entry]
+        paths.extend(sorted(matches))
+    return list(dict.fromkeys(os.path.abspath(path) for path in paths))
+
+
+def output_paths(path_stl, output_dir=None):
+    """SVG and DXF paths of an input, next to it or in output_dir."""
+    stem = ".".join(os.path.basename(path_stl).split(".")[:-1])
+    directory = output_dir if output_dir is not None else os.path.dirname(path_stl)
+    return os.path.join(directory, stem + ".svg"), os.path.join(directory, stem + ".dxf")
+
+
+def flatten_file(path_stl, output_dir=None, face_id=0, optimize=False, max_attempts=50, strategy='random',
+                 patience=None, max_seconds=None, seed=None, loader='auto', merge_tolerance=None, objective='area',
+                 coarse_faces=None, low_memory=False, png=False, png_dpi=DEFAULT_DPI, simplify_tolerance=None,
+                 fit_arcs=False, pins='face', scale='area', artifact=False):
+    """
+    Flatten one STL file and export it, without display. Never raises, failures are reported in the entry.
+
+    Returns:
+        dict: Manifest entry of the file
+    """
+    from .flatten_surface import optimize_initial_points
+
+    path_svg, path_dxf = output_paths(path_stl, output_dir)
+    entry = {'input': path_stl, 'status': 'ok', 'timings': {}}
+    timings = entry['timings']
+    start = time.perf_counter()
+    stage_start = start
+
+    def stage_done(name):
+        nonlocal stage_start
+        now = time.perf_counter()
+        timings[name] = now - stage_start
+        stage_start = now
+
+    try:
+        vertices, faces = load(path_stl, loader, merge_tolerance, low_memory)
+        if len(faces) == 0:
+            raise ValueError("No faces in STL file")
+        topology = MeshTopology(vertices, faces)
+        bounds = topology.boundary_loops
+        entry['num_vertices'] = len(vertices)
+        entry['num_faces'] = len(faces)
+        stage_done('load')
+
+        optimization_results = None
+        if optimize:
+            optimization_results = optimize_initial_points(vertices, faces, max_attempts, verbose=False,
+                                                           strategy=strategy, patience=patience,
+                                                           max_seconds=max_seconds, seed=seed, topology=topology,
+                                                           objective=objective, coarse_faces=coarse_faces,
+                                                           pins=pins, scale=scale)
+            face_id = optimization_results['best_face_id']
+            entry['default_distortion'] = optimization_results['default_distortion']
+            entry['improvement_percent'] = optimization_results['improvement_percent']
+            entry['attempts'] = len(optimization_results['optimization_history'])
+            stage_done('optimize')
+
+        if pins == 'two-point':
+            init_points_ids, init_points_pos, _ = init_two_point_unfold(vertices, faces, topology,
+                                                                        face_id if optimize else None)
+            unwrap = unfold(vertices, faces, init_points_ids, init_points_pos, topology=topology)
+            unwrap, entry['scale_factor'] = normalize_scale(vertices, faces, unwrap, scale, topology)
+            entry['pinned_vertices'] = init_points_ids.tolist()
+        else:
+            init_points_ids, init_points_pos, plan = init_unfold(vertices, faces, face_id, topology)
+            unwrap = unfold(vertices, faces, init_points_ids, init_points_pos, topology=topology)
+        stage_done('unfold')
+        deformation = compute_deformation(vertices, faces, unwrap, topology)
+        entry['face_id_used'] = int(face_id) if pins != 'two-point' else None
+        entry['distortion'] = float(compute_overall_distortion(deformation))
+        entry['distortion_metrics'] = topology.distortion_metrics.overall(unwrap)
+        stage_done('score')
+
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+        outlines, bulges = bounds, None
+        if simplify_tolerance is not None:
+            outlines, bulges, entry['simplification'] = simplify_outlines(unwrap, bounds, simplify_tolerance, fit_arcs)
+            stage_done('simplify')
+        entry['outputs'] = export_outlines(unwrap, outlines, path_svg, path_dxf, bulges=bulges)
+        stage_done('export')
+        if png:
+            path_png = os.path.splitext(path_svg)[0] + ".png"
+            render_preview(path_png, vertices, faces, unwrap, deformation,
+                           optimization_results, bounds, png_dpi)
+            entry['outputs']['png'] = path_png
+            stage_done('render')
+        if artifact:
+            entry['outputs']['artifact'] = write_artifact(
+                os.path.splitext(path_svg)[0] + ".npz", vertices, faces, unwrap, bounds,
+                topology.distortion_metrics.per_face(unwrap), optimization_results=optimization_results,
+                info={key: entry.get(key) for key in ('input', 'face_id_used', 'distortion', 'distortion_metrics',
+                                                      'scale_factor', 'simplification')})
+            stage_done('artifact')
+    except Exception as e:
+        entry['status'] = 'error'
+        entry['error'] = f"{type(e).__name__}: {e}"
+        entry['traceback'] = traceback.format_exc()
+    timings['total'] = time.perf_counter() - start
+    return entry
+
+
+def run_batch(inputs, output_dir=None, manifest_path=None, workers=None, verbose=True, **options):
+    """
+    Flatten many STL files in one process pool and write a JSON manifest.
+
+    Files are independent tasks, so loading, solving and writing of different files overlap across the workers.
+    A failing file is recorded in the manifest and does not stop the others.
+
+    Args:
+        inputs: Directories, glob patterns or STL paths
+        output_dir: Directory of the SVG/DXF outputs (default: next to each input)
+        manifest_path: Path of the JSON manifest (default: manifest.json in output_dir, or the current directory)
+        workers: Number of worker processes (None or 0 uses all CPU cores)
+        verbose: Print one line per finished file
+        **options: Flattening options of flatten_file (face_id, optimize, max_attempts, strategy, ...)
+
+    Returns:
+        dict: The manifest
+    """
+    paths = find_stl_files(inputs)
+    if manifest_path is None:
+        manifest_path = os.path.join(output_dir if output_dir is not None else os.getcwd(), "manifest.json")
+    if not workers or workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(paths)))
+    if verbose:
+        print(f"Flattening {len(paths)} files with {workers} workers...")
+
+    start = time.perf_counter()
+    entries = {}
+    if workers == 1:
+        for path in paths:
+            entries[path] = flatten_file(path, output_dir, **options)
+            _report(entries[path], len(entries), len(paths), verbose)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(flatten_file, path, output_dir, **options): path for path in paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    entries[path] = future.result()
+                except Exception as e:
+                    # The worker itself died (e.g. a crash in native code), only this file is lost
+                    entries[path] = {'input': path, 'status': 'error', 'error': f"{type(e).__name__}: {e}",
+                                     'timings': {}}
+                _report(entries[path], len(entries), len(paths), verbose)
+
+    files = [entries[path] for path in paths]
+    failed = [entry for entry in files if entry['status'] != 'ok']
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'options': options,
+        'summary': {
+            'files': len(files),
+            'succeeded': len(files) - len(failed),
+            'failed': len(failed),
+            'workers': workers,
+            'wall_time': time.perf_counter() - start,
+        },
+        'files': files,
+    }
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+    os.makedirs(manifest_dir, exist_ok=True)
+    with open(manifest_path, 'w') as f:
+        json.dump(_json_safe(manifest), f, indent=2)
+    if verbose:
+        print(f"{manifest['summary']['succeeded']}/{len(files)} files flattened in "
+              f"{manifest['summary']['wall_time']:.1f}s, manifest written to {manifest_path}")
+    return manifest
+
+
+def _json_safe(value):
+    """Replace non-finite floats (failed attempts are inf) by None so the manifest stays strict JSON."""
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _report(entry, done, total, verbose):
+    if not verbose:
+        return
+    name = os.path.basename(entry['input'])
+    if entry['status'] == 'ok':
+        print(f"  [{done}/{total}] {name}: distortion={entry['distortion']:.4f} face_id={entry['face_id_used']} "
+              f"({entry['timings']['total']:.2f}s)")
+    else:
+        print(f"  [{done}/{total}] {name}: FAILED {entry['error']}")
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+
+# Bump when a change of the pipeline changes cached results
+CACHE_VERSION = 2
+
+DEFAULT_MAX_BYTES = 1 << 30
+
+
+def default_cache_dir():
+    return os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')),
+                        'flatten_surface')
+
+
+def mesh_hash(vertices, faces):
+    """Content hash of the mesh arrays (dtype, shape and bytes)."""
+    digest = hashlib.sha256()
+    for array in (vertices, faces):
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(memoryview(array).cast('B'))
+    return digest.hexdigest()
+
+
+def params_key(mesh_key, kind, params):
+    """Cache key of a mesh and a JSON-serializable dict of parameters."""
+    payload = json.dumps({'version': CACHE_VERSION, 'kind': kind, 'mesh': mesh_key, 'params': params},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of flattening results and optimization histories.
+
+    Entries are .npz files named by their key. Reading an entry refreshes its modification time, and the least
+    recently used entries are evicted once the cache grows over max_bytes.
+
+    Args:
+        cache_dir: Cache directory, created if needed (default: $XDG_CACHE_HOME/flatten_surface)
+        max_bytes: Size limit of the cache directory
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.npz')
+
+    def _read(self, key):
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError):
+            # Missing, or corrupted by an interrupted writer: treated as a miss
+            return None
+        os.utime(path)
+        return arrays
+
+    def _write(self, key, arrays):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.npz'):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def get_result(self, key):
+        """
+        Returns:
+            dict or None: {'face_id_used', 'unwrap', 'deformation', 'optimization_results'} as stored by put_result
+        """
+        arrays = self._read(key)
+        if arrays is None:
+            return None
+        meta = json.loads(str(arrays['meta']))
+        optimization_results = meta['optimization_results']
+        if optimization_results is not None:
+            optimization_results['optimization_history'] = [
+                (int(face_id), float(distortion))
+                for face_id, distortion in zip(arrays['history_faces'], arrays['history_distortions'])]
+        return {
+            'face_id_used': meta['face_id_used'],
+            'unwrap': arrays['unwrap'],
+            'deformation': arrays['deformation'],
+            'optimization_results': optimization_results,
+        }
+
+    def put_result(self, key, face_id_used, unwrap, deformation, optimization_results=None):
+        arrays = {'unwrap': unwrap, 'deformation': deformation}
+        meta = {'face_id_used': int(face_id_used) if face_id_used is not None else None, 'optimization_results': None}
+        if optimization_results is not None:
+            history = optimization_results['optimization_history']
+            arrays['history_faces'] = np.array([face_id for face_id, _ in history], dtype=np.int64)
+            arrays['history_distortions'] = np.array([distortion for _, distortion in history], dtype=np.float64)
+            # Timings describe the run that computed the result, they are not cached
+            meta['optimization_results'] = {key: _to_builtin(value) for key, value in optimization_results.items()
+                                            if key not in ('optimization_history', 'candidate_timings')}
+        arrays['meta'] = np.array(json.dumps(meta))
+        self._write(key, arrays)
+
+    def get_history(self, key):
+        """
+        Returns:
+            dict: Distortion of every face evaluated by previous runs, {face_id: distortion}
+        """
+        arrays = self._read(key)
+        if arrays is None:
+            return {}
+        return {int(face_id): float(distortion) for face_id, distortion in zip(arrays['faces'], arrays['distortions'])}
+
+    def put_history(self, key, history):
+        """Merge the (face_id, distortion) pairs of history into the stored ones."""
+        distortions = self.get_history(key)
+        distortions.update((int(face_id), float(distortion)) for face_id, distortion in history)
+        self._write(key, {'faces': np.fromiter(distortions.keys(), dtype=np.int64, count=len(distortions)),
+                          'distortions': np.fromiter(distortions.values(), dtype=np.float64, count=len(distortions))})
+
+
+def _to_builtin(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
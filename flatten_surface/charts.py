@@ -0,0 +1,266 @@
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+# Largest angle between the normals of a chart and its mean direction, in degrees
+DEFAULT_MAX_ANGLE = 60
+
+# Charts with fewer faces (and less than 1% of the mesh) are merged into the neighbor they share most edges with
+DEFAULT_MIN_FACES = 10
+
+# Refinement iterations of the normal directions (area-weighted spherical k-means)
+NORMAL_ITERATIONS = 5
+
+# Space between charts in the layout, as a fraction of the largest chart size
+CHART_GAP = 0.05
+
+
+def segment_by_normals(topology, max_angle=DEFAULT_MAX_ANGLE, min_faces=DEFAULT_MIN_FACES):
+    """
+    Split a mesh into charts of faces with similar normals.
+
+    Normal directions are picked by farthest-point sampling until every face normal is within max_angle of one,
+    refined by a few area-weighted spherical k-means iterations, then each group of faces is split into
+    edge-connected components. Charts smaller than min_faces are merged into a neighbor.
+
+    Args:
+        topology: MeshTopology of the mesh
+        max_angle: Largest angle in degrees between a face normal and the direction of its chart
+        min_faces: Minimum number of faces of a chart, at most 1% of the faces of the mesh
+
+    Returns:
+        np.ndarray: Chart label of each face, from 0 to the number of charts - 1
+    """
+    normals = topology.face_normals
+    areas = topology.face_areas
+    valid = np.flatnonzero(areas > 0)
+    if len(valid) == 0:
+        return np.zeros(topology.num_faces, dtype=np.int64)
+    cos_limit = math.cos(math.radians(max_angle))
+    directions = [normals[valid[np.argmax(areas[valid])]]]
+    closest = normals[valid] @ directions[0]
+    while closest.min() < cos_limit:
+        directions.append(normals[valid[np.argmin(closest)]])
+        np.maximum(closest, normals[valid] @ directions[-1], out=closest)
+
+    directions = np.array(directions)
+    groups = np.argmax(normals @ directions.T, axis=1)
+    for _ in range(NORMAL_ITERATIONS):
+        sums = np.zeros_like(directions)
+        np.add.at(sums, groups, normals * areas[:, None])
+        lengths = np.linalg.norm(sums, axis=1)
+        directions = np.where(lengths[:, None] > 0, sums / np.maximum(lengths, 1e-300)[:, None], directions)
+        groups = np.argmax(normals @ directions.T, axis=1)
+    min_faces = min(min_faces, topology.num_faces // 100)
+    return merge_small_charts(topology, split_components(topology, groups), min_faces)
+
+
+def split_components(topology, groups):
+    """Relabel faces so that each label is an edge-connected component of a group, returns the labels."""
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    rows, cols = _face_pairs(topology)
+    same = groups[rows] == groups[cols]
+    graph = coo_matrix((np.ones(same.sum(), dtype=np.int8), (rows[same], cols[same])),
+                       shape=(topology.num_faces, topology.num_faces))
+    _, labels = connected_components(graph, directed=False)
+    return labels.astype(np.int64)
+
+
+def merge_small_charts(topology, labels, min_faces=DEFAULT_MIN_FACES):
+    """Merge each chart smaller than min_faces into the adjacent chart sharing most edges with it."""
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    rows, cols = _face_pairs(topology)
+    while True:
+        sizes = np.bincount(labels)
+        across = (sizes[labels[rows]] < min_faces) & (labels[rows] != labels[cols])
+        if not across.any():
+            break
+        pairs, counts = np.unique(np.stack([labels[rows[across]], labels[cols[across]]], axis=1), axis=0,
+                                  return_counts=True)
+        # Each small chart keeps the pair with most shared edges, then with the largest neighbor
+        pairs = pairs[np.lexsort((-sizes[pairs[:, 1]], -counts, pairs[:, 0]))]
+        first = np.concatenate([[True], pairs[1:, 0] != pairs[:-1, 0]])
+        # Chains and cycles of small charts merged into each other end up in one chart
+        links = coo_matrix((np.ones(first.sum(), dtype=np.int8), (pairs[first, 0], pairs[first, 1])),
+                           shape=(len(sizes), len(sizes)))
+        _, merged = connected_components(links, directed=False)
+        labels = merged[labels]
+    return np.unique(labels, return_inverse=True)[1].ravel().astype(np.int64)
+
+
+def _face_pairs(topology):
+    indptr, indices = topology.face_faces
+    return np.repeat(np.arange(topology.num_faces), np.diff(indptr)), indices
+
+
+def read_face_groups(path, num_faces):
+    """
+    Chart label of each face from a face-group file.
+
+    Formats:
+        .json: a list with the group of each face, or {group name: [face ids]}
+        other: the group of each face as whitespace-separated integers
+
+    Returns:
+        np.ndarray: Group label of each face, from 0 to the number of groups - 1
+    """
+    if os.path.splitext(path)[1].lower() == '.json':
+        with open(path) as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            groups = np.full(num_faces, -1, dtype=np.int64)
+            for label, face_ids in enumerate(data.values()):
+                groups[np.asarray(face_ids, dtype=np.int64)] = label
+        else:
+            groups = np.asarray(data)
+    else:
+        with open(path) as f:
+            groups = np.array(f.read().split(), dtype=np.int64)
+    if len(groups) != num_faces:
+        raise ValueError(f"Face-group file {path} has {len(groups)} entries, the mesh has {num_faces} faces")
+    if (groups == -1).any():
+        raise ValueError(f"Face-group file {path} does not assign {int((groups == -1).sum())} faces")
+    return np.unique(groups, return_inverse=True)[1].ravel().astype(np.int64)
+
+
+def submesh(vertices, faces, face_ids):
+    """
+    Returns:
+        tuple: (vertices, faces, vertex_ids) of the faces face_ids, vertex_ids maps the submesh vertices to the mesh
+    """
+    chart_faces = faces[face_ids]
+    vertex_ids = np.unique(chart_faces)
+    return vertices[vertex_ids], np.searchsorted(vertex_ids, chart_faces), vertex_ids
+
+
+def _flatten_chart(chart_vertices, chart_faces, options):
+    from .flatten_surface import flatten
+
+    try:
+        result = flatten(chart_vertices, chart_faces, verbose=False, **options)
+    except Exception as e:
+        return {'error': str(e)}
+    topology = result.pop('topology')
+    if not len(topology.boundary_loops):
+        return {'error': "Closed chart, it has no boundary to cut along"}
+    result['bounds'] = topology.boundary_loops
+    result['distortion'] = float(result['distortion'])
+    return result
+
+
+def flatten_charts(vertices, faces, labels, workers=1, verbose=True, **options):
+    """
+    Flatten every chart of a mesh independently, in a process pool.
+
+    Args:
+        vertices: Mesh vertices array
+        faces: Mesh faces array
+        labels: Chart label of each face (see segment_by_normals and read_face_groups)
+        workers: Number of worker processes (0 or None uses all CPU cores)
+        verbose: Print one line per chart
+        **options: Options of flatten_surface.flatten for each chart (face_id, optimize, max_attempts, ...)
+
+    Returns:
+        list: Per chart, the result of flatten (without topology) with 'face_ids' and 'vertex_ids' in the mesh and
+        'bounds' in chart vertex ids, or {'face_ids', 'vertex_ids', 'error'} if the chart failed
+    """
+    if not workers or workers <= 0:
+        workers = os.cpu_count() or 1
+    order = np.argsort(labels, kind='stable')
+    face_groups = np.split(order, np.flatnonzero(np.diff(labels[order])) + 1)
+    submeshes = [submesh(vertices, faces, face_ids) for face_ids in face_groups]
+    options = dict(options, workers=1) if options.get('optimize') else options
+
+    if workers == 1 or len(submeshes) == 1:
+        results = [_flatten_chart(chart_vertices, chart_faces, options)
+                   for chart_vertices, chart_faces, _ in submeshes]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(submeshes))) as executor:
+            results = list(executor.map(_flatten_chart, [chart_vertices for chart_vertices, _, _ in submeshes],
+                                        [chart_faces for _, chart_faces, _ in submeshes],
+                                        [options] * len(submeshes)))
+
+    charts = []
+    for chart_id, (face_ids, (_, _, vertex_ids), result) in enumerate(zip(face_groups, submeshes, results)):
+        result.update(face_ids=face_ids, vertex_ids=vertex_ids)
+        charts.append(result)
+        if verbose:
+            if 'error' in result:
+                print(f"  Chart {chart_id + 1}/{len(face_groups)}: {len(face_ids)} faces, FAILED {result['error']}")
+            else:
+                print(f"  Chart {chart_id + 1}/{len(face_groups)}: {len(face_ids)} faces, "
+                      f"distortion={result['distortion']:.4f}")
+    return charts
+
+
+def layout_charts(vertices, faces, charts, gap=CHART_GAP):
+    """
+    Place the flattened charts side by side in rows and merge them into one mesh, seams being duplicated.
+
+    Failed charts are left out.
+
+    Returns:
+        dict: {
+            'vertices': 3D position of each merged vertex,
+            'faces': faces in the mesh order, into the merged vertices (-1 for faces of failed charts),
+            'unwrap': 2D position of each merged vertex,
+            'bounds': boundary loops of all charts, into the merged vertices,
+            'layers': chart layer name of each loop,
+            'deformation': per-face area change in the mesh order (nan for faces of failed charts),
+            'vertex_offsets': first merged vertex of each chart (-1 for failed charts)
+        }
+    """
+    placed = [chart for chart in charts if 'error' not in chart]
+    boxes = [(chart['unwrap'].min(axis=0), chart['unwrap'].max(axis=0)) for chart in placed]
+    sizes = [high - low for low, high in boxes]
+    spacing = gap * max((max(size) for size in sizes), default=0)
+    row_width = max(max((size[0] for size in sizes), default=0),
+                    math.sqrt(sum(size[0] * size[1] for size in sizes)) * 1.5)
+
+    # Shelf packing, tallest charts first
+    offsets = {}
+    x = y = row_height = 0
+    for index in sorted(range(len(placed)), key=lambda i: -sizes[i][1]):
+        if x > 0 and x + sizes[index][0] > row_width:
+            x, y, row_height = 0, y + row_height + spacing, 0
+        offsets[index] = np.array([x, y]) - boxes[index][0]
+        x += sizes[index][0] + spacing
+        row_height = max(row_height, sizes[index][1])
+
+    merged_faces = np.full(faces.shape, -1, dtype=np.int64)
+    deformation = np.full(len(faces), np.nan)
+    vertex_parts, unwrap_parts, bounds, layers = [], [], [], []
+    vertex_offsets = []
+    offset = 0
+    placed_index = 0
+    for chart_id, chart in enumerate(charts):
+        if 'error' in chart:
+            vertex_offsets.append(-1)
+            continue
+        vertex_ids = chart['vertex_ids']
+        vertex_parts.append(vertices[vertex_ids])
+        unwrap_parts.append(chart['unwrap'] + offsets[placed_index])
+        merged_faces[chart['face_ids']] = np.searchsorted(vertex_ids, faces[chart['face_ids']]) + offset
+        deformation[chart['face_ids']] = chart['deformation']
+        bounds.extend(bound + offset for bound in chart['bounds'])
+        layers.extend([f"CHART_{chart_id + 1}"] * len(chart['bounds']))
+        vertex_offsets.append(offset)
+        offset += len(vertex_ids)
+        placed_index += 1
+    return {
+        'vertices': np.concatenate(vertex_parts) if vertex_parts else np.empty((0, 3)),
+        'faces': merged_faces,
+        'unwrap': np.concatenate(unwrap_parts) if unwrap_parts else np.empty((0, 2)),
+        'bounds': bounds,
+        'layers': layers,
+        'deformation': deformation,
+        'vertex_offsets': vertex_offsets,
+    }
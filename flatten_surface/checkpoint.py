@@ -0,0 +1,110 @@
+import json
+import math
+import os
+import tempfile
+import time
+
+
+CHECKPOINT_VERSION = 1
+
+# Seconds between two checkpoints of a running search
+DEFAULT_INTERVAL = 10.0
+
+# Options deciding the candidate schedule, a checkpoint is only resumed with the same values
+SEARCH_OPTIONS = ('strategy', 'max_attempts', 'patience', 'coarse_faces')
+
+
+class OptimizationCheckpoint:
+    """
+    Periodic on-disk checkpoint of an optimization: history, best face so far and the options needed to resume it.
+
+    The checkpoint is a JSON file replaced atomically, so a killed run leaves the previous checkpoint intact. It is
+    written at most every interval seconds while the search runs, and once more when the search stops (including on
+    an exception or Ctrl-C).
+
+    Resuming replays the search with the checkpointed distortions known, as the result cache does: with the seed of
+    the checkpoint, the candidate schedule and every decision of the search are the same, the checkpointed faces are
+    not evaluated again and the result is the one of an uninterrupted run.
+
+    Args:
+        path: Checkpoint file
+        mesh_key: Hash of the mesh (cache.mesh_hash), a checkpoint of another mesh is refused
+        options: JSON-serializable search options (seed, objective, strategy, ...) stored with the history
+        interval: Seconds between two checkpoints
+    """
+
+    def __init__(self, path, mesh_key, options, interval=DEFAULT_INTERVAL):
+        self.path = path
+        self.mesh_key = mesh_key
+        self.options = options
+        self.interval = interval
+        self._last = time.perf_counter()
+
+    def load(self):
+        """
+        Read the checkpoint of this mesh and objective.
+
+        Returns:
+            dict or None: {'options', 'history': list of (face_id, distortion), 'best_face_id', 'best_distortion',
+                'stop_reason', 'elapsed_seconds'}, None if there is no checkpoint yet
+
+        Raises:
+            ValueError: The checkpoint belongs to another mesh, objective, pins or search options (SEARCH_OPTIONS), or
+                is not a checkpoint
+        """
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Unreadable checkpoint {self.path}: {e}")
+        if data.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"Checkpoint {self.path} has version {data.get('version')}, expected {CHECKPOINT_VERSION}")
+        if data['mesh'] != self.mesh_key:
+            raise ValueError(f"Checkpoint {self.path} belongs to another mesh")
+        if data['options'].get('objective') != self.options.get('objective'):
+            raise ValueError(f"Checkpoint {self.path} minimized the {data['options'].get('objective')} objective, "
+                             f"not {self.options.get('objective')}")
+        pins = data['options'].get('pins', 'face'), data['options'].get('scale')
+        if pins != (self.options.get('pins', 'face'), self.options.get('scale')):
+            raise ValueError(f"Checkpoint {self.path} searched {pins[0]} pins, not {self.options.get('pins', 'face')} "
+                             f"pins with these options")
+        for name in SEARCH_OPTIONS:
+            if name in self.options and data['options'].get(name) != self.options[name]:
+                raise ValueError(f"Checkpoint {self.path} was run with {name} {data['options'].get(name)}, "
+                                 f"not {self.options[name]}")
+        data['history'] = [(int(face_id), math.inf if distortion is None else float(distortion))
+                           for face_id, distortion in data['history']]
+        if data['best_distortion'] is None:
+            data['best_distortion'] = math.inf
+        return data
+
+    def update(self, search, force=False):
+        """Write the state of search (search.CandidateSearch) if interval seconds passed since the last write."""
+        now = time.perf_counter()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        data = {
+            'version': CHECKPOINT_VERSION,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'mesh': self.mesh_key,
+            'options': self.options,
+            'history': [(face_id, distortion if math.isfinite(distortion) else None)
+                        for face_id, distortion in search.history],
+            'best_face_id': search.best_face_id,
+            'best_distortion': search.best_distortion if math.isfinite(search.best_distortion) else None,
+            'stop_reason': search.stop_reason,
+            'elapsed_seconds': search.elapsed(),
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
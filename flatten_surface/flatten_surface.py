@@ -1,141 +1,528 @@
+import logging
 import os
 import random
-import tkinter as tk
-from tkinter import filedialog
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 
-from .display import plot
-from .igl_api import init_unfold, unfold, get_all_bounds
-from .import_export import load, export_svg, export_dxf
+import numpy as np
+
+from .artifact import write_artifact
+from .cache import ResultCache, mesh_hash, params_key
+from .checkpoint import DEFAULT_INTERVAL, OptimizationCheckpoint
+from .geometry import boundary_face_mask, nearest_faces
+from .igl_api import PINS, init_unfold, init_two_point_unfold, two_point_candidates, normalize_scale, unfold, \
+    get_all_bounds, decimate
+from .import_export import load, export_outlines
+from .metrics import OBJECTIVES
+from .profiling import Profiler
+from .render import DEFAULT_DPI, render_preview
 from .score import compute_deformation, compute_overall_distortion
+from .search import STRATEGIES, CandidateSearch, random_search, local_search, anneal_search
+from .simplify import simplify_outlines
+from .topology import MeshTopology
+
+
+# Meshes with at least this many faces get their topology memory reported
+LARGE_MESH_FACES = 100000
+
+# Coarse-to-fine search: best proxy faces mapped back to the mesh, and mesh faces evaluated around each of them
+COARSE_TOP_K = 5
+COARSE_NEIGHBORS = 4
+
+# Mesh topology attached by each pool worker and the optimization objective, see _init_worker
+_worker_mesh = None
+
+
+def _share_array(array):
+    """Copy an array into a new shared memory block, returns (block, spec) where spec lets workers attach to it."""
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _attach_array(spec):
+    name, shape, dtype = spec
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+
+def _init_worker(vertices_spec, faces_spec, objective, pins, scale):
+    global _worker_mesh
+    vertices_block, vertices = _attach_array(vertices_spec)
+    faces_block, faces = _attach_array(faces_spec)
+    # Blocks are kept referenced so the views stay valid for the worker lifetime
+    _worker_mesh = (MeshTopology(vertices, faces), objective, pins, scale, vertices_block, faces_block)
+
+
+def _evaluate_face(topology, face_id, objective='area', pins='face', scale='area'):
+    """
+    Unfold the mesh from face_id and return the objective value, or (inf, error message) on failure.
+
+    With two-point pins, face_id is the anchor vertex of the pins (see igl_api.init_two_point_unfold) and the objective
+    is the one of the unwrap scaled to the mesh.
+    """
+    vertices, faces = topology.vertices, topology.faces
+    try:
+        if pins == 'two-point':
+            init_points_ids, init_points_pos, plan = init_two_point_unfold(vertices, faces, topology, face_id)
+            unwrap = unfold(vertices, faces, init_points_ids, init_points_pos, topology=topology)
+            unwrap = normalize_scale(vertices, faces, unwrap, scale, topology)[0]
+        else:
+            init_points_ids, init_points_pos, plan = init_unfold(vertices, faces, face_id, topology)
+            unwrap = unfold(vertices, faces, init_points_ids, init_points_pos, topology=topology)
+        return topology.distortion_metrics.objective(unwrap, objective), None
+    except Exception as e:
+        return float('inf'), str(e)
+
+
+def _timed_evaluate_face(topology, face_id, objective, pins, scale):
+    """_evaluate_face with its timing, returns ((distortion, error), timing dict)."""
+    start = time.perf_counter()
+    result = _evaluate_face(topology, face_id, objective, pins, scale)
+    return result, {'face_id': int(face_id), 'start': start, 'seconds': time.perf_counter() - start,
+                    'worker': os.getpid()}
+
+
+def _evaluate_face_in_worker(face_id):
+    return _timed_evaluate_face(_worker_mesh[0], face_id, *_worker_mesh[1:4])
+
+
+class _CandidateEvaluator:
+    """
+    Evaluate candidate faces (anchor vertices with two-point pins), serially or spread across a process pool kept open
+    for the whole search.
+
+    The mesh is copied once into shared memory and attached by every worker, so tasks only carry face ids.
+    Each worker builds its own MeshTopology and factorizes the LSCM system once for all its candidates, the serial
+    evaluation uses the given topology.
+    Results are returned in the order of the face ids whatever the number of workers, the timing of every
+    evaluation is kept in timings.
+    """
+
+    def __init__(self, topology, workers=1, objective='area', pins='face', scale='area'):
+        if workers is None or workers <= 0:
+            workers = os.cpu_count() or 1
+        self.topology = topology
+        self.workers = workers
+        self.objective = objective
+        self.pins = pins
+        self.scale = scale
+        self.timings = []
+        self._executor = None
+        self._blocks = []
+
+    def __enter__(self):
+        if self.workers <= 1:
+            return self
+        try:
+            vertices_block, vertices_spec = _share_array(np.ascontiguousarray(self.topology.vertices))
+            self._blocks.append(vertices_block)
+            faces_block, faces_spec = _share_array(np.ascontiguousarray(self.topology.faces))
+            self._blocks.append(faces_block)
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 initargs=(vertices_spec, faces_spec, self.objective, self.pins,
+                                                           self.scale))
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __call__(self, face_ids):
+        if self._executor is None:
+            timed = [_timed_evaluate_face(self.topology, face_id, self.objective, self.pins, self.scale)
+                     for face_id in face_ids]
+        else:
+            chunksize = max(1, len(face_ids) // (self.workers * 4))
+            timed = list(self._executor.map(_evaluate_face_in_worker, face_ids, chunksize=chunksize))
+        self.timings.extend(timing for _, timing in timed)
+        return [result for result, _ in timed]
 
 
-def optimize_initial_points(vertices, faces, max_attempts=50, verbose=True):
+def optimize_initial_points(vertices, faces, max_attempts=50, verbose=True, workers=1, seed=None,
+                            strategy='random', patience=None, max_seconds=None, bounds=None, topology=None,
+                            known_distortions=None, objective='area', coarse_faces=None, checkpoint_path=None,
+                            resume=False, checkpoint_interval=DEFAULT_INTERVAL, pins='face', scale='area'):
     """
     Optimize initial fixed points selection to minimize overall distortion.
+
+    With face pins the candidates are the pinned faces. With two-point pins they are the anchor vertices of the pins
+    (see igl_api.init_two_point_unfold), each scored on its unwrap scaled to the mesh, and the strategies walk the
+    vertex adjacency: face ids below (history, best face, timings) are then vertex ids.
     
     Args:
         vertices: Mesh vertices array
         faces: Mesh faces array  
         max_attempts: Maximum number of optimization attempts
         verbose: Print progress information
+        workers: Number of worker processes evaluating candidates (0 or None uses all CPU cores)
+        seed: Seed of the candidate selection, the result does not depend on the number of workers. A seed is drawn
+            (and returned) if not given, so every run can be reproduced and resumed
+        strategy: 'random' brute force over random and boundary faces, 'local' steepest descent or 'anneal'
+            simulated annealing over the face adjacency graph from coarse seeds
+        patience: Stop after this many attempts without improvement (None to disable)
+        max_seconds: Wall-clock budget in seconds of this run, the best result found so far is returned (None to
+            disable)
+        bounds: Boundary loops from get_all_bounds, taken from topology if not given
+        topology: MeshTopology of the mesh, built if not given
+        known_distortions: {face_id: distortion} from previous runs on the same mesh and objective (see
+            cache.ResultCache), these candidates are recorded in the history without being evaluated again
+        objective: Distortion minimized, 'area', 'length', 'angle' or 'max' (see metrics.OBJECTIVES)
+        coarse_faces: Run the search on a proxy decimated to about this many faces, then evaluate on the mesh only
+            the faces closest to the COARSE_TOP_K best proxy faces (None to search the mesh itself)
+        checkpoint_path: Write the history and best face to this JSON file every checkpoint_interval seconds and when
+            the search stops (see checkpoint.OptimizationCheckpoint)
+        resume: Continue the search of the checkpoint at checkpoint_path if it exists: its seed is used and its
+            faces are not evaluated again, the result is the one of an uninterrupted run
+        checkpoint_interval: Seconds between two checkpoints
+        pins: 'face' or 'two-point', see flatten (the coarse search needs face pins)
+        scale: Measure fitted by the scale normalization of two-point pins, see metrics.SCALES
         
     Returns:
         dict: {
             'best_face_id': int,
             'best_distortion': float, 
-            'default_distortion': float,
+            'default_distortion': float, distortion of face 0 (of the default two-point pins),
             'improvement_percent': float,
-            'optimization_history': list of (face_id, distortion) tuples
+            'optimization_history': list of (face_id, distortion) tuples,
+            'stop_reason': str,
+            'reused_attempts': int, attempts taken from known_distortions,
+            'candidate_timings': list of {'face_id', 'start' (time.perf_counter), 'seconds', 'worker' (pid)},
+            'coarse': dict or None, proxy search summary when coarse_faces is used,
+            'seed': int, seed of the candidate selection,
+            'resumed_attempts': int, attempts of this run taken from the checkpoint,
+            'pins': str, pins of the candidates
         }
     """
+    if pins not in PINS:
+        raise ValueError(f"Unknown pins '{pins}', expected one of {PINS}")
+    if pins == 'two-point' and coarse_faces is not None:
+        raise ValueError("The coarse search evaluates pinned faces, it does not apply to two-point pins")
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown optimization strategy '{strategy}', expected one of {STRATEGIES}")
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown optimization objective '{objective}', expected one of {OBJECTIVES}")
     if verbose:
-        print(f"Optimizing initial points over {max_attempts} attempts...")
+        print(f"Optimizing initial points over {max_attempts} attempts ({strategy} search, {objective} objective"
+              f"{', two-point pins' if pins == 'two-point' else ''})...")
     
     num_faces = len(faces)
-    optimization_history = []
-    best_face_id = 0
-    best_distortion = float('inf')
-    default_distortion = None
-    
-    # Generate candidate face IDs - mix of random and boundary-biased selection
-    candidate_faces = set()
-    
-    # Add some random faces
-    random_faces = random.sample(range(num_faces), min(max_attempts // 2, num_faces))
-    candidate_faces.update(random_faces)
-    
-    # Add boundary faces (if we can detect them easily)
-    bounds = get_all_bounds(faces)
-    boundary_vertices = set()
-    for loop in bounds:
-        boundary_vertices.update(loop)
-    
-    # Find faces that have vertices on boundaries
-    boundary_faces = []
-    for i, face in enumerate(faces):
-        if any(v in boundary_vertices for v in face):
-            boundary_faces.append(i)
-    
-    # Add some boundary faces to candidates
-    if boundary_faces:
-        boundary_sample = random.sample(boundary_faces, min(max_attempts // 2, len(boundary_faces)))
-        candidate_faces.update(boundary_sample)
-    
-    # Ensure we have exactly max_attempts candidates (pad with more random if needed)
-    while len(candidate_faces) < max_attempts and len(candidate_faces) < num_faces:
-        candidate_faces.add(random.randint(0, num_faces - 1))
-    
-    candidate_faces = list(candidate_faces)[:max_attempts]
-    
-    for attempt, face_id in enumerate(candidate_faces):
-        try:
-            init_points_ids, init_points_pos, plan = init_unfold(vertices, faces, face_id)
-            unwrap = unfold(vertices, faces, init_points_ids, init_points_pos)
-            area_distortion = compute_deformation(vertices, faces, unwrap)
-            overall_distortion = compute_overall_distortion(area_distortion)
-            
-            optimization_history.append((face_id, overall_distortion))
-            
-            # Track default (face_id=0) performance
-            if face_id == 0:
-                default_distortion = overall_distortion
-            
-            # Track best result
-            if overall_distortion < best_distortion:
-                best_distortion = overall_distortion
-                best_face_id = face_id
-                
-            if verbose and attempt % 10 == 0:
-                print(f"  Attempt {attempt + 1}/{max_attempts}: face_id={face_id}, distortion={overall_distortion:.4f}")
-                
-        except Exception as e:
+    # Two-point candidates are anchor vertices scored after scaling, a search of faces cannot resume them
+    pin_options = {'pins': pins, 'scale': scale} if pins == 'two-point' else {}
+    checkpoint = None
+    resumed_faces = set()
+    if checkpoint_path is not None:
+        search_options = {'objective': objective, 'strategy': strategy, 'max_attempts': max_attempts,
+                          'patience': patience, 'coarse_faces': coarse_faces, **pin_options}
+        checkpoint = OptimizationCheckpoint(checkpoint_path, mesh_hash(vertices, faces), search_options,
+                                            checkpoint_interval)
+        state = checkpoint.load() if resume else None
+        if state is not None:
+            if seed is not None and seed != state['options']['seed']:
+                raise ValueError(f"Checkpoint {checkpoint_path} was run with seed {state['options']['seed']}, "
+                                 f"not {seed}")
+            seed = state['options']['seed']
+            resumed_faces = {face_id for face_id, _ in state['history']}
+            known_distortions = {**(known_distortions or {}), **dict(state['history'])}
             if verbose:
-                print(f"  Attempt {attempt + 1} failed with face_id={face_id}: {e}")
-            optimization_history.append((face_id, float('inf')))
+                print(f"Resuming from {checkpoint_path}: {len(state['history'])} attempts, best distortion "
+                      f"{state['best_distortion']:.4f} (face_id={state['best_face_id']}), seed {seed}")
+        elif resume and verbose:
+            print(f"No checkpoint at {checkpoint_path}, starting a new run")
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(63)
+    if checkpoint is not None:
+        checkpoint.options = {'seed': seed, **search_options}
+    rng = random.Random(seed)
+
+    if topology is None:
+        topology = MeshTopology(vertices, faces)
+
+    if pins == 'two-point':
+        # Anchor vertices: the boundary ones are seeded like the boundary faces, the walks follow the mesh edges
+        num_candidates = len(vertices)
+        boundary_faces = two_point_candidates(vertices, faces, topology).tolist()
+        neighbors = topology.vertex_neighbors
+        default_id = int(init_two_point_unfold(vertices, faces, topology)[0][0])
+    else:
+        num_candidates = num_faces
+        # Faces that have vertices on boundaries
+        if bounds is None:
+            boundary_faces = np.flatnonzero(topology.boundary_face_mask).tolist()
+        else:
+            boundary_faces = np.flatnonzero(boundary_face_mask(faces, bounds, len(vertices))).tolist()
+        neighbors = topology.face_neighbors
+        default_id = 0
+
+    coarse = None
+    if coarse_faces is not None and num_faces > coarse_faces:
+        coarse, candidates = _coarse_candidates(vertices, faces, max_attempts, verbose, workers, seed, strategy,
+                                                patience, max_seconds, objective, coarse_faces)
+        refine_start = time.perf_counter()
+
+    with _CandidateEvaluator(topology, workers, objective, pins, scale) as evaluator:
+        batch_size = max(16, 4 * evaluator.workers)
+        if coarse is not None:
+            # The budget was spent on the proxy, the few mapped candidates are all evaluated
+            search = CandidateSearch(evaluator, num_faces, len(candidates), batch_size=batch_size, verbose=verbose,
+                                     known_distortions=known_distortions, checkpoint=checkpoint)
+        else:
+            search = CandidateSearch(evaluator, num_candidates, max_attempts, patience=patience,
+                                     max_seconds=max_seconds, batch_size=batch_size, verbose=verbose,
+                                     known_distortions=known_distortions, checkpoint=checkpoint)
+        try:
+            if coarse is not None:
+                search.evaluate(candidates)
+            elif strategy == 'random':
+                random_search(search, rng, boundary_faces)
+            else:
+                num_seeds = max(1, max_attempts // 4)
+                if strategy == 'local':
+                    local_search(search, rng, boundary_faces, neighbors, num_seeds)
+                else:
+                    anneal_search(search, rng, boundary_faces, neighbors, num_seeds)
+            search.stop_reason = search.stop_reason or 'search end'
+        finally:
+            # Also on Ctrl-C or a failure (stop_reason None), so the attempts done so far can be resumed
+            if checkpoint is not None:
+                checkpoint.update(search, force=True)
     
-    # Calculate default distortion if not already computed
+    best_face_id = search.best_face_id
+    best_distortion = search.best_distortion
+
+    # Default (face_id=0, or the default two-point pins) performance, computed if not already part of the search
+    default_distortion = search.distortions.get(default_id, search.known_distortions.get(default_id))
     if default_distortion is None:
-        try:
-            init_points_ids, init_points_pos, plan = init_unfold(vertices, faces, 0)
-            unwrap = unfold(vertices, faces, init_points_ids, init_points_pos)
-            area_distortion = compute_deformation(vertices, faces, unwrap)
-            default_distortion = compute_overall_distortion(area_distortion)
-        except:
-            default_distortion = float('inf')
+        default_distortion, _ = _evaluate_face(topology, default_id, objective, pins, scale)
     
     improvement_percent = ((default_distortion - best_distortion) / default_distortion) * 100 if default_distortion > 0 else 0
+    if coarse is not None:
+        coarse['refine_seconds'] = time.perf_counter() - refine_start
     
     if verbose:
-        print(f"Optimization complete!")
-        print(f"  Default distortion (face_id=0): {default_distortion:.4f}")
-        print(f"  Best distortion (face_id={best_face_id}): {best_distortion:.4f}")
+        print(f"Optimization complete! ({len(search.history)} attempts, {search.reused} reused from previous runs, "
+              f"stopped on {search.stop_reason or 'search end'})")
+        label = 'face_id' if pins == 'face' else 'anchor vertex'
+        print(f"  Default distortion ({label}={default_id}): {default_distortion:.4f}")
+        print(f"  Best distortion ({label}={best_face_id}): {best_distortion:.4f}")
         print(f"  Improvement: {improvement_percent:.1f}%")
+        if coarse is not None:
+            print(f"  Coarse search: best proxy distortion {coarse['proxy_best_distortion']:.4f} on "
+                  f"{coarse['proxy_faces']} faces, {coarse['candidates']} candidates evaluated on the mesh")
     
     return {
         'best_face_id': best_face_id,
         'best_distortion': best_distortion,
         'default_distortion': default_distortion,
         'improvement_percent': improvement_percent,
-        'optimization_history': optimization_history
+        'optimization_history': search.history,
+        'stop_reason': search.stop_reason or 'search end',
+        'reused_attempts': search.reused,
+        'candidate_timings': evaluator.timings,
+        'coarse': coarse,
+        'seed': seed,
+        # Faces of the checkpoint replayed by this run, not evaluated again
+        'resumed_attempts': sum(face_id in resumed_faces for face_id, _ in search.history),
+        'pins': pins
+    }
+
+
+def _coarse_candidates(vertices, faces, max_attempts, verbose, workers, seed, strategy, patience, max_seconds,
+                       objective, coarse_faces):
+    """
+    Search a decimated proxy of the mesh and map its best faces back to the mesh.
+
+    Returns:
+        tuple: (summary dict of the proxy search, mesh face ids to evaluate, best proxy faces first)
+    """
+    start = time.perf_counter()
+    proxy_vertices, proxy_faces = decimate(vertices, faces, coarse_faces)
+    decimation_seconds = time.perf_counter() - start
+    if verbose:
+        print(f"Coarse search on a proxy of {len(proxy_faces)} faces (decimated in {decimation_seconds:.1f}s)")
+    proxy_results = optimize_initial_points(proxy_vertices, proxy_faces, max_attempts, verbose=verbose,
+                                            workers=workers, seed=seed, strategy=strategy, patience=patience,
+                                            max_seconds=max_seconds, objective=objective)
+    ranked = sorted((distortion, face_id) for face_id, distortion in dict(proxy_results['optimization_history']).items()
+                    if distortion != float('inf'))
+    best_proxy_faces = [face_id for _, face_id in ranked[:COARSE_TOP_K]] or [proxy_results['best_face_id']]
+    centroids = proxy_vertices[proxy_faces[best_proxy_faces]].mean(axis=1)
+    candidates = list(dict.fromkeys(nearest_faces(vertices, faces, centroids, COARSE_NEIGHBORS).ravel().tolist()))
+    summary = {
+        'proxy_faces': len(proxy_faces),
+        'proxy_best_face_id': proxy_results['best_face_id'],
+        'proxy_best_distortion': proxy_results['best_distortion'],
+        'proxy_attempts': len(proxy_results['optimization_history']),
+        'candidates': len(candidates),
+        'decimation_seconds': decimation_seconds,
+        'proxy_seconds': time.perf_counter() - start - decimation_seconds,
+    }
+    return summary, candidates
+
+
+def flatten(vertices, faces, face_id=0, optimize=False, max_attempts=50, topology=None, verbose=True, logger=None,
+            profiler=None, pins='face', scale='area', **optimize_options):
+    """
+    Flatten a mesh: compute only, without file, display or cache access.
+
+    Args:
+        vertices: Mesh vertices array
+        faces: Mesh faces array
+        face_id: Face whose vertices are pinned (ignored if optimize is enabled or pins is 'two-point')
+        optimize: Search the pinned face (the anchor of two-point pins) minimizing the distortion with
+            optimize_initial_points
+        max_attempts: Number of optimization attempts
+        topology: MeshTopology of the mesh, built if not given
+        verbose: Print optimization progress
+        logger: logging.Logger receiving the 3D/2D area summary of the result
+        profiler: profiling.Profiler timing the stages, a new one if not given
+        pins: 'face' pins the vertices of a face, 'two-point' pins a vertex and the boundary vertex farthest from it,
+            and scales the unwrap to the mesh (see igl_api.init_two_point_unfold)
+        scale: Measure fitted by the scale normalization of two-point pins, see metrics.SCALES
+        **optimize_options: Other options of optimize_initial_points (workers, seed, strategy, ...)
+
+    Returns:
+        dict: {
+            'unwrap': UV coordinates of the vertices,
+            'deformation': per-face area change (%),
+            'distortion': overall distortion,
+            'distortion_metrics': {metric: RMS over faces} of every metrics.METRICS,
+            'face_id_used': int, None with two-point pins,
+            'init_points_ids', 'init_points_pos', 'plan': pinned vertices, their 2D positions and their 3D plane,
+            'scale_factor': scale normalization of two-point pins (None with face pins),
+            'optimization_results': dict or None,
+            'topology': MeshTopology,
+            'metrics': timings and memory samples, see profiling.Profiler.metrics
+        }
+    """
+    if pins not in PINS:
+        raise ValueError(f"Unknown pins '{pins}', expected one of {PINS}")
+    if profiler is None:
+        profiler = Profiler()
+    if topology is None:
+        topology = MeshTopology(vertices, faces)
+    optimization_results = None
+    scale_factor = None
+    if optimize:
+        with profiler.stage('optimize'):
+            optimization_results = optimize_initial_points(vertices, faces, max_attempts, verbose=verbose,
+                                                           topology=topology, pins=pins, scale=scale,
+                                                           **optimize_options)
+        profiler.add_candidates(optimization_results['candidate_timings'])
+        face_id = optimization_results['best_face_id']
+
+    if pins == 'two-point':
+        anchor = face_id if optimize else None
+        face_id = None
+        with profiler.stage('unfold'):
+            init_points_ids, init_points_pos, plan = init_two_point_unfold(vertices, faces, topology, anchor)
+            unwrap = unfold(vertices, faces, init_points_ids, init_points_pos, topology=topology)
+            unwrap, scale_factor = normalize_scale(vertices, faces, unwrap, scale, topology)
+            init_points_pos = unwrap[init_points_ids].astype(np.double)
+    else:
+        with profiler.stage('unfold'):
+            init_points_ids, init_points_pos, plan = init_unfold(vertices, faces, face_id, topology)
+            unwrap = unfold(vertices, faces, init_points_ids, init_points_pos, topology=topology)
+    with profiler.stage('score'):
+        deformation = compute_deformation(vertices, faces, unwrap, topology, logger)
+        distortion_metrics = topology.distortion_metrics.overall(unwrap)
+    return {
+        'unwrap': unwrap,
+        'deformation': deformation,
+        'distortion': compute_overall_distortion(deformation),
+        'distortion_metrics': distortion_metrics,
+        'face_id_used': face_id,
+        'init_points_ids': init_points_ids,
+        'init_points_pos': init_points_pos,
+        'plan': plan,
+        'scale_factor': scale_factor,
+        'optimization_results': optimization_results,
+        'topology': topology,
+        'metrics': profiler.metrics()
     }
 
 
+def _console_logger():
+    """Logger printing bare messages to stdout, like the rest of the command line output."""
+    logger = logging.getLogger(__name__)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
 def main(path_stl=None, path_svg=None, path_dxf=None, vertice_init_id=0, 
-         optimize_initial_points_flag=False, max_optimization_attempts=50, skip_display=False):
+         optimize_initial_points_flag=False, max_optimization_attempts=50, skip_display=False, workers=1,
+         optimization_strategy='random', patience=None, max_seconds=None, seed=None, cache_dir=None,
+         use_cache=True, loader='auto', merge_tolerance=None, verbose=True, objective='area', coarse_faces=None,
+         charts=None, chart_angle=None, profile_path=None, low_memory=False, path_png=None, skip_png=False,
+         png_dpi=DEFAULT_DPI, checkpoint_path=None, resume=False, simplify_tolerance=None, fit_arcs=False,
+         pins='face', scale='area', path_artifact=None):
     """
     Main function to flatten an STL surface.
     
     Args:
         path_stl: Path to STL file
-        path_png: Path for output PNG visualization
+        path_png: Path of the PNG preview (default: same as STL with .png extension)
         path_svg: Path for output SVG file
         path_dxf: Path for output DXF file
         vertice_init_id: Face ID to use for initial points (ignored if optimization enabled)
         optimize_initial_points_flag: Enable optimization of initial points
         max_optimization_attempts: Number of optimization attempts
-        skip_display: Skip showing the visualization window (still saves PNG)
+        skip_display: Skip showing the visualization window (still saves the PNG)
+        workers: Number of worker processes used by the optimization (0 uses all CPU cores)
+        optimization_strategy: Candidate search strategy, 'random', 'local' or 'anneal'
+        patience: Stop the optimization after this many attempts without improvement
+        max_seconds: Wall-clock budget of the optimization in seconds
+        seed: Seed of the optimization candidate selection
+        cache_dir: Directory of the result cache (default: $XDG_CACHE_HOME/flatten_surface)
+        use_cache: Reuse cached results and optimization histories of the same mesh
+        loader: Mesh loader, 'auto', 'native' or 'trimesh' (see import_export.load)
+        merge_tolerance: Distance under which STL vertices are merged by the native loader
+        verbose: Print progress and area summaries, nothing is printed otherwise
+        objective: Distortion minimized by the optimization, 'area', 'length', 'angle' or 'max'
+        coarse_faces: Search a proxy decimated to about this many faces first (see optimize_initial_points)
+        charts: Split the mesh into charts flattened independently, 'auto' by normal clustering or the path of a
+            face-group file (see charts.read_face_groups), None to flatten the mesh as one chart
+        chart_angle: Largest normal deviation within an automatic chart in degrees (default: charts.DEFAULT_MAX_ANGLE)
+        profile_path: Write the stage and candidate timings to this path in the Chrome trace format
+        low_memory: Load float32 vertices and int32 faces, kept up to the export (see import_export.load)
+        skip_png: Do not write the PNG preview
+        png_dpi: Resolution of the PNG preview
+        checkpoint_path: Checkpoint the optimization to this JSON file (default with resume: same as STL with
+            .checkpoint.json extension), not used with charts
+        resume: Continue the optimization of the checkpoint if it exists (see optimize_initial_points)
+        simplify_tolerance: Simplify the exported outlines, no boundary vertex farther than this distance (mm) from
+            them (see simplify.simplify_outlines), None exports every boundary vertex
+        fit_arcs: Also replace runs of simplified segments by circular arcs (needs simplify_tolerance)
+        pins: 'face' or 'two-point', pinned vertices of the LSCM (see flatten), the optimization searches either
+        scale: Measure fitted by the scale normalization of two-point pins, see metrics.SCALES
+        path_artifact: Also write the mesh, UVs, per-face metrics, boundary loops and optimization history to this
+            binary artifact (see artifact.write_artifact), from which the outputs can be regenerated
+
+    Returns:
+        dict: Results, with the stage timings, candidate timings and memory samples under 'metrics'
+            (see profiling.Profiler.metrics), and the point counts and largest deviation of the simplified outlines
+            under 'simplification' (None if not simplified), and path_artifact under 'artifact'
     """
+    profiler = Profiler()
     if not path_stl:
+        import tkinter as tk
+        from tkinter import filedialog
+
         root = tk.Tk()
         root.withdraw()
         path_stl = filedialog.askopenfilename(
@@ -147,32 +534,122 @@ def main(path_stl=None, path_svg=None, path_dxf=None, vertice_init_id=0,
         path_svg = os.path.join(os.path.dirname(path_stl), ".".join(os.path.basename(path_stl).split(".")[:-1]) + ".svg")
     if path_dxf is None:
         path_dxf = os.path.join(os.path.dirname(path_stl), ".".join(os.path.basename(path_stl).split(".")[:-1]) + ".dxf")
+    if path_png is None and not skip_png:
+        path_png = os.path.join(os.path.dirname(path_stl), ".".join(os.path.basename(path_stl).split(".")[:-1]) + ".png")
+    if skip_png:
+        path_png = None
+    if fit_arcs and simplify_tolerance is None:
+        raise ValueError("Fitting arcs needs a simplification tolerance")
+    if resume and checkpoint_path is None:
+        checkpoint_path = os.path.join(os.path.dirname(path_stl),
+                                       ".".join(os.path.basename(path_stl).split(".")[:-1]) + ".checkpoint.json")
     
-    # Load mesh
-    vertices, faces = load(path_stl)
-    bounds = get_all_bounds(faces)
+    # Load mesh, its topology is shared by all the stages below
+    with profiler.stage('load'):
+        vertices, faces = load(path_stl, loader, merge_tolerance, low_memory)
+        topology = MeshTopology(vertices, faces)
+    if charts is not None:
+        return _flatten_charts(vertices, faces, topology, charts, chart_angle, path_svg, path_dxf, path_png, png_dpi,
+                               skip_display, verbose, workers, profiler, profile_path, simplify_tolerance, fit_arcs,
+                               path_artifact, dict(optimize=optimize_initial_points_flag, max_attempts=max_optimization_attempts,
+                                    strategy=optimization_strategy, patience=patience, max_seconds=max_seconds,
+                                    seed=seed, objective=objective, coarse_faces=coarse_faces, pins=pins,
+                                    scale=scale))
+    with profiler.stage('boundaries'):
+        bounds = get_all_bounds(faces, topology)
     
     # Initialize optimization results (will remain None if optimization is disabled)
     optimization_results = None
-    
-    # Optimize initial points if requested
-    if optimize_initial_points_flag:
-        optimization_results = optimize_initial_points(vertices, faces, max_optimization_attempts)
-        # Use the optimized face ID
-        vertice_init_id = optimization_results['best_face_id']
-    
-    # Perform the unfolding with the selected (or optimized) initial points
-    init_points_ids, init_points_pos, plan = init_unfold(vertices, faces, vertice_init_id)
-    unwrap = unfold(vertices, faces, init_points_ids, init_points_pos)
-    deformation = compute_deformation(vertices, faces, unwrap)
+
+    # Results are deterministic for a mesh and parameters, unless the optimization is random or time bounded
+    cache = ResultCache(cache_dir) if use_cache else None
+    cached = None
+    result_key = history_key = None
+    if cache is not None:
+        with profiler.stage('cache'):
+            mesh_key = mesh_hash(vertices, faces)
+            # Two-point candidates are anchor vertices scored after scaling, not comparable with the face ones
+            pin_params = {'pins': pins, 'scale': scale} if pins == 'two-point' else {}
+            history_key = params_key(mesh_key, 'history', {'objective': objective, **pin_params})
+            if not optimize_initial_points_flag:
+                result_key = params_key(mesh_key, 'result', pin_params or {'face_id': vertice_init_id})
+            elif seed is not None and max_seconds is None:
+                result_key = params_key(mesh_key, 'result', {
+                    'attempts': max_optimization_attempts, 'strategy': optimization_strategy, 'patience': patience,
+                    'seed': seed, 'objective': objective, 'coarse_faces': coarse_faces, **pin_params})
+            if result_key is not None:
+                cached = cache.get_result(result_key)
+
+    if cached is not None:
+        if verbose:
+            print("Using cached result")
+        optimization_results = cached['optimization_results']
+        vertice_init_id = cached['face_id_used']
+        unwrap, deformation = cached['unwrap'], cached['deformation']
+        with profiler.stage('unfold'):
+            if pins == 'two-point':
+                # The anchor of the pins is cached as the face used
+                init_points_ids, _, plan = init_two_point_unfold(vertices, faces, topology, vertice_init_id)
+                init_points_pos = unwrap[init_points_ids].astype(np.double)
+                vertice_init_id = None
+            else:
+                init_points_ids, init_points_pos, plan = init_unfold(vertices, faces, vertice_init_id, topology)
+    else:
+        # Optimize initial points if requested, faces evaluated by previous runs on this mesh are not evaluated again
+        optimize_options = {}
+        if optimize_initial_points_flag:
+            optimize_options = dict(workers=workers, strategy=optimization_strategy, patience=patience,
+                                    max_seconds=max_seconds, seed=seed, objective=objective, coarse_faces=coarse_faces,
+                                    known_distortions=cache.get_history(history_key) if cache is not None else None,
+                                    checkpoint_path=checkpoint_path, resume=resume)
+        # Perform the unfolding with the selected (or optimized) initial points
+        result = flatten(vertices, faces, vertice_init_id, optimize_initial_points_flag, max_optimization_attempts,
+                         topology=topology, verbose=verbose, logger=_console_logger() if verbose else None,
+                         profiler=profiler, pins=pins, scale=scale, **optimize_options)
+        if verbose and pins == 'two-point':
+            print(f"Two-point pins: vertices {result['init_points_ids'].tolist()}, "
+                  f"scale factor {result['scale_factor']:.6g} ({scale})")
+        optimization_results = result['optimization_results']
+        vertice_init_id = result['face_id_used']
+        init_points_ids, init_points_pos, plan = result['init_points_ids'], result['init_points_pos'], result['plan']
+        unwrap, deformation = result['unwrap'], result['deformation']
+        if cache is not None:
+            with profiler.stage('cache'):
+                if optimization_results is not None:
+                    cache.put_history(history_key, optimization_results['optimization_history'])
+                if result_key is not None:
+                    cache.put_result(result_key, init_points_ids[0] if pins == 'two-point' else vertice_init_id,
+                                     unwrap, deformation, optimization_results)
+    with profiler.stage('metrics'):
+        distortion_metrics = topology.distortion_metrics.overall(unwrap)
+    if verbose:
+        print("Distortion (RMS over faces): " +
+              ", ".join(f"{name} {value:.4f}%" for name, value in distortion_metrics.items()))
+    if verbose and len(faces) >= LARGE_MESH_FACES:
+        print(topology.memory_report())
     
     # Generate visualization and export
     if not skip_display:
-        plot(vertices, faces, unwrap, init_points_pos, plan, init_points_ids, bounds, deformation, optimization_results)
+        from .display import plot
+
+        with profiler.stage('display'):
+            plot(vertices, faces, unwrap, init_points_pos, plan, init_points_ids, bounds, deformation,
+                 optimization_results)
+    if path_png:
+        with profiler.stage('render'):
+            render_preview(path_png, vertices, faces, unwrap, deformation, optimization_results, bounds, png_dpi)
 
     # Always export both svg and dxf by default
-    export_svg(unwrap, bounds, path_svg)
-    export_dxf(unwrap, bounds, path_dxf)
+    simplification = _export(unwrap, bounds, path_svg, path_dxf, simplify_tolerance, fit_arcs, profiler, verbose)
+    if path_artifact:
+        with profiler.stage('artifact'):
+            write_artifact(path_artifact, vertices, faces, unwrap, bounds, topology.distortion_metrics.per_face(unwrap),
+                           optimization_results=optimization_results,
+                           info={'source': os.path.abspath(path_stl), 'face_id_used': vertice_init_id, 'pins': pins,
+                                 'scale': scale if pins == 'two-point' else None,
+                                 'distortion_metrics': distortion_metrics, 'simplification': simplification})
+        if verbose:
+            print(f"Artifact written to {path_artifact}")
     
     # Return results for programmatic use
     return {
@@ -180,6 +657,110 @@ def main(path_stl=None, path_svg=None, path_dxf=None, vertice_init_id=0,
         'faces': faces,
         'unwrap': unwrap,
         'deformation': deformation,
+        'distortion_metrics': distortion_metrics,
         'optimization_results': optimization_results,
-        'face_id_used': vertice_init_id
+        'face_id_used': vertice_init_id,
+        'topology': topology,
+        'simplification': simplification,
+        'artifact': path_artifact,
+        'metrics': _finish_profile(profiler, profile_path, verbose)
+    }
+
+
+def _export(unwrap, bounds, path_svg, path_dxf, simplify_tolerance, fit_arcs, profiler, verbose, layers=None):
+    """Simplify the outlines if requested and export them, returns the simplification stats (None if not simplified)."""
+    stats = bulges = None
+    if simplify_tolerance is not None:
+        with profiler.stage('simplify'):
+            bounds, bulges, stats = simplify_outlines(unwrap, bounds, simplify_tolerance, fit_arcs)
+        if verbose:
+            print(f"Simplified outlines: {stats['points_before']} -> {stats['points_after']} points "
+                  f"({stats['reduction_percent']:.1f}% fewer" + (f", {stats['arcs']} arcs" if fit_arcs else "") +
+                  f"), max deviation {stats['max_deviation']:.4g} mm")
+    with profiler.stage('export'):
+        export_outlines(unwrap, bounds, path_svg, path_dxf, layers=layers, bulges=bulges)
+    return stats
+
+
+def _finish_profile(profiler, profile_path, verbose):
+    """Write the Chrome trace if requested, returns the profiler metrics."""
+    if profile_path:
+        profiler.write_chrome_trace(profile_path)
+        if verbose:
+            print(f"Profile written to {profile_path}")
+    return profiler.metrics()
+
+
+def _flatten_charts(vertices, faces, topology, charts, chart_angle, path_svg, path_dxf, path_png, png_dpi, skip_display,
+                    verbose, workers, profiler, profile_path, simplify_tolerance, fit_arcs, path_artifact, options):
+    """
+    main() for a mesh split into charts: every chart is flattened in a process pool, the charts are laid out side by
+    side and exported with one layer per chart. Results are not cached.
+
+    Returns:
+        dict: As main(), with vertices and faces of the laid out mesh (seams duplicated), and per chart its face ids,
+        distortion and face used or error under 'charts'
+    """
+    from .charts import DEFAULT_MAX_ANGLE, segment_by_normals, read_face_groups, flatten_charts, layout_charts
+
+    with profiler.stage('segment'):
+        if charts == 'auto':
+            labels = segment_by_normals(topology, chart_angle if chart_angle is not None else DEFAULT_MAX_ANGLE)
+        else:
+            labels = read_face_groups(charts, len(faces))
+    if verbose:
+        print(f"Flattening {labels.max() + 1} charts...")
+    with profiler.stage('flatten_charts'):
+        chart_results = flatten_charts(vertices, faces, labels, workers, verbose, **options)
+    placed = [chart_id for chart_id, chart in enumerate(chart_results) if 'error' not in chart]
+    if not placed:
+        raise Exception("Impossible to unfold any chart")
+    with profiler.stage('layout'):
+        layout = layout_charts(vertices, faces, chart_results)
+    # Faces of the charts that failed to flatten are -1 rows, left out of the display, preview and artifact
+    flattened = ~np.isnan(layout['deformation'])
+    placed_faces = layout['faces'][flattened]
+    deformation = layout['deformation'][flattened]
+    if verbose:
+        print(f"Overall distortion of {len(placed)}/{len(chart_results)} charts: "
+              f"{compute_overall_distortion(deformation):.4f}")
+
+    if not skip_display:
+        from .display import plot
+
+        first = chart_results[placed[0]]
+        init_points_ids = first['init_points_ids'] + layout['vertex_offsets'][placed[0]]
+        with profiler.stage('display'):
+            plot(layout['vertices'], placed_faces, layout['unwrap'], layout['unwrap'][init_points_ids],
+                 first['plan'], init_points_ids, layout['bounds'], deformation)
+    if path_png:
+        with profiler.stage('render'):
+            render_preview(path_png, layout['vertices'], placed_faces, layout['unwrap'], deformation,
+                           bounds=layout['bounds'], dpi=png_dpi)
+
+    simplification = _export(layout['unwrap'], layout['bounds'], path_svg, path_dxf, simplify_tolerance, fit_arcs,
+                             profiler, verbose, layout['layers'])
+    chart_summaries = [{key: chart[key] for key in ('distortion', 'face_id_used', 'error') if key in chart}
+                       for chart in chart_results]
+    if path_artifact:
+        with profiler.stage('artifact'):
+            write_artifact(path_artifact, layout['vertices'], placed_faces, layout['unwrap'], layout['bounds'],
+                           {'area': deformation}, layout['layers'],
+                           info={'charts': chart_summaries, 'simplification': simplification})
+        if verbose:
+            print(f"Artifact written to {path_artifact}")
+
+    return {
+        'vertices': layout['vertices'],
+        'faces': layout['faces'],
+        'unwrap': layout['unwrap'],
+        'deformation': layout['deformation'],
+        'optimization_results': None,
+        'face_id_used': None,
+        'topology': topology,
+        'charts': [{key: chart[key] for key in ('face_ids', 'distortion', 'face_id_used', 'error') if key in chart}
+                   for chart in chart_results],
+        'simplification': simplification,
+        'artifact': path_artifact,
+        'metrics': _finish_profile(profiler, profile_path, verbose)
     }
@@ -1,16 +1,41 @@
 import numpy as np
 
 
+# Faces per chunk of face_geometry, bounds its float64 temporaries to a few MiB
+FACE_CHUNK = 1 << 16
+
+
 def plane_through_3_points(x1, y1, z1, x2, y2, z2, x3, y3, z3):
     a, b, c = np.cross(np.array([x2 - x1, y2 - y1, z2 - z1]), np.array([x3 - x1, y3 - y1, z3 - z1]))
     d = a*x1 + b*y1 + c*z1
     return a, b, c, d
 
 
+def best_fit_plane(points):
+    """Least-squares plane (a, b, c, d) of points, a*x + b*y + c*z = d with (a, b, c) its unit normal."""
+    points = np.asarray(points, dtype=np.float64)
+    center = points.mean(axis=0)
+    centered = points - center
+    # Normal: eigenvector of the smallest eigenvalue of the 3x3 covariance
+    a, b, c = np.linalg.eigh(centered.T @ centered)[1][:, 0]
+    return a, b, c, a*center[0] + b*center[1] + c*center[2]
+
+
 def rotation_matrix_from_vectors(vec1, vec2):
+    """
+    Rotation matrix turning the direction of vec1 into the direction of vec2.
+
+    Parallel or opposite vectors (a pinned face parallel to the xy plane) rotate about an axis orthogonal to vec1,
+    any other pair gives the same matrix as the plain axis-angle formula.
+    """
     axis = np.cross(vec1, vec2)
-    axis = axis / np.linalg.norm(axis)
-    angle = np.arccos(np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2)))
+    axis_norm = np.linalg.norm(axis)
+    if axis_norm == 0:
+        # Parallel vectors: any axis orthogonal to vec1 (the rotation angle is 0 or pi)
+        axis = np.cross(vec1, np.eye(3)[np.argmin(np.abs(vec1))])
+        axis_norm = np.linalg.norm(axis)
+    axis = axis / axis_norm
+    angle = np.arccos(np.clip(np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2)), -1.0, 1.0))
     cos_angle = np.cos(angle)
     sin_angle = np.sin(angle)
     one_minus_cos = 1.0 - cos_angle
@@ -30,16 +55,153 @@ def plane_normal_vector(plan):
     return normal_vector / np.linalg.norm(normal_vector)
 
 
-def find_boundary_loop(start_vertex, adjacency_list):
-    boundary_loop = []
-    current_vertex = start_vertex
-    previous_vertex = None
-    while True:
-        boundary_loop.append(current_vertex)
-        neighbors = adjacency_list[current_vertex]
-        next_vertex = neighbors[0] if neighbors[0] != previous_vertex else neighbors[1]
-        if next_vertex == start_vertex:
-            break
-        previous_vertex = current_vertex
-        current_vertex = next_vertex
-    return boundary_loop, adjacency_list
+def face_geometry(vertices, faces, normals=True, chunk_faces=FACE_CHUNK):
+    """
+    Area and unit normal of each face, computed in chunks of faces.
+
+    Each chunk is computed in float64 whatever the vertex dtype, and stored in the vertex float dtype, so float32
+    meshes get float32 results without the precision loss of float32 cross products nor #F by 3 temporaries.
+
+    Returns:
+        tuple: (areas, normals), normals (zero for degenerate faces) is None if not requested
+    """
+    dtype = vertices.dtype if vertices.dtype.kind == 'f' else np.float64
+    areas = np.empty(len(faces), dtype=dtype)
+    face_normals = np.empty((len(faces), 3), dtype=dtype) if normals else None
+    for start in range(0, len(faces), chunk_faces):
+        chunk = faces[start:start + chunk_faces]
+        v0 = vertices[chunk[:, 0]].astype(np.float64)
+        cross = np.cross(vertices[chunk[:, 1]] - v0, vertices[chunk[:, 2]] - v0)
+        double_areas = np.linalg.norm(cross, axis=1)
+        areas[start:start + len(chunk)] = 0.5 * double_areas
+        if normals:
+            unit = np.zeros_like(cross)
+            np.divide(cross, double_areas[:, None], out=unit, where=double_areas[:, None] > 0)
+            face_normals[start:start + len(chunk)] = unit
+    return areas, face_normals
+
+
+def boundary_edges(faces):
+    """Directed boundary edges (#E by 2), the face edges used by a single face, oriented as in their face."""
+    half_edges = faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+    low = half_edges.min(axis=1).astype(np.int64)
+    high = half_edges.max(axis=1).astype(np.int64)
+    _, inverse, counts = np.unique(low * (int(faces.max()) + 1) + high, return_inverse=True, return_counts=True)
+    return half_edges[counts[inverse.ravel()] == 1]
+
+
+def nonmanifold_boundary_vertices(edges):
+    """Vertices where several boundary loops touch, i.e. with more than two boundary edges."""
+    vertex_ids, counts = np.unique(edges.ravel(), return_counts=True)
+    return vertex_ids[counts > 2]
+
+
+def _list_rank(successor):
+    """Number of steps from each node to the end of its list (a node being its own successor), by pointer jumping."""
+    rank = (successor != np.arange(len(successor))).astype(np.int64)
+    successor = successor.copy()
+    for _ in range(max(1, int(np.ceil(np.log2(len(successor)))))):
+        rank += rank[successor]
+        successor = successor[successor]
+    return rank
+
+
+def _wedge_successors(edges, faces, vertex_ids):
+    """
+    {incoming edge: outgoing edge} (indices into edges) at the given boundary vertices, pairing the two boundary edges
+    of each wedge of faces around the vertex, found by walking from face to face across the interior edges.
+    """
+    pinched = set(vertex_ids.tolist())
+    following = {}
+    for a, b, c in faces[np.isin(faces, vertex_ids).any(axis=1)].tolist():
+        following[a, b], following[b, c], following[c, a] = (b, c), (c, a), (a, b)
+    outgoing = {(a, b): index for index, (a, b) in enumerate(edges.tolist()) if a in pinched}
+    successors = {}
+    for index, (a, b) in enumerate(edges.tolist()):
+        if b not in pinched:
+            continue
+        edge = following.get((a, b))
+        # A wedge has fewer faces than the vertex, more steps means non-manifold edges
+        for _ in range(len(following)):
+            if edge is None or edge in outgoing:
+                break
+            edge = following.get((edge[1], edge[0]))
+        if edge not in outgoing:
+            raise ValueError(f"Cannot follow the faces around boundary vertex {b}")
+        successors[index] = outgoing[edge]
+    return successors
+
+
+def boundary_loops(edges, faces=None):
+    """
+    Split directed boundary edges into closed loops with array operations only.
+
+    Each incoming boundary edge of a vertex is paired with an outgoing one, which gives a next-edge permutation whose
+    cycles are the loops. Cycles are labelled by their smallest edge id and ordered by pointer jumping. At
+    non-manifold boundary vertices, where loops touch (a bow-tie), any pairing gives closed loops: with faces, each
+    incoming edge is paired with the outgoing edge of its own wedge of faces, so the touching loops are split there
+    (a walk over the faces of these few vertices). Without faces, the loops may be merged into one loop through the
+    vertex.
+
+    Args:
+        edges: Directed boundary edges (#E by 2), see boundary_edges
+        faces: Faces the edges come from, to split the loops at non-manifold boundary vertices
+
+    Returns:
+        list of int arrays: Vertex ids of each loop in walking order
+
+    Raises:
+        ValueError: If the edges are not consistently oriented (a vertex with more outgoing than incoming edges)
+    """
+    num_edges = len(edges)
+    if num_edges == 0:
+        return []
+    out_order = np.argsort(edges[:, 0], kind='stable')
+    in_order = np.argsort(edges[:, 1], kind='stable')
+    if not np.array_equal(edges[out_order, 0], edges[in_order, 1]):
+        raise ValueError("Boundary edges are not consistently oriented")
+    next_edge = np.empty(num_edges, dtype=np.int64)
+    next_edge[in_order] = out_order
+    pinched = nonmanifold_boundary_vertices(edges)
+    if faces is not None and len(pinched):
+        successors = _wedge_successors(edges, np.asarray(faces), pinched)
+        next_edge[list(successors)] = list(successors.values())
+
+    # Label each cycle with its smallest edge id
+    label = np.arange(num_edges)
+    jump = next_edge.copy()
+    for _ in range(int(np.ceil(np.log2(num_edges))) + 1):
+        label = np.minimum(label, label[jump])
+        jump = jump[jump]
+
+    # Cut each cycle before its smallest edge and rank the edges from there
+    successor = np.where(label[next_edge] == next_edge, np.arange(num_edges), next_edge)
+    position = -_list_rank(successor)
+    order = np.lexsort((position, label))
+    starts = np.flatnonzero(np.diff(label[order])) + 1
+    return np.split(edges[order, 0].astype(np.int64), starts)
+
+
+def boundary_face_mask(faces, bounds, num_vertices=None):
+    """Boolean mask of the faces having at least one vertex on a boundary loop."""
+    if num_vertices is None:
+        num_vertices = int(faces.max()) + 1
+    on_boundary = np.zeros(num_vertices, dtype=bool)
+    if len(bounds):
+        on_boundary[np.concatenate(bounds)] = True
+    return on_boundary[faces].any(axis=1)
+
+
+def nearest_faces(vertices, faces, points, count=1):
+    """
+    Faces whose centroids are the closest to each point.
+
+    Returns:
+        np.ndarray: #points by count face ids, closest first
+    """
+    from scipy.spatial import cKDTree
+
+    centroids = vertices[faces].mean(axis=1)
+    count = min(count, len(faces))
+    _, ids = cKDTree(centroids).query(np.asarray(points, dtype=np.float64), k=count)
+    return np.asarray(ids, dtype=np.int64).reshape(len(points), count)
@@ -1,38 +1,243 @@
+import os
+import re
+
 import numpy as np
-import svgwrite
-import trimesh
-import ezdxf
 
 
-def load(path):
+LOADERS = ('auto', 'native', 'trimesh')
+
+# Binary STL: 80 bytes header, uint32 triangle count, then one 50 bytes record per triangle
+STL_HEADER_SIZE = 84
+STL_RECORD = np.dtype([('normal', '<f4', (3,)), ('vertices', '<f4', (3, 3)), ('attribute', '<u2')])
+
+_ASCII_VERTEX = re.compile(rb'vertex\s+(\S+)\s+(\S+)\s+(\S+)')
+
+# Points formatted at once by the exporters
+EXPORT_CHUNK = 1 << 16
+
+# (vertices, faces) dtypes of the loaded meshes, halved in low-memory mode
+DTYPES = (np.float64, np.int64)
+LOW_MEMORY_DTYPES = (np.float32, np.int32)
+
+
+def load(path, loader='auto', merge_tolerance=None, low_memory=False):
+    """
+    Load a mesh as (vertices, faces) arrays.
+
+    Args:
+        path: Mesh file path
+        loader: 'native' STL reader, 'trimesh', or 'auto' (native for STL files, trimesh for other formats or if the
+            native reader cannot parse the file)
+        merge_tolerance: Distance under which STL vertices are merged by the native reader (None merges exact
+            duplicates only)
+        low_memory: Load float32 vertices and int32 faces (LOW_MEMORY_DTYPES) instead of float64 and int64, the
+            pipeline then keeps float32 arrays up to the export, only the LSCM solve runs in float64
+    """
+    if loader not in LOADERS:
+        raise ValueError(f"Unknown loader '{loader}', expected one of {LOADERS}")
+    if loader == 'trimesh' or (loader == 'auto' and not path.lower().endswith('.stl')):
+        return load_trimesh(path, low_memory)
+    try:
+        triangles = read_stl(path)
+    except ValueError:
+        if loader == 'native':
+            raise
+        return load_trimesh(path, low_memory)
+    return merge_vertices(triangles, merge_tolerance, low_memory)
+
+
+def load_trimesh(path, low_memory=False):
+    import trimesh
+
+    vertex_dtype, face_dtype = LOW_MEMORY_DTYPES if low_memory else DTYPES
     mesh = trimesh.load_mesh(path)
     return (
-        np.array(mesh.vertices, dtype=np.float64),
-        np.array(mesh.faces, dtype=np.int64)
+        np.array(mesh.vertices, dtype=vertex_dtype),
+        np.array(mesh.faces, dtype=face_dtype)
     )
 
 
-def export_svg(unwrap, bounds, path_svg):
-    contours = [unwrap[bound] for bound in bounds]
+def read_stl(path):
+    """
+    Triangle corners of a binary or ASCII STL file, #F by 3 by 3.
+
+    Binary files are memory-mapped and the corners are a strided view of the triangle records, nothing is copied.
+    ASCII files are parsed in chunks of lines.
+
+    Raises:
+        ValueError: If the file is neither a valid binary nor an ASCII STL
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.read(STL_HEADER_SIZE)
+    if len(header) == STL_HEADER_SIZE:
+        count = int(np.frombuffer(header, dtype='<u4', offset=80)[0])
+        # Binary files may also start with "solid", the size is the reliable test
+        if size == STL_HEADER_SIZE + count * STL_RECORD.itemsize:
+            if count == 0:
+                return np.empty((0, 3, 3), dtype=np.float32)
+            records = np.memmap(path, dtype=STL_RECORD, mode='r', offset=STL_HEADER_SIZE, shape=(count,))
+            return records['vertices']
+    if header.lstrip().startswith(b'solid'):
+        return _read_ascii_stl(path)
+    raise ValueError(f"{path} is not a valid STL file")
 
-    min_x = float("inf")
-    min_y = float("inf")
-    max_x = float("-inf")
-    max_y = float("-inf")
 
-    for i, contour in enumerate(contours):
-        x, y = contour.T
-        min_x = min(min_x, np.min(x))
-        min_y = min(min_y, np.min(y))
-        max_x = max(max_x, np.max(x))
-        max_y = max(max_y, np.max(y))
+def _read_ascii_stl(path, chunk_bytes=1 << 24):
+    chunks = []
+    with open(path, 'rb') as f:
+        while True:
+            lines = f.readlines(chunk_bytes)
+            if not lines:
+                break
+            coordinates = _ASCII_VERTEX.findall(b''.join(lines))
+            if coordinates:
+                chunks.append(np.array(coordinates, dtype=np.float64))
+    if not chunks:
+        return np.empty((0, 3, 3), dtype=np.float64)
+    points = np.concatenate(chunks)
+    if len(points) % 3:
+        raise ValueError(f"{path} is not a valid STL file, {len(points)} vertices is not a multiple of 3")
+    return points.reshape(-1, 3, 3)
 
-    # Normalize contours
-    for i, contour in enumerate(contours):
-        x, y = contour.T
-        x -= min_x
-        y -= min_y
-        contours[i] = np.array([x, y]).T
+
+def _group_rows(keys):
+    """
+    Group identical rows of a #N by 3 array, returns (first, inverse): index of the first row of each group and group
+    id of each row.
+
+    Rows are hashed to 64 bits and grouped by sorting the hashes, much faster than sorting the rows themselves. The
+    grouping is checked against the rows and recomputed exactly in the unlikely case of a hash collision.
+    """
+    bits = keys.view(np.uint32 if keys.dtype.itemsize == 4 else np.uint64)
+    hashes = np.zeros(len(keys), dtype=np.uint64)
+    for column, multiplier in enumerate((0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9)):
+        hashes ^= bits[:, column].astype(np.uint64) * np.uint64(multiplier)
+    order = np.argsort(hashes)
+    sorted_hashes = hashes[order]
+    is_start = np.empty(len(order), dtype=bool)
+    is_start[:1] = True
+    np.not_equal(sorted_hashes[1:], sorted_hashes[:-1], out=is_start[1:])
+    first = np.minimum.reduceat(order, np.flatnonzero(is_start))
+    inverse = np.empty(len(order), dtype=np.int64)
+    inverse[order] = np.cumsum(is_start) - 1
+    if not np.array_equal(keys, keys[first][inverse]):
+        row_keys = keys.view(np.dtype((np.void, keys.dtype.itemsize * 3))).ravel()
+        _, first, inverse = np.unique(row_keys, return_index=True, return_inverse=True)
+    return first, inverse.ravel()
+
+
+def merge_vertices(triangles, tolerance=None, low_memory=False):
+    """
+    Merge the duplicated corners of a triangle soup into indexed vertices.
+
+    Args:
+        triangles: #F by 3 by 3 triangle corners
+        tolerance: Corners closer than about this distance (same cell of a grid of this size) are merged, None
+            merges exactly equal corners only
+        low_memory: Return float32 vertices and int32 faces
+
+    Returns:
+        tuple: float64 (float32) vertices, in order of first use, and int64 (int32) faces
+    """
+    vertex_dtype, face_dtype = LOW_MEMORY_DTYPES if low_memory else DTYPES
+    points = np.asarray(triangles).reshape(-1, 3)
+    if len(points) == 0:
+        return np.empty((0, 3), dtype=vertex_dtype), np.empty((0, 3), dtype=face_dtype)
+    if tolerance:
+        keys = np.round(points / tolerance).astype(np.int64)
+    else:
+        # Adding 0 turns -0.0 into 0.0 so that both merge
+        keys = np.ascontiguousarray(points + points.dtype.type(0))
+    first, inverse = _group_rows(keys)
+    order = np.argsort(first, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    vertices = points[first[order]].astype(vertex_dtype)
+    faces = rank.astype(face_dtype)[inverse].reshape(-1, 3)
+    return vertices, faces
+
+
+def contour_box(unwrap, bounds):
+    """(min, max) corners of the bounding box of the boundary loops, as float64 arrays."""
+    if not len(bounds):
+        return np.zeros(2), np.zeros(2)
+    low = np.full(2, np.inf)
+    high = np.full(2, -np.inf)
+    for bound in bounds:
+        points = unwrap[bound]
+        low = np.minimum(low, points.min(axis=0))
+        high = np.maximum(high, points.max(axis=0))
+    return low, high
+
+
+def _number_format(dtype):
+    """Shortest round-trip representation of float64 coordinates, 9 significant digits round-trip float32."""
+    return '%.9g' if dtype == np.float32 else '%r'
+
+
+def _format_points(points, template):
+    """
+    Format the rows of points with template (the % format of one point), in bulk.
+
+    Yields strings of EXPORT_CHUNK points, so a huge loop is never held as one string.
+    """
+    for start in range(0, len(points), EXPORT_CHUNK):
+        chunk = points[start:start + EXPORT_CHUNK]
+        yield (template * len(chunk)) % tuple(chunk.ravel().tolist())
+
+
+def _svg_segments(points, bulges, number):
+    """
+    SVG path commands from each point to the next one (the last one to the first), straight lines where the bulge is 0
+    and circular arcs elsewhere, the bulge being the tangent of a quarter of the signed swept angle (as in DXF).
+    """
+    following = np.roll(points, -1, axis=0).astype(np.float64)
+    angle = 4 * np.arctan(bulges)
+    chord = np.linalg.norm(following - points, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        radius = np.abs(chord / (2 * np.sin(angle / 2)))
+    line, arc = f' L{number},{number}', f' A%r,%r 0 %d,%d {number},{number}'
+    for start in range(0, len(points), EXPORT_CHUNK):
+        stop = start + EXPORT_CHUNK
+        values = []
+        for bulge, r, swept, (x, y) in zip(bulges[start:stop].tolist(), radius[start:stop].tolist(),
+                                           angle[start:stop].tolist(), following[start:stop].tolist()):
+            values.extend((x, y) if bulge == 0 else (r, r, abs(swept) > np.pi, bulge > 0, x, y))
+        yield ''.join(line if bulge == 0 else arc for bulge in bulges[start:stop].tolist()) % tuple(values)
+
+
+def _layer_order(num_loops, layers):
+    """Loop indices grouped by layer, layers in order of first appearance, and the layer of each group."""
+    if layers is None:
+        return [(None, range(num_loops))]
+    groups = {}
+    for i in range(num_loops):
+        groups.setdefault(layers[i], []).append(i)
+    return list(groups.items())
+
+
+def export_svg(unwrap, bounds, path_svg, topology=None, layers=None, box=None, bulges=None):
+    """
+    Export the flattened surface as SVG file, in mm.
+
+    The file is streamed loop by loop, coordinates are formatted in bulk.
+
+    Args:
+        unwrap: 2D coordinates of all vertices
+        bounds: List of boundary loops, taken from topology if None
+        path_svg: Output SVG file path
+        topology: MeshTopology of the mesh
+        layers: Layer name of each loop (e.g. the chart of each loop), loops of a layer are grouped under it
+        box: (min, max) corners of the loops from contour_box, computed if not given
+        bulges: Bulge of the segment starting at each vertex of each loop (simplify.simplify_outlines), drawn as
+            circular arcs where non-zero
+    """
+    from xml.sax.saxutils import quoteattr
+
+    if bounds is None:
+        bounds = topology.boundary_loops
+    (min_x, min_y), (max_x, max_y) = box if box is not None else contour_box(unwrap, bounds)
 
     # Calculate dimensions after normalization
     width = max_x - min_x
@@ -40,59 +245,107 @@ def export_svg(unwrap, bounds, path_svg):
     
     # Add small margin
     margin = max(width, height) * 0.05
-    width += 2 * margin
-    height += 2 * margin
+    width = float(width + 2 * margin)
+    height = float(height + 2 * margin)
 
-    # Create SVG with proper dimensions and viewBox
-    dwg = svgwrite.Drawing(path_svg, size=(f'{width}mm', f'{height}mm'), 
-                          viewBox=f'0 0 {width} {height}', profile='tiny')
-    
-    for contour in contours:
-        # Apply margin offset
-        adjusted_contour = contour + margin
-        path_data = "M" + " L".join(f"{x},{y}" for x, y in adjusted_contour) + " Z"
-        dwg.add(dwg.path(d=path_data, fill='none', stroke='black', stroke_width='0.1'))
-    
-    dwg.save()
+    # Normalize contours and apply margin offset, one contour at a time and in the dtype of unwrap
+    offset = np.array([margin - min_x, margin - min_y], dtype=unwrap.dtype)
+    number = _number_format(unwrap.dtype)
+    with open(path_svg, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="utf-8" ?>\n'
+                f'<svg baseProfile="tiny" height="{height!r}mm" version="1.2" viewBox="0 0 {width!r} {height!r}" '
+                f'width="{width!r}mm" xmlns="http://www.w3.org/2000/svg" xmlns:ev="http://www.w3.org/2001/xml-events" '
+                f'xmlns:xlink="http://www.w3.org/1999/xlink"><defs />')
+        for layer, loops in _layer_order(len(bounds), layers):
+            if layer is not None:
+                f.write(f'<g id={quoteattr(str(layer))}>')
+            for i in loops:
+                adjusted_contour = unwrap[bounds[i]] + offset
+                f.write(f'<path d="M{number},{number}' % tuple(adjusted_contour[0].tolist()))
+                if bulges is not None and np.any(bulges[i]):
+                    segments = _svg_segments(adjusted_contour, np.asarray(bulges[i], dtype=np.float64), number)
+                else:
+                    segments = _format_points(adjusted_contour[1:], f' L{number},{number}')
+                for text in segments:
+                    f.write(text)
+                f.write(' Z" fill="none" stroke="black" stroke-width="0.1" />')
+            if layer is not None:
+                f.write('</g>')
+        f.write('</svg>')
 
 
-def export_dxf(unwrap, bounds, path_dxf):
+def export_dxf(unwrap, bounds, path_dxf, topology=None, layers=None, box=None, bulges=None):
     """
     Export the flattened surface as DXF file for CAD import.
+
+    Each loop is a closed 2D POLYLINE of a DXF R12 file with only an ENTITIES section (as ezdxf's r12writer writes
+    them, readable by every CAD program). The file is streamed loop by loop, coordinates are formatted in bulk.
     
     Args:
         unwrap: 2D coordinates of all vertices
-        bounds: List of boundary loops
+        bounds: List of boundary loops, taken from topology if None
         path_dxf: Output DXF file path
+        topology: MeshTopology of the mesh
+        layers: Layer name of each loop (e.g. the chart of each loop), BOUNDARY_<n> by default
+        box: (min, max) corners of the loops from contour_box, computed if not given
+        bulges: Bulge of the segment starting at each vertex of each loop (simplify.simplify_outlines), written as
+            the bulge (group 42) of the vertices where non-zero
     """
-    contours = [unwrap[bound] for bound in bounds]
+    if bounds is None:
+        bounds = topology.boundary_loops
     
     # Normalize coordinates to start from origin
-    min_x = float("inf")
-    min_y = float("inf")
-    
-    for contour in contours:
-        x, y = contour.T
-        min_x = min(min_x, np.min(x))
-        min_y = min(min_y, np.min(y))
-    
-    # Create DXF document
-    doc = ezdxf.new('R2010')
-    msp = doc.modelspace()
-    
-    # Add each boundary as a polyline
-    for i, contour in enumerate(contours):
-        # Normalize coordinates
-        x, y = contour.T
-        x -= min_x
-        y -= min_y
-        
-        # Create points for polyline (add z=0 for 3D compatibility)
-        points = [(float(x[j]), float(y[j]), 0.0) for j in range(len(x))]
-        
-        # Add closed polyline
-        polyline = msp.add_lwpolyline(points, close=True)
-        polyline.dxf.layer = f"BOUNDARY_{i+1}"
-    
-    # Save DXF file
-    doc.saveas(path_dxf)
+    origin = (box[0] if box is not None else contour_box(unwrap, bounds)[0]).astype(unwrap.dtype)
+    number = _number_format(unwrap.dtype)
+    with open(path_dxf, 'w', encoding='utf-8') as f:
+        f.write("0\nSECTION\n2\nENTITIES\n")
+        for i, bound in enumerate(bounds):
+            layer = layers[i] if layers is not None else f"BOUNDARY_{i+1}"
+            # Closed polyline, its vertices follow
+            f.write(f"0\nPOLYLINE\n8\n{layer}\n66\n1\n70\n1\n10\n0.0\n20\n0.0\n30\n0.0\n")
+            vertex = f"0\nVERTEX\n8\n{layer}\n70\n0\n10\n{number}\n20\n{number}\n"
+            if bulges is not None and np.any(bulges[i]):
+                points = np.column_stack([unwrap[bound] - origin, bulges[i]])
+                vertex += "42\n%r\n"
+            else:
+                points = unwrap[bound] - origin
+            for text in _format_points(points, vertex):
+                f.write(text)
+            f.write(f"0\nSEQEND\n8\n{layer}\n")
+        f.write("0\nENDSEC\n0\nEOF\n")
+
+
+def export_outlines(unwrap, bounds, path_svg=None, path_dxf=None, topology=None, layers=None, workers=2, bulges=None):
+    """
+    Export SVG and DXF files of the same loops, sharing their bounding box, written at the same time in threads.
+
+    Args:
+        unwrap: 2D coordinates of all vertices
+        bounds: List of boundary loops, taken from topology if None
+        path_svg: Output SVG file path (None to skip)
+        path_dxf: Output DXF file path (None to skip)
+        topology: MeshTopology of the mesh
+        layers: Layer name of each loop
+        workers: Threads writing the files, 1 writes them one after the other
+        bulges: Bulge of the segment starting at each vertex of each loop, for arcs (simplify.simplify_outlines)
+
+    Returns:
+        dict: {'svg': path, 'dxf': path} of the written files
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if bounds is None:
+        bounds = topology.boundary_loops
+    box = contour_box(unwrap, bounds)
+    jobs = [(kind, writer, path) for kind, writer, path in (('svg', export_svg, path_svg), ('dxf', export_dxf, path_dxf))
+            if path is not None]
+    if workers <= 1 or len(jobs) <= 1:
+        for _, writer, path in jobs:
+            writer(unwrap, bounds, path, layers=layers, box=box, bulges=bulges)
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            futures = [executor.submit(writer, unwrap, bounds, path, layers=layers, box=box, bulges=bulges)
+                       for _, writer, path in jobs]
+            for future in futures:
+                future.result()
+    return {kind: path for kind, _, path in jobs}
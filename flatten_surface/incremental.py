@@ -0,0 +1,289 @@
+import threading
+import time
+
+import numpy as np
+
+
+# Relative residual of the warm-started solve
+DEFAULT_TOLERANCE = 1e-10
+
+# Conjugate gradient iterations before falling back to a new factorization
+MAX_ITERATIONS = 50
+
+# Above this many iterations, the preconditioner is refactorized for the current geometry in the background
+REFRESH_ITERATIONS = 15
+
+# Rings of neighbors around the moved vertices re-solved by the 'local' method
+DEFAULT_RINGS = 3
+
+METHODS = ('warm', 'local')
+
+
+def _laplacian_change(old_vertices, new_vertices, faces, num_vertices):
+    """Change of the cotangent Laplacian when the vertices of faces move, as a #V by #V sparse matrix."""
+    import igl
+    import scipy.sparse as sp
+
+    vertex_ids, local_faces = np.unique(faces, return_inverse=True)
+    local_faces = local_faces.reshape(-1, 3)
+    change = (igl.cotmatrix(np.asarray(new_vertices[vertex_ids], dtype=np.float64), local_faces) -
+              igl.cotmatrix(np.asarray(old_vertices[vertex_ids], dtype=np.float64), local_faces)).tocoo()
+    return sp.csr_matrix((change.data, (vertex_ids[change.row], vertex_ids[change.col])),
+                         shape=(num_vertices, num_vertices))
+
+
+class IncrementalFlattener:
+    """
+    Re-flatten a mesh after vertex edits without starting over.
+
+    The faces (and so the connectivity, the boundary loops and the pinned face) do not change, only vertex positions.
+    Two methods:
+        'warm': the exact LSCM solution of the edited mesh, by conjugate gradients started from the previous UVs
+            (relaxed around the edits) and preconditioned by the LSCM factorization of an earlier geometry. The
+            energy matrix is only reassembled on the faces of the moved vertices. Each iteration costs one
+            back-substitution. When edits accumulate and the iterations grow, the factorization of the current
+            geometry is rebuilt in a background thread and used from the next update on, a solve that does not
+            converge falls back to a new factorization.
+        'local': only the vertices within rings of the moved ones are solved again, the others keep their UVs. Cost
+            proportional to the edited region whatever the mesh size, but approximate: the LSCM map is global, the
+            scale and layout of the rest of the unwrap do not follow the edits.
+
+    Args:
+        result: Result of flatten, main or a previous update ('unwrap', 'face_id_used' and 'topology' are used)
+        background_refresh: Refactorize in a background thread when iterations grow (two factorizations are then
+            held at the same time)
+    """
+
+    def __init__(self, result, background_refresh=True):
+        from .igl_api import init_unfold
+
+        if result['face_id_used'] is None:
+            raise ValueError("Incremental updates need a result pinned on a face, not two-point pins or charts")
+        self.topology = result['topology']
+        self.face_id = int(result['face_id_used'])
+        self.unwrap = result['unwrap']
+        self.background_refresh = background_refresh
+        self.pinned = init_unfold(self.topology.vertices, self.topology.faces, self.face_id, self.topology)[0]
+        # Edits are found against this copy: the caller may edit its own vertices array in place
+        self._vertices = np.array(self.topology.vertices, copy=True)
+        self._set_preconditioner(self._vertices, self.topology.lscm_solver)
+        self._refresh = None
+
+    def _set_preconditioner(self, vertices, solver, energy=None):
+        """Factorization of vertices, with the vertices moved since then and the energy of vertices (lazily)."""
+        self.preconditioner = solver
+        self._base_vertices = vertices
+        self._energy = energy
+        self._moved = np.empty(0, dtype=np.int64)
+
+    def _start_refresh(self, vertices):
+        from .lscm import LSCMSolver, lscm_energy
+
+        def build():
+            try:
+                done.update(solver=LSCMSolver(vertices, faces), energy=lscm_energy(vertices, faces).tocsr())
+            except Exception:
+                done['solver'] = None
+
+        done = {}
+        faces = self.topology.faces
+        thread = threading.Thread(target=build, daemon=True)
+        thread.start()
+        self._refresh = (thread, done, vertices)
+
+    def _finish_refresh(self, vertices):
+        """Swap in the refreshed factorization once built."""
+        thread, done, snapshot = self._refresh
+        if thread.is_alive():
+            return
+        self._refresh = None
+        if done.get('solver') is not None:
+            self._set_preconditioner(snapshot, done['solver'], done['energy'])
+            self._moved = np.flatnonzero((vertices != snapshot).any(axis=1))
+
+    def update(self, vertices=None, changed=None, positions=None, method='warm', rings=DEFAULT_RINGS,
+               tolerance=DEFAULT_TOLERANCE, metrics=False):
+        """
+        Flatten the edited mesh.
+
+        Args:
+            vertices: Edited vertices array (all vertices), or
+            changed: Ids of the moved vertices, with positions their new 3D positions (or with vertices, to skip the
+                comparison finding them)
+            positions: New positions of the changed vertices
+            method: 'warm' (exact) or 'local' (only the region around the edits), see the class
+            rings: Neighbor rings around the moved vertices solved by the 'local' method
+            tolerance: Relative residual of the 'warm' method
+            metrics: Also compute every distortion metric (a full pass over the mesh)
+
+        Returns:
+            dict: {
+                'unwrap', 'deformation', 'distortion', 'face_id_used', 'topology' as flatten,
+                'distortion_metrics': only if metrics is set,
+                'changed': ids of the moved vertices,
+                'method': method used, 'refactorized' if the warm solve did not converge,
+                'iterations': conjugate gradient iterations (warm method),
+                'seconds': time of the update
+            }
+        """
+        from .score import compute_deformation, compute_overall_distortion
+
+        start = time.perf_counter()
+        if method not in METHODS:
+            raise ValueError(f"Unknown method '{method}', expected one of {METHODS}")
+        old_vertices = self._vertices
+        if vertices is None:
+            if changed is None or positions is None:
+                raise ValueError("Give the edited vertices, or the changed vertex ids and their positions")
+            changed = np.asarray(changed, dtype=np.int64)
+            vertices = old_vertices.copy()
+            vertices[changed] = positions
+        else:
+            vertices = np.array(vertices, dtype=old_vertices.dtype, copy=True)
+            if changed is None:
+                changed = np.flatnonzero((vertices != old_vertices).any(axis=1))
+        changed = np.unique(np.asarray(changed, dtype=np.int64))
+
+        topology = self.topology.with_vertices(vertices, changed)
+        self._moved = np.union1d(self._moved, changed)
+        if self._refresh is not None:
+            self._finish_refresh(vertices)
+        iterations = 0
+        if not len(changed):
+            unwrap = self.unwrap
+        elif method == 'local' and not np.isin(self.pinned, changed).any():
+            unwrap = self._solve_local(topology, changed, rings)
+        else:
+            if method == 'local':
+                # Moving the pinned face moves the whole unwrap
+                method = 'warm'
+            unwrap, iterations = self._solve_warm(topology, changed, tolerance)
+            if unwrap is None:
+                method = 'refactorized'
+                unwrap = self._solve_direct(topology)
+            elif iterations > REFRESH_ITERATIONS and self.background_refresh and self._refresh is None:
+                self._start_refresh(vertices)
+
+        self.topology = topology
+        self._vertices = vertices
+        self.unwrap = unwrap = unwrap.astype(old_vertices.dtype, copy=False) \
+            if old_vertices.dtype == np.float32 else unwrap
+        deformation = compute_deformation(vertices, topology.faces, unwrap, topology)
+        result = {
+            'unwrap': unwrap,
+            'deformation': deformation,
+            'distortion': compute_overall_distortion(deformation),
+            'face_id_used': self.face_id,
+            'topology': topology,
+            'changed': changed,
+            'method': method,
+            'iterations': iterations,
+        }
+        if metrics:
+            result['distortion_metrics'] = topology.distortion_metrics.overall(unwrap)
+        result['seconds'] = time.perf_counter() - start
+        return result
+
+    def _pins(self, topology):
+        from .igl_api import init_unfold
+
+        return init_unfold(topology.vertices, topology.faces, self.face_id, topology)[:2]
+
+    def _solve_direct(self, topology):
+        """New factorization, also the preconditioner of the next updates."""
+        from .igl_api import unfold
+
+        init_points_ids, init_points_pos = self._pins(topology)
+        unwrap = unfold(topology.vertices, topology.faces, init_points_ids, init_points_pos, topology=topology)
+        self._set_preconditioner(topology.vertices, topology.lscm_solver)
+        return unwrap
+
+    def _solve_warm(self, topology, changed, tolerance):
+        """Preconditioned conjugate gradients from the previous UVs, returns (unwrap or None, iterations)."""
+        import scipy.sparse as sp
+        from scipy.sparse.linalg import LinearOperator, cg
+        from .lscm import lscm_energy
+
+        if self.preconditioner is None:
+            return None, 0
+        num_vertices = topology.num_vertices
+        if self._energy is None:
+            self._energy = lscm_energy(self._base_vertices, topology.faces).tocsr()
+        energy = self._energy
+        # Energy of the current geometry: the preconditioned one, reassembled on the faces moved since then
+        laplacian = _laplacian_change(self._base_vertices, topology.vertices,
+                                      topology.faces[topology.faces_of_vertices(self._moved)], num_vertices)
+        energy_change = -sp.block_diag((laplacian, laplacian), format='csr')
+
+        init_points_ids, init_points_pos = self._pins(topology)
+        pinned = np.concatenate([init_points_ids, init_points_ids + num_vertices])
+        free = np.ones(2 * num_vertices, dtype=bool)
+        free[pinned] = False
+        pinned_values = np.zeros(2 * num_vertices)
+        pinned_values[pinned] = np.concatenate([init_points_pos[:, 0], init_points_pos[:, 1]])
+        full = np.zeros(2 * num_vertices)
+        zero_pins = np.zeros((len(init_points_ids), 2))
+
+        def apply_energy(x):
+            return energy @ x + energy_change @ x
+
+        def matvec(x):
+            full[free] = x.ravel()
+            return apply_energy(full)[free]
+
+        def precondition(residual):
+            full[free] = residual.ravel()
+            return self.preconditioner.solve(init_points_ids, zero_pins, full).T.ravel()[free]
+
+        size = int(free.sum())
+        rhs = -apply_energy(pinned_values)[free]
+        initial = self._solve_local(topology, changed, DEFAULT_RINGS).T.ravel()[free]
+        counter = [0]
+
+        def count(_):
+            counter[0] += 1
+
+        solution, info = cg(LinearOperator((size, size), matvec=matvec, dtype=np.float64), rhs, x0=initial,
+                            rtol=tolerance, maxiter=MAX_ITERATIONS,
+                            M=LinearOperator((size, size), matvec=precondition, dtype=np.float64), callback=count)
+        if info != 0:
+            return None, counter[0]
+        unwrap = pinned_values
+        unwrap[free] = solution
+        return np.ascontiguousarray(unwrap.reshape(2, num_vertices).T), counter[0]
+
+    def _solve_local(self, topology, changed, rings):
+        """Solve the vertices within rings of the moved ones, the others being fixed at their UVs."""
+        from scipy.sparse.linalg import spsolve
+        from .lscm import lscm_energy
+
+        region = changed
+        for _ in range(rings):
+            region = np.unique(topology.faces[topology.faces_of_vertices(region)])
+        region = np.setdiff1d(region, self.pinned)
+        faces = topology.faces[topology.faces_of_vertices(region)]
+        vertex_ids, local_faces = np.unique(faces, return_inverse=True)
+        local_faces = local_faces.reshape(-1, 3)
+        # The energy of the faces around the region is the part of the mesh energy depending on its vertices
+        energy = lscm_energy(topology.vertices[vertex_ids], local_faces).tocsr()
+
+        num_local = len(vertex_ids)
+        solved = np.isin(vertex_ids, region)
+        solved_dofs = np.flatnonzero(np.concatenate([solved, solved]))
+        fixed_dofs = np.flatnonzero(~np.concatenate([solved, solved]))
+        values = np.asarray(self.unwrap, dtype=np.float64)[vertex_ids].T.ravel()
+        rhs = -energy[solved_dofs][:, fixed_dofs] @ values[fixed_dofs]
+        values[solved_dofs] = spsolve(energy[solved_dofs][:, solved_dofs].tocsc(), rhs)
+
+        unwrap = np.array(self.unwrap, dtype=np.float64)
+        unwrap[vertex_ids] = values.reshape(2, num_local).T
+        return unwrap
+
+
+def reflatten(previous, vertices=None, changed=None, positions=None, **options):
+    """
+    Flatten an edited mesh from the result of a previous flatten, see IncrementalFlattener.update for the options.
+
+    Each call prepares the update again, keep an IncrementalFlattener for edit loops.
+    """
+    return IncrementalFlattener(previous).update(vertices, changed, positions, **options)
@@ -0,0 +1,142 @@
+import igl
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+
+# Column ordering of the factorization (splu permc_spec)
+ORDERING = 'MMD_AT_PLUS_A'
+
+
+def lscm_energy(vertices, faces):
+    """
+    Hessian of the LSCM conformal energy, same as igl.lscm, u coordinates of all vertices first then v coordinates.
+
+    Returns:
+        scipy.sparse.csc_matrix: 2 #V by 2 #V symmetric matrix
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    laplacian = igl.cotmatrix(vertices, faces)
+    return (-sp.block_diag((laplacian, laplacian)) - 2 * igl.vector_area_matrix(faces)).tocsc()
+
+
+class LSCMSolver:
+    """
+    Least squares conformal map solver bound to one mesh.
+
+    The conformal energy matrix is assembled and factorized once, with the vertices of a base face pinned. Solving for
+    another set of pinned vertices is a small-rank correction of that factorization: the pins that differ from the base
+    ones are added as constraints of a bordered system whose Schur complement is a tiny dense matrix. A new pin set
+    costs a few back-substitutions instead of a full factorization.
+
+    The system is always assembled and solved in float64, float32 meshes (low-memory mode) are converted here only.
+    The energy matrix is symmetric, so its columns are ordered by minimum degree on A^T + A (ORDERING), which halves
+    the fill-in, the memory and the time of the factorization compared to the COLAMD default of splu.
+
+    Args:
+        vertices: Mesh vertices array
+        faces: Mesh faces array
+        base_face_id: Face whose vertices are pinned in the factorized system
+    """
+
+    def __init__(self, vertices, faces, base_face_id=0):
+        faces = np.asarray(faces, dtype=np.int64)
+        self.num_vertices = num_vertices = len(vertices)
+        energy = lscm_energy(vertices, faces)
+
+        base_vertices = faces[base_face_id]
+        self.base_dofs = np.concatenate([base_vertices, base_vertices + num_vertices])
+        self.free_dofs = np.setdiff1d(np.arange(2 * num_vertices), self.base_dofs)
+        self._base_index = np.full(2 * num_vertices, -1, dtype=np.int64)
+        self._base_index[self.base_dofs] = np.arange(len(self.base_dofs))
+        self._free_index = np.full(2 * num_vertices, -1, dtype=np.int64)
+        self._free_index[self.free_dofs] = np.arange(len(self.free_dofs))
+
+        energy_free = energy[self.free_dofs, :]
+        self._coupling = energy_free[:, self.base_dofs].tocsc()
+        self._coupling_t = self._coupling.T.tocsr()
+        self._base_block = energy[self.base_dofs, :][:, self.base_dofs].toarray()
+        # Only the free block is alive during the factorization, its memory peak
+        energy_free = energy_free[:, self.free_dofs].tocsc()
+        del energy
+        self._factor = splu(energy_free, permc_spec=ORDERING)
+        del energy_free
+        # Response of the free dofs to the base dofs, and its projection back on the base rows
+        self._base_response = self._factor.solve(self._coupling.toarray())
+        self._base_schur = self._base_block - self._coupling_t @ self._base_response
+        self._pin_system = (None, None)
+
+    def _pins(self, init_points_ids):
+        """Bordered system of a pin set, kept for the next solves with the same pinned vertices."""
+        key, system = self._pin_system
+        if key == init_points_ids.tobytes():
+            return system
+        num_base = len(self.base_dofs)
+        pinned_dofs = np.concatenate([init_points_ids, init_points_ids + self.num_vertices])
+
+        # Pins outside of the base face become constraints with a reaction force on their row
+        new_pins = self._free_index[pinned_dofs]
+        new_mask = new_pins >= 0
+        new_pins = new_pins[new_mask]
+        num_new = len(new_pins)
+        reactions = np.zeros((len(self.free_dofs), num_new))
+        reactions[new_pins, np.arange(num_new)] = 1.0
+        reaction_response = self._factor.solve(reactions) if num_new else reactions
+
+        # Free dofs: x_free = -base_response @ x_base + reaction_response @ reaction
+        # Unknowns of the bordered system: [x_base, reaction]
+        matrix = np.zeros((num_base + num_new, num_base + num_new))
+        matrix[:num_new, :num_base] = -self._base_response[new_pins]
+        matrix[:num_new, num_base:] = reaction_response[new_pins]
+
+        # Base dofs are either pinned again or must satisfy their energy gradient row
+        matrix[num_new:, :num_base] = self._base_schur
+        matrix[num_new:, num_base:] = self._coupling_t @ reaction_response
+        base_pins = self._base_index[pinned_dofs[~new_mask]]
+        matrix[num_new + base_pins] = 0.0
+        matrix[num_new + base_pins, base_pins] = 1.0
+
+        system = (pinned_dofs, new_pins, new_mask, base_pins, reaction_response, np.linalg.inv(matrix))
+        self._pin_system = (init_points_ids.tobytes(), system)
+        return system
+
+    def solve(self, init_points_ids, init_points_pos, load=None):
+        """
+        Compute the UV coordinates with the given vertices pinned at the given 2D positions.
+
+        The bordered system of a pin set is kept, solving again with the same pinned vertices (other positions or
+        loads) costs one back-substitution.
+
+        Args:
+            init_points_ids: Ids of the pinned vertices
+            init_points_pos: 2D positions of the pinned vertices
+            load: Right-hand side of the unpinned rows (2 #V, u then v), the solution x satisfies energy @ x = load
+                on them. None (zero) minimizes the conformal energy
+
+        Returns:
+            numpy.ndarray: UV coordinates of all vertices, same result as igl.lscm
+        """
+        init_points_ids = np.asarray(init_points_ids, dtype=np.int64)
+        init_points_pos = np.asarray(init_points_pos, dtype=np.float64)
+        pinned_dofs, new_pins, new_mask, base_pins, reaction_response, inverse = self._pins(init_points_ids)
+        num_base, num_new = len(self.base_dofs), len(new_pins)
+        pinned_values = np.concatenate([init_points_pos[:, 0], init_points_pos[:, 1]])
+
+        rhs = np.zeros(num_base + num_new)
+        rhs[:num_new] = pinned_values[new_mask]
+        if load is not None:
+            load = np.asarray(load, dtype=np.float64)
+            load_response = self._factor.solve(load[self.free_dofs])
+            rhs[:num_new] -= load_response[new_pins]
+            rhs[num_new:] = load[self.base_dofs] - self._coupling_t @ load_response
+        rhs[num_new + base_pins] = pinned_values[~new_mask]
+
+        solution = inverse @ rhs
+        base_values, reaction = solution[:num_base], solution[num_base:]
+        unwrap = np.empty(2 * self.num_vertices)
+        unwrap[self.base_dofs] = base_values
+        unwrap[self.free_dofs] = reaction_response @ reaction - self._base_response @ base_values
+        if load is not None:
+            unwrap[self.free_dofs] += load_response
+        return np.ascontiguousarray(unwrap.reshape(2, self.num_vertices).T)
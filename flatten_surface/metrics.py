@@ -0,0 +1,159 @@
+import numpy as np
+
+
+# Per-face metrics, all in percent:
+#   area: area change (same as score.compute_deformation)
+#   length: stretch of the edge whose length changes most
+#   angle: relative change of the corner angle that changes most
+#   conformal: anisotropy s1 / s2 - 1 of the singular values s1 >= s2 of the face Jacobian
+METRICS = ('area', 'length', 'angle', 'conformal')
+
+# Optimization objectives: the RMS over faces of a metric, or 'max' the largest of the area, length and angle ones
+OBJECTIVES = ('area', 'length', 'angle', 'max')
+
+# Measures fitted by best_fit_scale: the RMS area change, the RMS stretch of the edges, or the total area
+SCALES = ('area', 'length', 'total')
+
+
+def _signed_extreme(values):
+    """Value of largest magnitude of each column of a (3, F) array."""
+    rows = np.argmax(np.abs(values), axis=0)
+    return np.take_along_axis(values, rows[None], axis=0)[0]
+
+
+class DistortionMetrics:
+    """
+    Area, edge length, angle and conformal distortion of unwraps of one mesh.
+
+    Everything depending only on the 3D mesh (edge lengths, corner angles, inverse of each face frame) is computed
+    once, an unwrap then only costs a few vectorized passes over (3, F) arrays. Area objectives go through the
+    allocation-free score.DeformationScorer.
+
+    Args:
+        vertices: Mesh vertices array
+        faces: Mesh faces array
+        topology: MeshTopology of the mesh, its cached face areas and scorer are used when given
+    """
+
+    def __init__(self, vertices, faces, topology=None):
+        from .score import DeformationScorer
+
+        self.scorer = topology.deformation_scorer if topology is not None else DeformationScorer(vertices, faces)
+        self._corner_ids = np.ascontiguousarray(faces.T)
+        corners = vertices[self._corner_ids]
+        edges = np.roll(corners, -1, axis=0) - corners  # edge k goes from corner k to corner k + 1
+        self.edge_lengths = np.linalg.norm(edges, axis=2)
+        self.angles = self._corner_angles(edges, np.linalg.norm(np.cross(edges[0], -edges[2]), axis=1))
+
+        # 3D triangle in its own plane: corner 0 at the origin, edge 0 along x, corner 2 at (x2, y2)
+        length0 = self.edge_lengths[0]
+        x_axis = edges[0] / length0[:, None]
+        x2 = np.einsum('ij,ij->i', -edges[2], x_axis)
+        y2 = np.linalg.norm(-edges[2] - x2[:, None] * x_axis, axis=1)
+        # Inverse of the frame matrix [[length0, x2], [0, y2]], J = [u1 - u0, u2 - u0] @ inverse
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self._inverse = (1 / length0, -x2 / (length0 * y2), 1 / y2)
+
+    @staticmethod
+    def _corner_angles(edges, double_areas):
+        """(3, F) angle at each corner, between the edge leaving it and the reversed edge reaching it."""
+        dots = -np.einsum('kij,kij->ki', edges, np.roll(edges, 1, axis=0))
+        return np.arctan2(double_areas[None], dots)
+
+    def per_face(self, unwrap, names=METRICS):
+        """
+        Per-face distortion of unwrap.
+
+        Args:
+            unwrap: UV coordinates of the vertices
+            names: Metrics to compute, from METRICS
+
+        Returns:
+            dict: {name: per-face array in percent}
+        """
+        unknown = set(names) - set(METRICS)
+        if unknown:
+            raise ValueError(f"Unknown distortion metrics {sorted(unknown)}, expected some of {METRICS}")
+        results = {}
+        if 'area' in names:
+            results['area'] = self.scorer.deformation(unwrap)
+        if not set(names) & {'length', 'angle', 'conformal'}:
+            return results
+
+        corners = np.asarray(unwrap, dtype=self.edge_lengths.dtype)[self._corner_ids]
+        edges = np.roll(corners, -1, axis=0) - corners
+        double_areas = np.abs(edges[0, :, 0] * (-edges[2, :, 1]) - edges[0, :, 1] * (-edges[2, :, 0]))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if 'length' in names:
+                lengths = np.hypot(edges[..., 0], edges[..., 1])
+                results['length'] = _signed_extreme(lengths / self.edge_lengths - 1) * 100
+            if 'angle' in names:
+                angles = self._corner_angles(edges, double_areas)
+                results['angle'] = _signed_extreme(angles / self.angles - 1) * 100
+            if 'conformal' in names:
+                results['conformal'] = self._anisotropy(edges[0], -edges[2]) * 100
+        return results
+
+    def _anisotropy(self, edge_01, edge_02):
+        """s1 / s2 - 1 of the Jacobian mapping each 3D face frame to the unwrap."""
+        a, b, d = self._inverse
+        j00, j10 = edge_01[:, 0] * a, edge_01[:, 1] * a
+        j01 = edge_01[:, 0] * b + edge_02[:, 0] * d
+        j11 = edge_01[:, 1] * b + edge_02[:, 1] * d
+        energy = j00 ** 2 + j01 ** 2 + j10 ** 2 + j11 ** 2
+        determinant = j00 * j11 - j01 * j10
+        discriminant = np.sqrt(np.maximum(energy ** 2 - 4 * determinant ** 2, 0))
+        largest = np.sqrt((energy + discriminant) / 2)
+        smallest = np.sqrt(np.maximum(energy - discriminant, 0) / 2)
+        return largest / smallest - 1
+
+    def overall(self, unwrap, names=METRICS):
+        """RMS over faces of each metric of names, {name: float}."""
+        if set(names) == {'area'}:
+            return {'area': float(self.scorer.distortion(unwrap))}
+        return {name: float(np.sqrt(np.mean(np.square(values), dtype=np.float64))) for name, values in self.per_face(unwrap, names).items()}
+
+    def best_fit_scale(self, unwrap, scale='area'):
+        """
+        Factor s of the unwrap s * unwrap fitting the mesh best, in closed form.
+
+        'area': s^2 = sum(r) / sum(r^2) with r the 2D / 3D area ratio of each face, the exact minimizer of the RMS area
+            change (the 'area' metric). 'length': s = sum(q) / sum(q^2) with q the 2D / 3D length ratio of every face
+            edge, the minimizer of the RMS edge stretch (close to the 'length' metric, which keeps the worst edge of
+            each face). 'total': s^2 = 3D area / 2D area. The angle and conformal metrics do not depend on s.
+
+        Args:
+            unwrap: UV coordinates of the vertices
+            scale: Fitted measure, one of SCALES
+
+        Returns:
+            float: Scale factor
+        """
+        if scale not in SCALES:
+            raise ValueError(f"Unknown scale normalization '{scale}', expected one of {SCALES}")
+        if scale == 'length':
+            corners = np.asarray(unwrap, dtype=np.float64)[self._corner_ids]
+            edges = np.roll(corners, -1, axis=0) - corners
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratios = np.hypot(edges[..., 0], edges[..., 1]) / self.edge_lengths
+            squared = False
+        else:
+            areas = self.scorer.unfolded_areas(unwrap).astype(np.float64)
+            if scale == 'total':
+                return float(np.sqrt(self.scorer.area_3d / areas.sum()))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratios = areas / self.scorer.original_areas
+            squared = True
+        ratios = ratios[np.isfinite(ratios)]
+        factor = ratios.sum() / np.dot(ratios, ratios)
+        return float(np.sqrt(factor) if squared else factor)
+
+    def objective(self, unwrap, objective='area'):
+        """Scalar minimized by the optimization, see OBJECTIVES."""
+        if objective == 'area':
+            return self.scorer.distortion(unwrap)
+        if objective == 'max':
+            return max(self.overall(unwrap, ('area', 'length', 'angle')).values())
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown optimization objective '{objective}', expected one of {OBJECTIVES}")
+        return self.overall(unwrap, (objective,))[objective]
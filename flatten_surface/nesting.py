@@ -0,0 +1,556 @@
+import glob
+import json
+import math
+import os
+import re
+import time
+
+import numpy as np
+
+
+# Space between two parts and between a part and the sheet sides, in mm
+DEFAULT_GAP = 2.0
+
+# Orientations tried for each part, evenly spaced over a full turn
+DEFAULT_ROTATIONS = 4
+
+# Collision outlines are simplified within this distance (mm), the clearance is enlarged to stay conservative
+DEFAULT_TOLERANCE = 0.1
+
+# Accuracy of the final position of a part sliding down into the free space below it, in mm
+DEFAULT_RESOLUTION = 0.5
+
+# Drop positions of each orientation refined by sliding, the lowest ones at the bounding box level
+TOP_CANDIDATES = 8
+
+# Boxes per node of BoxTree
+NODE_SIZE = 16
+
+# BoxTree queries test all the boxes directly up to this many boxes, cheaper than the two levels
+FLAT_QUERY = 256
+
+# Segment pairs compared at once by the clearance test
+PAIR_CHUNK = 1 << 18
+
+
+class BoxTree:
+    """
+    Two-level R-tree of axis-aligned boxes (min_x, min_y, max_x, max_y), packed by Sort-Tile-Recursive.
+
+    Boxes are sorted in vertical slices by their center, then by height within each slice, and grouped by node_size
+    into nodes. A query tests the node boxes then the boxes of the hit nodes, both vectorized. Boxes inserted after
+    the last packing are tested directly, and packed with the others once they are as many as the packed ones.
+    Up to FLAT_QUERY boxes, a query tests every box at once instead.
+
+    Args:
+        boxes: #B by 4 initial boxes
+        node_size: Boxes per node
+    """
+
+    def __init__(self, boxes=None, node_size=NODE_SIZE):
+        self.node_size = node_size
+        self._boxes = np.empty((0, 4)) if boxes is None else np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self._count = len(self._boxes)
+        self._pack()
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def boxes(self):
+        return self._boxes[:self._count]
+
+    def _pack(self):
+        boxes = self.boxes
+        num_boxes = len(boxes)
+        self._packed = num_boxes
+        if num_boxes == 0:
+            self._order = np.empty(0, dtype=np.int64)
+            self._nodes = np.empty((0, 4))
+            return
+        centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+        num_slices = math.ceil(math.sqrt(math.ceil(num_boxes / self.node_size)))
+        by_x = np.argsort(centers[:, 0], kind='stable')
+        slice_ids = np.arange(num_boxes) // (num_slices * self.node_size)
+        self._order = by_x[np.lexsort((centers[by_x, 1], slice_ids))]
+        starts = np.arange(0, num_boxes, self.node_size)
+        packed = boxes[self._order]
+        self._nodes = np.column_stack([np.minimum.reduceat(packed[:, 0], starts),
+                                       np.minimum.reduceat(packed[:, 1], starts),
+                                       np.maximum.reduceat(packed[:, 2], starts),
+                                       np.maximum.reduceat(packed[:, 3], starts)])
+
+    def insert(self, box):
+        """Add a box, returns its id (ids count the boxes in insertion order)."""
+        if self._count == len(self._boxes):
+            grown = np.empty((max(2 * self._count, self.node_size), 4))
+            grown[:self._count] = self._boxes[:self._count]
+            self._boxes = grown
+        self._boxes[self._count] = box
+        self._count += 1
+        if self._count - self._packed >= max(self._packed, self.node_size):
+            self._pack()
+        return self._count - 1
+
+    def query(self, box):
+        """Ids of the boxes intersecting box (touching counts), in no particular order."""
+        min_x, min_y, max_x, max_y = box
+        if self._count <= FLAT_QUERY:
+            boxes = self._boxes[:self._count]
+            return np.flatnonzero((boxes[:, 0] <= max_x) & (boxes[:, 2] >= min_x) &
+                                  (boxes[:, 1] <= max_y) & (boxes[:, 3] >= min_y))
+        nodes = self._nodes
+        hit = np.flatnonzero((nodes[:, 0] <= max_x) & (nodes[:, 2] >= min_x) &
+                             (nodes[:, 1] <= max_y) & (nodes[:, 3] >= min_y))
+        candidates = (hit[:, None] * self.node_size + np.arange(self.node_size)).ravel()
+        candidates = self._order[candidates[candidates < self._packed]]
+        candidates = np.concatenate([candidates, np.arange(self._packed, self._count)])
+        boxes = self._boxes[candidates]
+        inside = (boxes[:, 0] <= max_x) & (boxes[:, 2] >= min_x) & (boxes[:, 1] <= max_y) & (boxes[:, 3] >= min_y)
+        return candidates[inside]
+
+
+def polygon_area(points):
+    """Signed area of a closed polygon (positive when counterclockwise)."""
+    x, y = points[:, 0], points[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def _point_in_polygon(point, starts, ends):
+    """Crossing number test of one point against the closed polygon of edges starts -> ends."""
+    x, y = point
+    straddle = (starts[:, 1] > y) != (ends[:, 1] > y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crossing = starts[:, 0] + (y - starts[:, 1]) * (ends[:, 0] - starts[:, 0]) / (ends[:, 1] - starts[:, 1])
+    return bool(np.count_nonzero(straddle & (x < crossing)) % 2)
+
+
+def _point_segment_distances(points, starts, ends):
+    """Distances of points to the segments starts -> ends, all broadcast against each other."""
+    chord = ends - starts
+    length2 = np.sum(chord * chord, axis=-1)
+    t = np.sum((points - starts) * chord, axis=-1) / np.where(length2 > 0, length2, 1)
+    np.clip(t, 0, 1, out=t)
+    offset = starts + t[..., None] * chord - points
+    return np.sqrt(np.sum(offset * offset, axis=-1))
+
+
+def _cross(u, v):
+    return u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0]
+
+
+def segments_within(a_starts, a_ends, b_starts, b_ends, clearance):
+    """
+    True if a segment of a crosses or comes closer than clearance to a segment of b.
+
+    Pairs whose boxes, grown by the clearance, do not overlap are discarded first (chunked over a), the distances are
+    only computed for the remaining ones.
+    """
+    b_low, b_high = np.minimum(b_starts, b_ends) - clearance, np.maximum(b_starts, b_ends) + clearance
+    chunk = max(1, PAIR_CHUNK // max(len(b_starts), 1))
+    for first in range(0, len(a_starts), chunk):
+        p, q = a_starts[first:first + chunk], a_ends[first:first + chunk]
+        low, high = np.minimum(p, q)[:, None], np.maximum(p, q)[:, None]
+        near = np.all((low <= b_high[None]) & (high >= b_low[None]), axis=2)
+        ia, ib = np.nonzero(near)
+        if not len(ia):
+            continue
+        p, q, r, s = p[ia], q[ia], b_starts[ib], b_ends[ib]
+        d1, d2 = q - p, s - r
+        if np.any((_cross(d1, r - p) * _cross(d1, s - p) < 0) & (_cross(d2, p - r) * _cross(d2, q - r) < 0)):
+            return True
+        distance = np.minimum(np.minimum(_point_segment_distances(p, r, s), _point_segment_distances(q, r, s)),
+                              np.minimum(_point_segment_distances(r, p, q), _point_segment_distances(s, p, q)))
+        if np.any(distance < clearance) or (clearance == 0 and np.any(distance == 0)):
+            return True
+    return False
+
+
+class _Shape:
+    """Outer loops of a part in one orientation, as edges (starts -> ends) indexed in a BoxTree, and their box."""
+
+    def __init__(self, loops):
+        self.starts = np.concatenate(loops)
+        self.ends = np.concatenate([np.roll(loop, -1, axis=0) for loop in loops])
+        # One point of each loop, for the containment tests
+        self.firsts = np.array([loop[0] for loop in loops])
+        self.box = np.concatenate([self.starts.min(axis=0), self.starts.max(axis=0)])
+        self.segments = BoxTree(np.column_stack([np.minimum(self.starts, self.ends), np.maximum(self.starts, self.ends)]))
+
+    def moved(self, offset):
+        shape = _Shape.__new__(_Shape)
+        shape.starts, shape.ends, shape.firsts = self.starts + offset, self.ends + offset, self.firsts + offset
+        shape.box = self.box + np.tile(offset, 2)
+        shape.segments = BoxTree(self.segments.boxes + np.tile(offset, 2))
+        return shape
+
+
+class Sheet:
+    """
+    Parts placed on a sheet (or roll) of fixed width and unbounded length, with their collision outlines indexed.
+
+    Placed parts are indexed by their bounding boxes in a BoxTree, and the segments of each placed outline in a
+    BoxTree of its own: a collision test only compares the segments of two parts that lie in the overlap of their
+    boxes grown by the clearance.
+
+    Args:
+        width: Sheet width (x extent) in mm
+        clearance: Smallest distance between two outlines
+    """
+
+    def __init__(self, width, clearance):
+        self.width = width
+        self.clearance = clearance
+        self.parts = BoxTree()
+        self.shapes = []
+        self.collision_tests = 0
+
+    def collides(self, shape, offset):
+        """True if shape moved by offset comes closer than the clearance to a placed part."""
+        self.collision_tests += 1
+        c = self.clearance
+        box = shape.box + np.tile(offset, 2)
+        for part_id in self.parts.query(box + np.array([-c, -c, c, c])):
+            placed = self.shapes[part_id]
+            window = np.concatenate([np.maximum(box[:2], placed.box[:2]) - c, np.minimum(box[2:], placed.box[2:]) + c])
+            near_placed = placed.segments.query(window)
+            near_moving = shape.segments.query(window - np.tile(offset, 2))
+            if len(near_placed) and len(near_moving) and segments_within(
+                    shape.starts[near_moving] + offset, shape.ends[near_moving] + offset,
+                    placed.starts[near_placed], placed.ends[near_placed], c):
+                return True
+            # Outlines apart, one part may still lie inside the other (holes are not used)
+            if any(_point_in_polygon(point, placed.starts, placed.ends) for point in shape.firsts + offset
+                   if np.all(point >= placed.box[:2]) and np.all(point <= placed.box[2:])):
+                return True
+            if any(_point_in_polygon(point, shape.starts, shape.ends) for point in placed.firsts - offset
+                   if np.all(point >= shape.box[:2]) and np.all(point <= shape.box[2:])):
+                return True
+        return False
+
+    def place(self, shape, offset):
+        placed = shape.moved(np.asarray(offset, dtype=np.float64))
+        self.shapes.append(placed)
+        self.parts.insert(placed.box)
+
+    def drop_heights(self, xs, width):
+        """Lowest y of a box of this width at each x above the boxes of the placed parts."""
+        boxes = self.parts.boxes
+        if not len(boxes):
+            return np.zeros(len(xs))
+        overlap = (boxes[None, :, 0] < xs[:, None] + width + self.clearance) & \
+                  (boxes[None, :, 2] > xs[:, None] - self.clearance)
+        return np.max(np.where(overlap, boxes[None, :, 3] + self.clearance, 0.0), axis=1)
+
+    def candidate_xs(self, width):
+        """Left positions touching the sheet sides or the side of a placed part, within the sheet."""
+        boxes = self.parts.boxes
+        xs = np.concatenate([[0.0, self.width - width], boxes[:, 2] + self.clearance,
+                             boxes[:, 0] - self.clearance - width])
+        return np.unique(xs[(xs >= 0) & (xs <= self.width - width + 1e-9)])
+
+
+def _rotation(angle):
+    """Matrix rotating row vectors counterclockwise by angle degrees."""
+    c, s = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+    return np.array([[c, s], [-s, c]])
+
+
+def _orientations(loops, rotations):
+    """(angle in degrees, rotated loops moved to a bounding box at the origin) of each rotation step."""
+    result = []
+    for step in range(rotations):
+        angle = 360.0 * step / rotations
+        rotated = [loop @ _rotation(angle) for loop in loops]
+        low = np.min([loop.min(axis=0) for loop in rotated], axis=0)
+        result.append((angle, [loop - low for loop in rotated]))
+    return result
+
+
+def outer_loops(loops):
+    """
+    Indices of the loops not inside another loop of the list (the others are holes), and the area enclosed by them
+    minus the area of the holes.
+    """
+    loops = [np.asarray(loop, dtype=np.float64) for loop in loops]
+    areas = [abs(polygon_area(loop)) for loop in loops]
+    edges = [(loop, np.roll(loop, -1, axis=0)) for loop in loops]
+    outer = [i for i, loop in enumerate(loops)
+             if not any(areas[j] > areas[i] and _point_in_polygon(loop[0], *edges[j]) for j in range(len(loops)))]
+    return outer, sum(areas[i] for i in outer) - sum(areas[i] for i in range(len(loops)) if i not in outer)
+
+
+def _best_position(sheet, shape, resolution, num_candidates, limit=math.inf):
+    """
+    Lowest position (then leftmost) of shape on the sheet, below limit.
+
+    Every candidate x gets the height dropping the bounding box onto the placed boxes, the lowest ones then slide down
+    by bisection while the outline does not collide, into the concavities and free space between the parts. A
+    candidate that collides at the best height found so far is not refined.
+
+    Returns:
+        tuple or None: (x, y), None if the part is wider than the sheet or no position is below limit
+    """
+    width = shape.box[2] - shape.box[0]
+    if width > sheet.width or limit < 0:
+        return None
+    xs = sheet.candidate_xs(width)
+    ys = sheet.drop_heights(xs, width)
+    best = None
+    for index in np.lexsort((xs, ys))[:num_candidates]:
+        x, high = float(xs[index]), float(ys[index])
+        ceiling = min(limit, best[1] if best is not None else math.inf)
+        if high > ceiling:
+            if ceiling < 0 or sheet.collides(shape, np.array([x, ceiling])):
+                continue
+            high = ceiling
+        low = 0.0
+        if high > 0 and not sheet.collides(shape, np.array([x, 0.0])):
+            high = 0.0
+        while high - low > resolution:
+            middle = (low + high) / 2
+            if sheet.collides(shape, np.array([x, middle])):
+                low = middle
+            else:
+                high = middle
+        if best is None or (high, x) < (best[1], best[0]):
+            best = (x, high)
+    return best
+
+
+def nest(parts, width, gap=DEFAULT_GAP, rotations=DEFAULT_ROTATIONS, tolerance=DEFAULT_TOLERANCE,
+         resolution=DEFAULT_RESOLUTION, num_candidates=TOP_CANDIDATES, verbose=False):
+    """
+    Pack the outlines of several parts onto a sheet (or roll) of given width, bottom-left, with rotation steps.
+
+    Parts are placed largest first. For each orientation, bottom-left candidates are found at the bounding box
+    level, then slid down against the true outlines (see Sheet), and the orientation whose top ends lowest is kept.
+    Collision outlines are the outer loops simplified within tolerance, the clearance being gap plus twice the
+    tolerance so the exact outlines stay gap apart. Parts are not placed into the holes of other parts.
+
+    Args:
+        parts: List of {'name', 'loops': list of #P by 2 arrays in mm, 'bulges': optional list of bulge arrays} (see
+            part_from_result, read_dxf_part and parts_from_manifest)
+        width: Sheet width in mm
+        gap: Smallest distance between two parts and between a part and the sheet sides, in mm
+        rotations: Number of orientations tried, evenly spaced over a full turn (1 for none, 4 for quarter turns)
+        tolerance: Simplification of the collision outlines in mm
+        resolution: Accuracy of the sliding in mm
+        num_candidates: Drop positions refined by sliding, per orientation
+        verbose: Print one line per part
+
+    Returns:
+        dict: {
+            'placements': list of {'name', 'part', 'angle', 'x', 'y', 'width', 'height'} of the placed parts (part
+                index into parts, position of the bounding box of the rotated part),
+            'unplaced': names of the parts wider than the sheet in every orientation,
+            'width', 'length': sheet size used in mm, gap margins included,
+            'parts_area', 'utilization': total area of the placed parts and its ratio to width * length,
+            'seconds', 'collision_tests': runtime and number of outline collision tests,
+            'loops', 'bulges', 'layers': placed loops in sheet coordinates, their bulges and part layer name, for
+                export_nesting
+        }
+    """
+    from .simplify import douglas_peucker
+
+    start = time.perf_counter()
+    inner_width = width - 2 * gap
+    sheet = Sheet(inner_width, gap + 2 * tolerance)
+    outers = [outer_loops(part['loops']) for part in parts]
+
+    placements, unplaced = [], []
+    loops, bulges, layers = [], [], []
+    parts_area = 0.0
+    for index in sorted(range(len(parts)), key=lambda i: -outers[i][1]):
+        part = parts[index]
+        outer_indices, area = outers[index]
+        outlines = []
+        for i in outer_indices:
+            outer = np.asarray(part['loops'][i], dtype=np.float64)
+            outlines.append(outer[douglas_peucker(outer, tolerance)])
+        best = None
+        for angle, rotated in _orientations(outlines, rotations):
+            shape = _Shape(rotated)
+            limit = best[0][0] - shape.box[3] if best is not None else math.inf
+            position = _best_position(sheet, shape, resolution, num_candidates, limit)
+            if position is not None:
+                key = (position[1] + shape.box[3], position[0])
+                if best is None or key < best[0]:
+                    best = (key, angle, shape, position)
+        if best is None:
+            unplaced.append(part['name'])
+            if verbose:
+                print(f"  {part['name']}: wider than the sheet, not placed")
+            continue
+        _, angle, shape, (x, y) = best
+        sheet.place(shape, (x, y))
+
+        # Same rigid motion on every loop of the part: rotation, then the shift of the rotated collision outline
+        rotation = _rotation(angle)
+        shift = np.array([x + gap, y + gap]) - np.min([(outline @ rotation).min(axis=0) for outline in outlines], axis=0)
+        layer = f"PART_{len(placements) + 1}_" + re.sub(r'[^A-Za-z0-9_-]', '_', part['name'])
+        for loop_index, loop in enumerate(part['loops']):
+            loops.append(np.asarray(loop, dtype=np.float64) @ rotation + shift)
+            loop_bulges = part.get('bulges')
+            bulges.append(np.zeros(len(loop)) if loop_bulges is None else np.asarray(loop_bulges[loop_index]))
+            layers.append(layer)
+        box_width, box_height = shape.box[2:] - shape.box[:2]
+        placements.append({'name': part['name'], 'part': index, 'angle': angle, 'x': x + gap, 'y': y + gap,
+                           'width': float(box_width), 'height': float(box_height)})
+        parts_area += area
+        if verbose:
+            print(f"  {part['name']}: placed at ({x + gap:.1f}, {y + gap:.1f}) rotated {angle:g} deg")
+
+    length = max((p['y'] + p['height'] for p in placements), default=0.0) + gap
+    return {
+        'placements': placements,
+        'unplaced': unplaced,
+        'width': width,
+        'length': length,
+        'parts_area': parts_area,
+        'utilization': parts_area / (width * length) if length > 0 else 0.0,
+        'seconds': time.perf_counter() - start,
+        'collision_tests': sheet.collision_tests,
+        'loops': loops,
+        'bulges': bulges,
+        'layers': layers,
+    }
+
+
+def export_nesting(nesting, path_svg=None, path_dxf=None):
+    """
+    Write the nested parts as one SVG and/or DXF file, one layer (SVG group) per part and the sheet outline on the
+    SHEET layer, in sheet coordinates.
+
+    Returns:
+        dict: {'svg': path, 'dxf': path} of the written files
+    """
+    from .import_export import export_outlines
+
+    width, length = nesting['width'], nesting['length']
+    loops = [np.array([[0, 0], [width, 0], [width, length], [0, length]], dtype=np.float64)] + nesting['loops']
+    sizes = [len(loop) for loop in loops]
+    offsets = np.cumsum(sizes) - sizes
+    bounds = [np.arange(offset, offset + size) for offset, size in zip(offsets, sizes)]
+    bulges = [np.zeros(4)] + nesting['bulges']
+    has_arcs = any(np.any(b) for b in bulges)
+    return export_outlines(np.concatenate(loops), bounds, path_svg, path_dxf, layers=['SHEET'] + nesting['layers'],
+                           bulges=bulges if has_arcs else None)
+
+
+def part_from_result(result, name, simplify_tolerance=None, fit_arcs=False):
+    """
+    Nesting part of a flatten_surface.main or flatten result: its boundary loops in unwrap coordinates.
+
+    Args:
+        result: Result dict with 'unwrap' and 'faces'
+        name: Part name, used for its layer
+        simplify_tolerance: Simplify the loops within this distance first (see simplify.simplify_outlines)
+        fit_arcs: Also fit arcs to the simplified loops
+    """
+    from .igl_api import get_all_bounds
+    from .simplify import simplify_outlines
+
+    unwrap = np.asarray(result['unwrap'], dtype=np.float64)
+    faces = np.asarray(result['faces'])
+    bounds = [bound for bound in get_all_bounds(faces[(faces >= 0).all(axis=1)]) if np.isfinite(unwrap[bound]).all()]
+    bulges = None
+    if simplify_tolerance is not None:
+        bounds, bulges, _ = simplify_outlines(unwrap, bounds, simplify_tolerance, fit_arcs)
+    return {'name': name, 'loops': [unwrap[bound] for bound in bounds], 'bulges': bulges}
+
+
+def read_artifact_part(path, name=None):
+    """
+    Nesting part of the boundary loops of a result artifact (see artifact.write_artifact), loops of faces that were
+    not flattened (charts) are skipped.
+
+    Args:
+        path: Artifact .npz file
+        name: Part name (default: file name without extension)
+    """
+    from .artifact import open_artifact
+
+    artifact = open_artifact(path)
+    unwrap = np.asarray(artifact['unwrap'], dtype=np.float64)
+    loops = [loop for loop in (unwrap[bound] for bound in artifact.bounds) if np.isfinite(loop).all()]
+    if not loops:
+        raise ValueError(f"No boundary loop in artifact {path}")
+    return {'name': name or os.path.splitext(os.path.basename(path))[0], 'loops': loops, 'bulges': None}
+
+
+def read_dxf_part(path, name=None):
+    """
+    Nesting part of the closed polylines of a DXF file (R12 POLYLINE with their VERTEX bulges, as written by
+    export_dxf, or LWPOLYLINE).
+
+    Args:
+        path: DXF file
+        name: Part name (default: file name without extension)
+
+    Raises:
+        ValueError: If the file has no polyline
+    """
+    with open(path, encoding='utf-8', errors='replace') as f:
+        lines = [line.strip() for line in f]
+    loops, bulges = [], []
+    points = loop_bulges = None
+    entity = None
+
+    def close():
+        if points:
+            loops.append(np.array(points, dtype=np.float64))
+            bulges.append(np.array(loop_bulges, dtype=np.float64))
+
+    for code, value in zip(lines[0::2], lines[1::2]):
+        if code == '0':
+            if value in ('POLYLINE', 'LWPOLYLINE'):
+                close()
+                points, loop_bulges = [], []
+            elif value == 'SEQEND' or (entity == 'LWPOLYLINE' and value != 'VERTEX'):
+                close()
+                points = None
+            entity = value
+        elif points is None:
+            continue
+        elif code == '10' and entity in ('VERTEX', 'LWPOLYLINE'):
+            points.append([float(value), 0.0])
+            loop_bulges.append(0.0)
+        elif code == '20' and entity in ('VERTEX', 'LWPOLYLINE') and points:
+            points[-1][1] = float(value)
+        elif code == '42' and entity in ('VERTEX', 'LWPOLYLINE') and points:
+            loop_bulges[-1] = float(value)
+    close()
+    if not loops:
+        raise ValueError(f"No polyline in {path}")
+    return {'name': name or os.path.splitext(os.path.basename(path))[0], 'loops': loops,
+            'bulges': bulges if any(np.any(b) for b in bulges) else None}
+
+
+def parts_from_manifest(path):
+    """Nesting parts of the DXF outputs of the files flattened by a batch run (see batch.run_batch)."""
+    with open(path) as f:
+        manifest = json.load(f)
+    return [read_dxf_part(entry['outputs']['dxf']) for entry in manifest['files']
+            if entry['status'] == 'ok' and 'dxf' in entry.get('outputs', {})]
+
+
+def load_parts(inputs):
+    """Nesting parts of DXF files, result artifacts (.npz), directories of DXF files, glob patterns and batch
+    manifests (.json)."""
+    parts = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            paths = sorted(os.path.join(entry, name) for name in os.listdir(entry) if name.lower().endswith('.dxf'))
+        elif glob.has_magic(entry):
+            paths = sorted(glob.glob(entry, recursive=True))
+        else:
+            paths = [entry]
+        for path in paths:
+            if path.lower().endswith('.json'):
+                parts.extend(parts_from_manifest(path))
+            elif path.lower().endswith('.npz'):
+                parts.append(read_artifact_part(path))
+            else:
+                parts.append(read_dxf_part(path))
+    return parts
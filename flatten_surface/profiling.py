@@ -0,0 +1,114 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+
+def current_rss():
+    """Resident memory of this process in bytes, from /proc (Linux), or the peak so far elsewhere."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return peak_rss()
+
+
+def peak_rss():
+    """Peak resident memory of this process in bytes, 0 where it cannot be measured."""
+    try:
+        # Unlike ru_maxrss, the high water mark of /proc does not start at the peak of the parent process
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        # Unix only
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Profiler:
+    """
+    Wall and CPU time of the pipeline stages, memory samples and per-candidate timings of the optimization.
+
+    Stages are timed with the stage() context manager, a stage entered several times accumulates. CPU time is the
+    one of this process, pool workers excluded. metrics() returns everything as a dict and write_chrome_trace()
+    writes it in the Chrome trace event format (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.stages = {}
+        self.candidates = []
+        self.memory_samples = []
+        self._events = []
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            cpu = time.process_time() - cpu_start
+            rss = current_rss() / 2 ** 20
+            entry = self.stages.setdefault(name, {'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'calls': 0})
+            entry['wall_seconds'] += end - start
+            entry['cpu_seconds'] += cpu
+            entry['calls'] += 1
+            entry['rss_mib'] = rss
+            self.memory_samples.append((end - self.origin, rss))
+            self._events.append({'name': name, 'cat': 'stage', 'ph': 'X', 'ts': self._microseconds(start),
+                                 'dur': (end - start) * 1e6, 'pid': os.getpid(), 'tid': 0,
+                                 'args': {'cpu_seconds': cpu}})
+            self._events.append({'name': 'rss', 'ph': 'C', 'ts': self._microseconds(end), 'pid': os.getpid(),
+                                 'args': {'MiB': rss}})
+
+    def add_candidates(self, timings):
+        """Record candidate timings from optimize_initial_points ('candidate_timings')."""
+        for timing in timings:
+            self.candidates.append(dict(timing, start=timing['start'] - self.origin))
+
+    def _microseconds(self, timestamp):
+        return (timestamp - self.origin) * 1e6
+
+    def metrics(self):
+        """
+        Returns:
+            dict: {
+                'stages': {name: {'wall_seconds', 'cpu_seconds', 'calls', 'rss_mib' at the end of the stage}},
+                'candidates': list of {'face_id', 'start' (seconds from the start), 'seconds', 'worker' (pid)},
+                'memory_samples': list of (seconds from the start, RSS in MiB),
+                'peak_rss_mib': peak resident memory of this process,
+                'wall_seconds': time since the profiler was created
+            }
+        """
+        return {
+            'stages': self.stages,
+            'candidates': self.candidates,
+            'memory_samples': self.memory_samples,
+            'peak_rss_mib': peak_rss() / 2 ** 20,
+            'wall_seconds': time.perf_counter() - self.origin,
+        }
+
+    def write_chrome_trace(self, path):
+        """Write the stages, memory samples and candidates (one row per worker process) as a Chrome trace."""
+        events = list(self._events)
+        for candidate in self.candidates:
+            events.append({'name': f"face {candidate['face_id']}", 'cat': 'candidate', 'ph': 'X',
+                           'ts': candidate['start'] * 1e6, 'dur': candidate['seconds'] * 1e6,
+                           'pid': os.getpid(), 'tid': candidate['worker'],
+                           'args': {'face_id': candidate['face_id']}})
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': 0, 'args': {'name': 'stages'}})
+        for worker in sorted({candidate['worker'] for candidate in self.candidates}):
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': worker,
+                           'args': {'name': f"candidates (pid {worker})"}})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
@@ -0,0 +1,282 @@
+import numpy as np
+
+
+# Above this many faces, the 3D view is drawn from a vertex-clustered proxy and the heatmap is rasterized
+PREVIEW_FACES = 20000
+
+DEFAULT_DPI = 100
+
+PANELS = ('mesh', 'heatmap', 'convergence')
+
+# Smallest area change (percent) at the ends of the heatmap color scale
+MIN_COLOR_RANGE = 1e-3
+
+# Pixel samples tested at once when rasterizing
+RASTER_CHUNK = 1 << 22
+
+# Size of one panel in inches
+PANEL_SIZE = (6, 5)
+
+LIGHT = np.array([0.3, -0.5, 0.8]) / np.linalg.norm([0.3, -0.5, 0.8])
+
+
+def cluster_decimate(vertices, faces, max_faces):
+    """
+    Proxy of a mesh with about max_faces faces at most, by vertex clustering on a regular grid.
+
+    Vertices of a cell are merged into their mean and collapsed faces are dropped, a single pass over the faces
+    without any quality guarantee: meant for previews, see igl_api.decimate for a proxy to flatten.
+
+    Returns:
+        tuple: (proxy_vertices, proxy_faces), the mesh itself if it has no more than max_faces faces
+    """
+    from .geometry import face_geometry
+
+    if len(faces) <= max_faces:
+        return vertices, faces
+    vertices = np.asarray(vertices, dtype=np.float64)
+    # A grid cell per two proxy faces on the surface
+    cell = np.sqrt(face_geometry(vertices, faces, normals=False)[0].sum() / (max_faces / 2))
+    while True:
+        cells = np.floor((vertices - vertices.min(axis=0)) / cell).astype(np.int64)
+        _, cluster, counts = np.unique((cells[:, 0] * (cells[:, 1].max() + 1) + cells[:, 1]) * (cells[:, 2].max() + 1) +
+                                       cells[:, 2], return_inverse=True, return_counts=True)
+        proxy_faces = np.sort(cluster[faces], axis=1)
+        proxy_faces = proxy_faces[(proxy_faces[:, 0] != proxy_faces[:, 1]) & (proxy_faces[:, 1] != proxy_faces[:, 2])]
+        num_clusters = len(counts)
+        _, first = np.unique((proxy_faces[:, 0] * num_clusters + proxy_faces[:, 1]) * num_clusters + proxy_faces[:, 2],
+                             return_index=True)
+        # Sorting the ids flips some faces, harmless for flat shading by unsigned normals
+        proxy_faces = proxy_faces[first]
+        if len(proxy_faces) <= max_faces:
+            break
+        cell *= np.sqrt(len(proxy_faces) / max_faces) * 1.05
+    proxy_vertices = np.zeros((len(counts), 3))
+    np.add.at(proxy_vertices, cluster, vertices)
+    return proxy_vertices / counts[:, None], proxy_faces
+
+
+def rasterize_faces(points, faces, values, shape, extent):
+    """
+    Image of per-face values: each pixel takes the mean value of the faces covering its center.
+
+    Faces too small to cover a pixel center are added at their center, weighted by their area, so no face is lost
+    however fine the mesh. Vectorized over faces, in chunks of RASTER_CHUNK pixel samples.
+
+    Args:
+        points: 2D vertices
+        faces: Faces
+        values: Value of each face
+        shape: (rows, columns) of the image
+        extent: (xmin, xmax, ymin, ymax) covered by the image
+
+    Returns:
+        np.ndarray: rows by columns image, row 0 at ymin, NaN outside the mesh
+    """
+    rows, columns = shape
+    xmin, xmax, ymin, ymax = extent
+    scale = np.array([columns / (xmax - xmin), rows / (ymax - ymin)])
+    pixels = (points.astype(np.float64) - [xmin, ymin]) * scale
+    corners = [pixels[faces[:, i]] for i in range(3)]
+    values = np.asarray(values, dtype=np.float64)
+    total = np.zeros(rows * columns)
+    weight = np.zeros(rows * columns)
+
+    # Face centers, weighted by their area in pixels
+    e1 = corners[1] - corners[0]
+    e2 = corners[2] - corners[0]
+    double_areas = e1[:, 0] * e2[:, 1] - e1[:, 1] * e2[:, 0]
+    centers = ((corners[0] + corners[1] + corners[2]) / 3).astype(np.int64)
+    pixel = np.clip(centers[:, 1], 0, rows - 1) * columns + np.clip(centers[:, 0], 0, columns - 1)
+    weights = 0.5 * np.abs(double_areas) + 1e-12
+    total += np.bincount(pixel, weights * values, rows * columns)
+    weight += np.bincount(pixel, weights, rows * columns)
+
+    # Pixel centers within the bounding box of each face
+    low = np.clip(np.ceil(np.minimum(np.minimum(*corners[:2]), corners[2]) - 0.5), 0, [columns, rows]).astype(np.int64)
+    high = np.clip(np.floor(np.maximum(np.maximum(*corners[:2]), corners[2]) - 0.5), -1,
+                   [columns - 1, rows - 1]).astype(np.int64)
+    size = np.maximum(high - low + 1, 0)
+    counts = size[:, 0] * size[:, 1]
+    ends = np.cumsum(counts)
+    start = 0
+    while start < len(faces):
+        stop = max(int(np.searchsorted(ends, ends[start] - counts[start] + RASTER_CHUNK, side='right')), start + 1)
+        chunk = np.arange(start, stop)
+        chunk_counts = counts[chunk]
+        face = np.repeat(chunk, chunk_counts)
+        offset = np.arange(len(face)) - np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+        column = low[face, 0] + offset % np.maximum(size[face, 0], 1)
+        row = low[face, 1] + offset // np.maximum(size[face, 0], 1)
+        sample = np.stack([column + 0.5, row + 0.5], axis=1)
+        # Inside when the three edge functions have the sign of the face
+        inside = np.ones(len(face), dtype=bool)
+        orientation = np.sign(double_areas[face])
+        for i in range(3):
+            a, b = corners[i][face], corners[(i + 1) % 3][face]
+            edge = (b[:, 0] - a[:, 0]) * (sample[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (sample[:, 0] - a[:, 0])
+            inside &= edge * orientation >= 0
+        inside &= orientation != 0
+        pixel = row[inside] * columns + column[inside]
+        total += np.bincount(pixel, values[face[inside]], rows * columns)
+        weight += np.bincount(pixel, minlength=rows * columns)
+        start = stop
+
+    image = np.full(rows * columns, np.nan)
+    covered = weight > 0
+    image[covered] = total[covered] / weight[covered]
+    return image.reshape(rows, columns)
+
+
+def render_preview(path_png, vertices, faces, unwrap=None, deformation=None, optimization_results=None, bounds=None,
+                   dpi=DEFAULT_DPI, max_faces=PREVIEW_FACES, panels=None):
+    """
+    Write a PNG preview without any window: 3D mesh, distortion heatmap of the unwrap and optimization convergence.
+
+    Uses the Agg canvas directly (no pyplot state, safe in worker processes and threads). Each mesh is drawn as a
+    single collection without edges. Meshes of more than max_faces faces are drawn from a vertex-clustered proxy (3D)
+    and as an image of the distortion (heatmap), so the cost stays bounded whatever the mesh size.
+
+    Args:
+        path_png: Output PNG path
+        vertices: 3D vertices
+        faces: Faces (of the unwrap)
+        unwrap: UVs, for the heatmap
+        deformation: Area change of each face in percent, for the heatmap
+        optimization_results: Result of optimize_initial_points, for the convergence plot
+        bounds: Boundary loops (vertex ids) drawn on both views
+        dpi: Resolution of the PNG
+        max_faces: Face count above which the mesh is decimated or rasterized
+        panels: Panels to draw among PANELS (default: those with data)
+
+    Returns:
+        str: path_png
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    if panels is None:
+        panels = [panel for panel, available in zip(PANELS, (True, unwrap is not None and deformation is not None,
+                                                             optimization_results is not None)) if available]
+    unknown = set(panels) - set(PANELS)
+    if unknown:
+        raise ValueError(f"Unknown panels {sorted(unknown)}, expected some of {PANELS}")
+
+    fig = Figure(figsize=(PANEL_SIZE[0] * len(panels), PANEL_SIZE[1]), dpi=dpi, layout='constrained')
+    FigureCanvasAgg(fig)
+    for index, panel in enumerate(panels):
+        if panel == 'mesh':
+            draw_mesh(fig.add_subplot(1, len(panels), index + 1, projection='3d'), vertices, faces, bounds, max_faces)
+        elif panel == 'heatmap':
+            draw_heatmap(fig.add_subplot(1, len(panels), index + 1), unwrap, faces, deformation, bounds, max_faces)
+        else:
+            draw_convergence(fig.add_subplot(1, len(panels), index + 1), optimization_results)
+    fig.savefig(path_png, dpi=dpi)
+    return path_png
+
+
+def draw_mesh(ax, vertices, faces, bounds=None, max_faces=PREVIEW_FACES):
+    """Draw a 3D mesh on a 3D axes as one flat-shaded collection, from a proxy above max_faces faces."""
+    from matplotlib import colormaps
+    from mpl_toolkits.mplot3d.art3d import Line3DCollection, Poly3DCollection
+    from .geometry import face_geometry
+
+    proxy_vertices, proxy_faces = cluster_decimate(vertices, faces, max_faces)
+    normals = face_geometry(np.asarray(proxy_vertices, dtype=np.float64), proxy_faces)[1]
+    shade = 0.35 + 0.65 * np.abs(normals @ LIGHT)
+    colors = colormaps['Blues'](0.35 + 0.45 * shade)
+    ax.add_collection3d(Poly3DCollection(proxy_vertices[proxy_faces], facecolors=colors, edgecolors='none',
+                                         linewidths=0, antialiased=False))
+    if bounds is not None and len(bounds):
+        ax.add_collection3d(Line3DCollection([vertices[np.append(bound, bound[0])] for bound in bounds],
+                                             colors='green', linewidths=1))
+    low, high = vertices.min(axis=0), vertices.max(axis=0)
+    ax.auto_scale_xyz(*zip(low, high))
+    ax.set_box_aspect(np.maximum(high - low, 1e-3 * np.max(high - low)))
+    title = 'Original 3D Mesh'
+    if len(proxy_faces) < len(faces):
+        title += f'\n(preview of {len(proxy_faces)} of {len(faces)} faces)'
+    ax.set_title(title)
+    ax.set_xlabel('X')
+    ax.set_ylabel('Y')
+    ax.set_zlabel('Z')
+
+
+def draw_heatmap(ax, unwrap, faces, deformation, bounds=None, max_faces=PREVIEW_FACES):
+    """
+    Draw the area change of each face on the unwrap, as one collection or above max_faces faces as an image.
+
+    Returns:
+        The mappable (for a colorbar)
+    """
+    from matplotlib.collections import LineCollection, PolyCollection
+    from matplotlib.colors import Normalize
+    from .score import compute_overall_distortion
+
+    deformation = np.asarray(deformation, dtype=np.float64)
+    flattened = np.isfinite(deformation)
+    faces, deformation = faces[flattened], deformation[flattened]
+    # Symmetric around 0, outliers saturate, rounding noise of developable surfaces stays white
+    limit = max(float(np.percentile(np.abs(deformation), 99)) if len(deformation) else 0.0, MIN_COLOR_RANGE)
+    norm = Normalize(-limit, limit)
+    low, high = unwrap.min(axis=0).astype(np.float64), unwrap.max(axis=0).astype(np.float64)
+    if len(faces) > max_faces:
+        # One pixel of the image per screen pixel of the axes
+        bbox = ax.get_window_extent()
+        span = np.maximum(high - low, 1e-12)
+        columns = max(int(bbox.width), 1)
+        rows = max(int(round(columns * span[1] / span[0])), 1)
+        if rows > bbox.height:
+            rows = max(int(bbox.height), 1)
+            columns = max(int(round(rows * span[0] / span[1])), 1)
+        extent = (low[0], low[0] + span[0], low[1], low[1] + span[1])
+        mappable = ax.imshow(rasterize_faces(unwrap, faces, deformation, (rows, columns), extent), origin='lower',
+                             extent=extent, cmap='RdBu_r', norm=norm, interpolation='nearest')
+    else:
+        mappable = PolyCollection(unwrap[faces], array=deformation, cmap='RdBu_r', norm=norm, edgecolors='face',
+                                  linewidths=0.2)
+        ax.add_collection(mappable)
+    if bounds is not None and len(bounds):
+        ax.add_collection(LineCollection([unwrap[np.append(bound, bound[0])] for bound in bounds], colors='green',
+                                         linewidths=1))
+    ax.set_xlim(low[0], high[0])
+    ax.set_ylim(low[1], high[1])
+    ax.set_aspect('equal')
+    colorbar = ax.figure.colorbar(mappable, ax=ax)
+    colorbar.set_label('Area Change (%)', rotation=270, labelpad=20)
+    ax.set_title(f'Parameterized 2D Mesh (LSCM)\nOverall distortion: {compute_overall_distortion(deformation):.1f}%\n'
+                 f'Red=Stretch, Blue=Shrink')
+    ax.set_xlabel('U')
+    ax.set_ylabel('V')
+    return mappable
+
+
+def draw_convergence(ax, optimization_results):
+    """Draw the distortion of every optimization attempt, the running minimum, the best and the default."""
+    history = optimization_results['optimization_history']
+    attempts = np.arange(1, len(history) + 1)
+    distortions = np.array([dist for _, dist in history], dtype=np.float64)
+    distortions[~np.isfinite(distortions)] = np.nan
+    ax.scatter(attempts, distortions, alpha=0.6, color='lightblue', s=20, label='All attempts')
+
+    best = optimization_results['best_distortion']
+    best_idx = next(i for i, (_, dist) in enumerate(history) if dist == best)
+    ax.scatter([best_idx + 1], [best], color='red', s=100, marker='*', label=f'Best (attempt {best_idx + 1})')
+    if optimization_results['default_distortion'] != best:
+        ax.axhline(y=optimization_results['default_distortion'], color='orange', linestyle='--', alpha=0.7,
+                   label='Default (face_id=0)')
+    running_min = np.fmin.accumulate(np.where(np.isnan(distortions), np.inf, distortions))
+    running_min[~np.isfinite(running_min)] = np.nan
+    ax.plot(attempts, running_min, color='green', linewidth=2, alpha=0.8, label='Running minimum')
+
+    ax.set_xlabel('Optimization Attempt')
+    ax.set_ylabel('RMS Area Distortion')
+    ax.set_title(f'Optimization Convergence\nImprovement: {optimization_results["improvement_percent"]:.1f}%')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    # Exclude failed attempts from the y range
+    valid = distortions[~np.isnan(distortions)]
+    if len(valid):
+        y_range = valid.max() - valid.min()
+        if y_range > 0:
+            ax.set_ylim(valid.min() - 0.1 * y_range, valid.max() + 0.1 * y_range)
@@ -1,37 +1,100 @@
 import numpy as np
 
 
-def compute_deformation(vertices, faces, unwrap):
-    original_edges = vertices[faces[:, [1, 2, 0]]] - vertices[faces[:, [0, 1, 2]]]
-    unfolded_edges = unwrap[faces[:, [1, 2, 0]]] - unwrap[faces[:, [0, 1, 2]]]
+class DeformationScorer:
+    """
+    Area distortion of unwraps of one mesh, for scoring many unwraps (e.g. every optimization attempt).
+
+    The 3D face areas are computed once. The 2D areas are computed in buffers allocated on the first call and
+    reused by the next ones, so a scorer must not be shared between threads. Buffers have the dtype of the 3D areas,
+    float32 for a float32 mesh (low-memory mode).
+
+    Args:
+        vertices: Mesh vertices array
+        faces: Mesh faces array
+        topology: MeshTopology of the mesh, its cached 3D face areas are used when given
+        logger: logging.Logger receiving the 3D/2D area summary of deformation() at INFO level
+    """
+
+    def __init__(self, vertices, faces, topology=None, logger=None):
+        if topology is not None:
+            self.original_areas = topology.face_areas
+        else:
+            from .geometry import face_geometry
+            self.original_areas = face_geometry(vertices, faces, normals=False)[0]
+        self.dtype = self.original_areas.dtype
+        self.area_3d = np.sum(self.original_areas, dtype=np.float64)
+        self.faces = faces
+        self.logger = logger
+        self._corner_ids = None
+        self._corners = None
+        self._areas = None
+        self._scratch = None
+        self._percent_scale = None
 
-    # original_lengths = np.linalg.norm(original_edges, axis=2)
-    # unfolded_lengths = np.linalg.norm(unfolded_edges, axis=2)
+    def _allocate(self):
+        num_faces = len(self.faces)
+        self._corner_ids = np.ascontiguousarray(self.faces.T)
+        self._corners = np.empty((3, num_faces, 2), dtype=self.dtype)
+        self._areas = np.empty(num_faces, dtype=self.dtype)
+        self._scratch = np.empty(num_faces, dtype=self.dtype)
+        with np.errstate(divide='ignore'):
+            self._percent_scale = 100 / self.original_areas
 
-    # length_ratios = unfolded_lengths / original_lengths
-    #
-    # original_angles = np.arccos(np.clip(np.sum(original_edges[:, 0] * original_edges[:, 1], axis=1) /
-    #                                     (np.linalg.norm(original_edges[:, 0], axis=1) * np.linalg.norm(
-    #                                         original_edges[:, 1], axis=1)), -1.0, 1.0))
-    # unfolded_angles = np.arccos(np.clip(np.sum(unfolded_edges[:, 0] * unfolded_edges[:, 1], axis=1) /
-    #                                     (np.linalg.norm(unfolded_edges[:, 0], axis=1) * np.linalg.norm(
-    #                                         unfolded_edges[:, 1], axis=1)), -1.0, 1.0))
+    def unfolded_areas(self, unwrap):
+        """
+        2D area of each face of unwrap.
 
-    original_areas = np.linalg.norm(np.cross(original_edges[:, 0], original_edges[:, 1]), axis=1)
-    unfolded_areas = np.abs(np.cross(unfolded_edges[:, 0], unfolded_edges[:, 1]))
-    area_2d = np.sum(unfolded_areas)
-    area_3d = np.sum(original_areas)
+        Returns:
+            np.ndarray: Internal buffer, overwritten by the next call on this scorer
+        """
+        if self._corners is None:
+            self._allocate()
+        unwrap = np.asarray(unwrap, dtype=self.dtype)
+        p0, p1, p2 = self._corners
+        for k in range(3):
+            np.take(unwrap, self._corner_ids[k], axis=0, out=self._corners[k])
+        p1 -= p0
+        p2 -= p0
+        areas = self._areas
+        np.multiply(p1[:, 0], p2[:, 1], out=areas)
+        np.multiply(p1[:, 1], p2[:, 0], out=self._scratch)
+        areas -= self._scratch
+        np.abs(areas, out=areas)
+        areas *= 0.5
+        return areas
 
-    area_diff = area_3d - area_2d
+    def deformation(self, unwrap):
+        """Percentage area change of each face between the mesh and unwrap, positive = stretching."""
+        unfolded_areas = self.unfolded_areas(unwrap)
+        if self.logger is not None:
+            area_2d = np.sum(unfolded_areas, dtype=np.float64)
+            self.logger.info(f"3D Area: {self.area_3d} mm²")
+            self.logger.info(f"2D Area: {area_2d} mm²")
+            self.logger.info(f"Diff Area: {self.area_3d - area_2d} mm²")
+        with np.errstate(invalid='ignore'):
+            return (unfolded_areas - self.original_areas) * self._percent_scale
 
-    print(f"3D Area: {area_3d} mm²")
-    print(f"2D Area: {area_2d} mm²")
-    print(f"Diff Area: {area_diff} mm²")
+    def distortion(self, unwrap):
+        """Overall distortion of unwrap, same as compute_overall_distortion(self.deformation(unwrap))."""
+        change = self.unfolded_areas(unwrap)
+        change -= self.original_areas
+        with np.errstate(invalid='ignore'):
+            change *= self._percent_scale
+        return np.sqrt(np.float64(np.dot(change, change)) / len(change))
 
-    # Calculate percentage area change: positive = stretching, negative = compression
-    area_change_percent = (unfolded_areas - original_areas) / original_areas * 100
 
-    return area_change_percent
+def compute_deformation(vertices, faces, unwrap, topology=None, logger=None):
+    """
+    Percentage area change of each face between the mesh and its unwrap.
+
+    The 3D face areas cached by topology (a topology.MeshTopology) are used when given. Use a DeformationScorer
+    to score many unwraps of the same mesh.
+
+    Args:
+        logger: logging.Logger receiving the 3D/2D area summary
+    """
+    return DeformationScorer(vertices, faces, topology, logger).deformation(unwrap)
 
 
 def compute_overall_distortion(area_distortion):
@@ -45,5 +108,5 @@ def compute_overall_distortion(area_distortion):
     Returns:
         float: Overall distortion metric (lower is better)
     """
-    rms_distortion = np.sqrt(np.mean(area_distortion ** 2))
+    rms_distortion = np.sqrt(np.mean(np.square(area_distortion), dtype=np.float64))
     return rms_distortion
@@ -0,0 +1,197 @@
+import math
+import time
+
+import numpy as np
+
+
+STRATEGIES = ('random', 'local', 'anneal')
+
+
+class CandidateSearch:
+    """
+    Book-keeping shared by the search strategies: evaluation budget, history and best face found so far.
+
+    Args:
+        evaluate: Callable taking a list of face ids and returning an iterable of (distortion, error) in the same order
+        num_faces: Number of faces of the mesh
+        max_attempts: Maximum number of evaluated faces
+        patience: Stop after this many evaluations without improving the best distortion (None to disable)
+        max_seconds: Wall-clock budget of the search in seconds (None to disable)
+        batch_size: Number of faces sent at once to evaluate, the budget is checked between batches
+        verbose: Print progress information
+        known_distortions: {face_id: distortion} of faces evaluated by previous runs, recorded without evaluation
+        checkpoint: checkpoint.OptimizationCheckpoint updated after every batch (None to disable)
+    """
+
+    def __init__(self, evaluate, num_faces, max_attempts, patience=None, max_seconds=None, batch_size=16,
+                 verbose=True, known_distortions=None, checkpoint=None):
+        self._evaluate = evaluate
+        self.checkpoint = checkpoint
+        self.known_distortions = known_distortions or {}
+        self.reused = 0
+        self.num_faces = num_faces
+        self.max_attempts = max_attempts
+        self.patience = patience
+        self.max_seconds = max_seconds
+        self.batch_size = batch_size
+        self.verbose = verbose
+        self.history = []
+        self.distortions = {}
+        self.best_face_id = 0
+        self.best_distortion = float('inf')
+        self.stop_reason = None
+        self._since_improvement = 0
+        self._start = time.perf_counter()
+
+    def elapsed(self):
+        return time.perf_counter() - self._start
+
+    def exhausted(self):
+        if self.stop_reason is None:
+            if len(self.history) >= self.max_attempts:
+                self.stop_reason = 'attempts'
+            elif len(self.distortions) >= self.num_faces:
+                self.stop_reason = 'all faces evaluated'
+            elif self.patience is not None and self._since_improvement >= self.patience:
+                self.stop_reason = 'patience'
+            elif self.max_seconds is not None and self.elapsed() >= self.max_seconds:
+                self.stop_reason = 'time budget'
+        return self.stop_reason is not None
+
+    def evaluate(self, face_ids):
+        """
+        Evaluate the faces not seen yet, within the remaining budget.
+
+        Returns:
+            list: (face_id, distortion) of the requested faces that have been evaluated, now or before
+        """
+        pending = list(dict.fromkeys(int(f) for f in face_ids if int(f) not in self.distortions))
+        while pending and not self.exhausted():
+            batch, pending = pending[:self.batch_size], pending[self.batch_size:]
+            for face_id, (distortion, error) in zip(batch, self._evaluate_batch(batch)):
+                # Results past the end of the budget are dropped so the history does not depend on batching
+                if self.exhausted():
+                    break
+                self._record(face_id, distortion, error)
+            if self.checkpoint is not None:
+                self.checkpoint.update(self)
+        return [(int(f), self.distortions[int(f)]) for f in face_ids if int(f) in self.distortions]
+
+    def _evaluate_batch(self, batch):
+        unknown = [face_id for face_id in batch if face_id not in self.known_distortions]
+        results = iter(self._evaluate(unknown) if unknown else ())
+        for face_id in batch:
+            if face_id in self.known_distortions:
+                distortion = self.known_distortions[face_id]
+                yield distortion, None if distortion != float('inf') else "failed in a previous run"
+            else:
+                yield next(results)
+
+    def _record(self, face_id, distortion, error):
+        attempt = len(self.history)
+        if face_id in self.known_distortions:
+            self.reused += 1
+        self.history.append((face_id, distortion))
+        self.distortions[face_id] = distortion
+        self._since_improvement += 1
+        if error is not None:
+            if self.verbose:
+                print(f"  Attempt {attempt + 1} failed with face_id={face_id}: {error}")
+            return
+        if distortion < self.best_distortion:
+            self.best_distortion = distortion
+            self.best_face_id = face_id
+            self._since_improvement = 0
+        if self.verbose and attempt % 10 == 0:
+            print(f"  Attempt {attempt + 1}/{self.max_attempts}: face_id={face_id}, distortion={distortion:.4f}")
+
+
+def candidate_schedule(rng, num_faces, boundary_faces, count):
+    """
+    First count faces of a schedule alternating random faces and random faces touching the boundary, without duplicates.
+
+    The schedule only depends on the state of rng and the mesh, and a longer schedule starts with the shorter ones: a
+    run with more attempts evaluates the candidates of a run with fewer attempts first.
+    """
+    generator = np.random.default_rng(rng.getrandbits(64))
+    random_faces = generator.permutation(num_faces)[:count]
+    boundary_sample = generator.permutation(np.asarray(boundary_faces, dtype=np.int64))[:count]
+    num_pairs = min(len(random_faces), len(boundary_sample))
+    interleaved = np.empty(2 * num_pairs, dtype=np.int64)
+    interleaved[0::2] = random_faces[:num_pairs]
+    interleaved[1::2] = boundary_sample[:num_pairs]
+    interleaved = np.concatenate([interleaved, random_faces[num_pairs:], boundary_sample[num_pairs:]])
+    _, first = np.unique(interleaved, return_index=True)
+    return interleaved[np.sort(first)][:count].tolist()
+
+
+def _ranked_seeds(search, seeds):
+    evaluated = search.evaluate(seeds)
+    return [face_id for face_id, distortion in sorted(evaluated, key=lambda item: item[1]) if distortion != float('inf')]
+
+
+def random_search(search, rng, boundary_faces):
+    search.evaluate(candidate_schedule(rng, search.num_faces, boundary_faces, search.max_attempts))
+
+
+def local_search(search, rng, boundary_faces, neighbors, num_seeds):
+    """
+    Coarse seeding then steepest descent over the face adjacency graph, from the best seeds first.
+
+    A descent moves to the best edge-adjacent face, given by neighbors(face_id), while it improves the distortion.
+    """
+    seeds = candidate_schedule(rng, search.num_faces, boundary_faces, num_seeds)
+    for start in _ranked_seeds(search, seeds):
+        current, current_distortion = start, search.distortions[start]
+        while not search.exhausted():
+            evaluated = search.evaluate(neighbors(current))
+            if not evaluated:
+                break
+            neighbor, neighbor_distortion = min(evaluated, key=lambda item: item[1])
+            if neighbor_distortion >= current_distortion:
+                break
+            current, current_distortion = neighbor, neighbor_distortion
+        if search.exhausted():
+            break
+
+
+def anneal_search(search, rng, boundary_faces, neighbors, num_seeds, final_temperature_ratio=0.01, stall_steps=20):
+    """
+    Coarse seeding then simulated annealing over the face adjacency graph, starting from the best seed.
+
+    The initial temperature is the spread of the seed distortions, it decays geometrically with the number of evaluated
+    faces down to final_temperature_ratio of it at the end of the budget. A walk that has not evaluated a new face for
+    stall_steps moves restarts from the next best seed.
+    """
+    seeds = candidate_schedule(rng, search.num_faces, boundary_faces, num_seeds)
+    ranked = _ranked_seeds(search, seeds)
+    if not ranked:
+        return
+    seed_distortions = [search.distortions[face_id] for face_id in ranked]
+    initial_temperature = float(np.std(seed_distortions)) or 1.0
+    first_attempt = len(search.history)
+    remaining = max(1, search.max_attempts - first_attempt)
+
+    restarts = 0
+    current, current_distortion = ranked[0], seed_distortions[0]
+    stalled = 0
+    # Moves onto already evaluated faces are free, cap them so a fully explored neighborhood cannot loop forever
+    for _ in range(10 * search.max_attempts):
+        if search.exhausted():
+            break
+        if stalled >= stall_steps:
+            restarts += 1
+            current = ranked[restarts % len(ranked)]
+            current_distortion = search.distortions[current]
+            stalled = 0
+        num_attempts = len(search.history)
+        evaluated = [item for item in search.evaluate(neighbors(current)) if item[1] != float('inf')]
+        stalled = stalled + 1 if len(search.history) == num_attempts else 0
+        if not evaluated:
+            stalled = stall_steps
+            continue
+        temperature = initial_temperature * final_temperature_ratio ** ((len(search.history) - first_attempt) / remaining)
+        neighbor, neighbor_distortion = rng.choice(evaluated)
+        delta = neighbor_distortion - current_distortion
+        if delta < 0 or rng.random() < math.exp(-delta / temperature):
+            current, current_distortion = neighbor, neighbor_distortion
@@ -0,0 +1,408 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+# Meshes kept loaded, with their topology and LSCM factorization
+DEFAULT_MAX_MESHES = 8
+
+# Unwraps kept per mesh for score and export requests on a face already flattened
+MAX_UNWRAPS = 4
+
+DEFAULT_PORT = 8765
+
+OPERATIONS = ('load', 'flatten', 'score', 'export', 'stats', 'evict')
+
+# Options of flatten requests passed to optimize_initial_points
+OPTIMIZE_OPTIONS = ('strategy', 'patience', 'max_seconds', 'seed', 'objective', 'coarse_faces', 'workers')
+
+# Options of every mesh request passed to import_export.load, part of the mesh key
+LOAD_OPTIONS = ('loader', 'merge_tolerance', 'low_memory')
+
+
+def file_hash(path, chunk_bytes=1 << 20):
+    """SHA-256 of the content of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_bytes), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MeshEntry:
+    """
+    A loaded mesh: its MeshTopology (holding the LSCM factorization once built) and its last unwraps by face id.
+
+    Requests on one mesh are serialized by lock, the topology caches and the scorer buffers are not thread-safe.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.lock = threading.Lock()
+        self.topology = None
+        self.unwraps = OrderedDict()
+        self.load_seconds = None
+
+    def ensure_loaded(self, path, options):
+        from .import_export import load
+        from .topology import MeshTopology
+
+        if self.topology is None:
+            start = time.perf_counter()
+            vertices, faces = load(path, options.get('loader', 'auto'), options.get('merge_tolerance'),
+                                   options.get('low_memory', False))
+            if len(faces) == 0:
+                raise ValueError("No faces in mesh file")
+            self.topology = MeshTopology(vertices, faces)
+            self.load_seconds = time.perf_counter() - start
+        return self.topology
+
+    def keep_unwrap(self, face_id, unwrap):
+        self.unwraps[face_id] = unwrap
+        self.unwraps.move_to_end(face_id)
+        while len(self.unwraps) > MAX_UNWRAPS:
+            self.unwraps.popitem(last=False)
+
+    def unwrap(self, face_id):
+        """Unwrap from face_id, solved again (with the cached factorization) if it is not kept."""
+        from .igl_api import init_unfold, unfold
+
+        if face_id not in self.unwraps:
+            topology = self.topology
+            init_points_ids, init_points_pos, _ = init_unfold(topology.vertices, topology.faces, face_id, topology)
+            self.keep_unwrap(face_id, unfold(topology.vertices, topology.faces, init_points_ids, init_points_pos,
+                                             topology=topology))
+        return self.unwraps[face_id]
+
+    def summary(self):
+        topology = self.topology
+        if topology is None:
+            return {'mesh': self.key[0], 'loaded': False}
+        return {'mesh': self.key[0], 'loaded': True, 'vertices': topology.num_vertices, 'faces': topology.num_faces,
+                'solver': 'lscm_solver' in topology.__dict__, 'unwraps': list(self.unwraps),
+                'nbytes': topology.nbytes, 'load_seconds': self.load_seconds}
+
+
+class MeshStore:
+    """
+    LRU of loaded meshes keyed by file content hash and load options.
+
+    File hashes are memoized by (path, size, modification time), an unchanged file is hashed once. The least
+    recently used mesh is dropped above max_meshes, requests still using it finish normally.
+    """
+
+    def __init__(self, max_meshes=DEFAULT_MAX_MESHES):
+        self.max_meshes = max_meshes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._hashes = {}
+        self._lock = threading.Lock()
+
+    def _file_hash(self, path):
+        stat = os.stat(path)
+        stamp = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+        digest = self._hashes.get(stamp)
+        if digest is None:
+            if len(self._hashes) > 4 * self.max_meshes + 64:
+                self._hashes.clear()
+            digest = self._hashes[stamp] = file_hash(path)
+        return digest
+
+    def get(self, path, options):
+        """MeshEntry of the file, possibly not loaded yet (see MeshEntry.ensure_loaded)."""
+        key = (self._file_hash(path),) + tuple(options.get(name) for name in LOAD_OPTIONS)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                entry = self._entries[key] = MeshEntry(key)
+                while len(self._entries) > self.max_meshes:
+                    self._entries.popitem(last=False)
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+        return entry
+
+    def discard(self, entry):
+        with self._lock:
+            if self._entries.get(entry.key) is entry:
+                del self._entries[entry.key]
+
+    def clear(self):
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+        return count
+
+    def entries(self):
+        with self._lock:
+            return list(self._entries.values())
+
+
+class FlattenService:
+    """
+    Long-running flattening service keeping meshes, topology and LSCM factorizations warm between requests.
+
+    A request is a dict {'op': one of OPERATIONS, 'id': echoed back, 'path': mesh file, ...options}, see the
+    Readme for the options of each operation. handle() never raises, it returns {'id', 'ok', 'result' or 'error',
+    'seconds'}. handle() is thread-safe: requests on different meshes run concurrently, requests on the same mesh
+    one after the other.
+
+    Args:
+        max_meshes: Number of meshes kept loaded (LRU)
+    """
+
+    def __init__(self, max_meshes=DEFAULT_MAX_MESHES):
+        self.store = MeshStore(max_meshes)
+        self.started = time.time()
+        self.requests = 0
+        self._count_lock = threading.Lock()
+
+    @staticmethod
+    def warm_up():
+        """Import the lazily imported dependencies, so that the first request does not pay for them."""
+        import igl, scipy.sparse.linalg, scipy.spatial  # noqa: E401, F401
+        from . import lscm, metrics, score  # noqa: F401
+
+    def handle(self, request):
+        start = time.perf_counter()
+        request_id = request.get('id') if isinstance(request, dict) else None
+        with self._count_lock:
+            self.requests += 1
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("A request must be a JSON object")
+            operation = request.get('op')
+            if operation not in OPERATIONS:
+                raise ValueError(f"Unknown operation '{operation}', expected one of {OPERATIONS}")
+            result = getattr(self, '_' + operation)(request)
+            response = {'id': request_id, 'ok': True, 'result': result}
+        except Exception as e:
+            response = {'id': request_id, 'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        response['seconds'] = time.perf_counter() - start
+        return response
+
+    def _entry(self, request):
+        path = request.get('path')
+        if not path:
+            raise ValueError("Missing 'path' of the mesh file")
+        return self.store.get(path, request)
+
+    def _with_mesh(self, request, operation):
+        """Run operation(entry) holding the lock of the mesh, a mesh failing to load is not kept."""
+        entry = self._entry(request)
+        with entry.lock:
+            try:
+                entry.ensure_loaded(request['path'], request)
+            except Exception:
+                self.store.discard(entry)
+                raise
+            return operation(entry)
+
+    def _load(self, request):
+        return self._with_mesh(request, MeshEntry.summary)
+
+    def _flatten(self, request):
+        from .flatten_surface import flatten
+
+        def operation(entry):
+            topology = entry.topology
+            options = {name: request[name] for name in OPTIMIZE_OPTIONS if name in request}
+            options.setdefault('workers', 1)
+            result = flatten(topology.vertices, topology.faces, int(request.get('face_id', 0)),
+                             bool(request.get('optimize', False)), int(request.get('max_attempts', 50)),
+                             topology=topology, verbose=False, **options)
+            face_id = int(result['face_id_used'])
+            entry.keep_unwrap(face_id, result['unwrap'])
+            response = {
+                'mesh': entry.key[0],
+                'face_id_used': face_id,
+                'distortion': float(result['distortion']),
+                'distortion_metrics': result['distortion_metrics'],
+                'stages': result['metrics']['stages'],
+            }
+            optimization = result['optimization_results']
+            if optimization is not None:
+                response['optimization'] = {key: optimization[key] for key in
+                                            ('best_distortion', 'default_distortion', 'improvement_percent',
+                                             'stop_reason', 'reused_attempts')}
+                response['optimization']['attempts'] = len(optimization['optimization_history'])
+            response.update(self._export_unwrap(entry, result['unwrap'], request))
+            if request.get('return_unwrap'):
+                response['unwrap'] = result['unwrap'].tolist()
+            return response
+
+        return self._with_mesh(request, operation)
+
+    def _score(self, request):
+        def operation(entry):
+            if 'unwrap' in request:
+                unwrap = np.asarray(request['unwrap'], dtype=np.float64)
+                if unwrap.shape != (entry.topology.num_vertices, 2):
+                    raise ValueError(f"unwrap must be {entry.topology.num_vertices} by 2, got {unwrap.shape}")
+            else:
+                unwrap = entry.unwrap(int(request.get('face_id', 0)))
+            metrics = entry.topology.distortion_metrics.overall(unwrap)
+            return {'mesh': entry.key[0], 'distortion': metrics['area'], 'distortion_metrics': metrics}
+
+        return self._with_mesh(request, operation)
+
+    def _export(self, request):
+        def operation(entry):
+            if not any(request.get(kind) for kind in ('svg', 'dxf', 'png')):
+                raise ValueError("Missing 'svg', 'dxf' or 'png' output path")
+            face_id = int(request.get('face_id', 0))
+            return {'mesh': entry.key[0], 'face_id': face_id, **self._export_unwrap(entry, entry.unwrap(face_id), request)}
+
+        return self._with_mesh(request, operation)
+
+    @staticmethod
+    def _export_unwrap(entry, unwrap, request):
+        """Write the requested outputs, returns {'outputs'} and the simplification stats if simplify_tolerance is set."""
+        from .import_export import export_outlines
+
+        bounds, bulges, response = entry.topology.boundary_loops, None, {}
+        if request.get('simplify_tolerance') is not None:
+            from .simplify import simplify_outlines
+
+            bounds, bulges, response['simplification'] = simplify_outlines(
+                unwrap, bounds, float(request['simplify_tolerance']), bool(request.get('fit_arcs', False)))
+        outputs = export_outlines(unwrap, bounds, request.get('svg') or None, request.get('dxf') or None,
+                                  bulges=bulges)
+        if request.get('png'):
+            from .render import DEFAULT_DPI, render_preview
+            from .score import compute_deformation
+
+            topology = entry.topology
+            render_preview(request['png'], topology.vertices, topology.faces, unwrap,
+                           compute_deformation(topology.vertices, topology.faces, unwrap, topology),
+                           bounds=topology.boundary_loops, dpi=int(request.get('dpi', DEFAULT_DPI)))
+            outputs['png'] = request['png']
+        response['outputs'] = outputs
+        return response
+
+    def _stats(self, request):
+        return {
+            'uptime_seconds': time.time() - self.started,
+            'requests': self.requests,
+            'hits': self.store.hits,
+            'misses': self.store.misses,
+            'max_meshes': self.store.max_meshes,
+            'meshes': [entry.summary() for entry in self.store.entries()],
+        }
+
+    def _evict(self, request):
+        if request.get('path'):
+            entry = self._entry(request)
+            self.store.discard(entry)
+            return {'evicted': 1}
+        return {'evicted': self.store.clear()}
+
+
+def _encode(response):
+    from .batch import _json_safe
+
+    return json.dumps(_json_safe(response), default=_json_default)
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def serve_stdin(service, threads=None, stdin=None, stdout=None):
+    """
+    Answer JSON-lines requests read from stdin with JSON-lines responses on stdout, until end of input.
+
+    Requests run in a thread pool and responses are written as they complete, not in request order: clients match
+    them by 'id'. A line that is not valid JSON gets an error response with a null id.
+
+    Args:
+        service: FlattenService
+        threads: Number of requests handled at the same time (default: number of CPU cores)
+    """
+    stdin = stdin if stdin is not None else sys.stdin
+    stdout = stdout if stdout is not None else sys.stdout
+    write_lock = threading.Lock()
+
+    def respond(response):
+        line = _encode(response)
+        with write_lock:
+            stdout.write(line + "\n")
+            stdout.flush()
+
+    def run(line):
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            respond({'id': None, 'ok': False, 'error': f"Invalid JSON: {e}"})
+            return
+        respond(service.handle(request))
+
+    with ThreadPoolExecutor(max_workers=threads or os.cpu_count() or 1) as executor:
+        for line in stdin:
+            if line.strip():
+                executor.submit(run, line)
+
+
+def serve_http(service, host='127.0.0.1', port=DEFAULT_PORT, verbose=True):
+    """
+    Answer requests over HTTP with a thread per connection, until interrupted.
+
+    POST / takes a request as JSON body, POST /<op> sets its operation, GET /stats returns the statistics.
+    Responses are JSON, with status 200, or 400 for failed requests.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, response):
+            body = _encode(response).encode()
+            self.send_response(200 if response['ok'] else 400)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip('/') != '/stats':
+                self._send({'id': None, 'ok': False, 'error': f"Unknown path {self.path}, use POST or GET /stats"})
+                return
+            self._send(service.handle({'op': 'stats'}))
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            try:
+                request = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError as e:
+                self._send({'id': None, 'ok': False, 'error': f"Invalid JSON: {e}"})
+                return
+            operation = self.path.strip('/')
+            if operation and isinstance(request, dict):
+                request['op'] = operation
+            self._send(service.handle(request))
+
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    if verbose:
+        print(f"Serving on http://{host}:{server.server_address[1]}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
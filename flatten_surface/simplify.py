@@ -0,0 +1,247 @@
+import math
+
+import numpy as np
+
+
+# Loops with at most this many points are exported as they are
+MIN_LOOP_POINTS = 4
+
+# Fewest simplified segments replaced by one arc
+MIN_ARC_SEGMENTS = 3
+
+# Largest angle swept by one arc, bulges of nearly full circles are ill-conditioned
+MAX_ARC_ANGLE = 1.5 * math.pi
+
+
+def _segment_distances(points, starts, ends):
+    """Distance of each point to the segment from starts to ends (rows of the same length)."""
+    chord = ends - starts
+    length2 = np.einsum('ij,ij->i', chord, chord)
+    t = np.einsum('ij,ij->i', points - starts, chord)
+    np.divide(t, length2, out=t, where=length2 > 0)
+    t[length2 == 0] = 0
+    np.clip(t, 0, 1, out=t)
+    return np.linalg.norm(starts + t[:, None] * chord - points, axis=1)
+
+
+def douglas_peucker(points, tolerance, closed=True):
+    """
+    Douglas-Peucker simplification, vectorized over all the segments of a recursion level.
+
+    Every level computes the distances of the points of all the segments still too far from their chord at once and
+    splits these segments at their farthest point, so the Python loop runs once per level (about log2 of the number of
+    points) instead of once per segment. A closed loop is first split at its first point and the point farthest
+    from it, each half is split once more whatever the tolerance so that a loop keeps at least 4 points.
+
+    Args:
+        points: #P by 2 points
+        tolerance: Largest distance of a removed point to the simplified polyline
+        closed: points is a closed loop (the last point connects to the first one)
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points
+    """
+    num_points = len(points)
+    if num_points <= MIN_LOOP_POINTS:
+        return np.arange(num_points)
+    if closed:
+        far = int(np.argmax(np.linalg.norm(points - points[0], axis=1)))
+        # The closing point is the first one again, at index num_points
+        points = np.concatenate([points, points[:1]])
+        starts, ends = np.array([0, far]), np.array([far, num_points])
+        forced = True
+    else:
+        starts, ends = np.array([0]), np.array([num_points - 1])
+        forced = False
+    keep = np.zeros(len(points), dtype=bool)
+    keep[starts] = keep[ends] = True
+
+    while len(starts):
+        lengths = ends - starts - 1
+        valid = lengths > 0
+        starts, ends, lengths = starts[valid], ends[valid], lengths[valid]
+        if not len(starts):
+            break
+        offsets = np.cumsum(lengths) - lengths
+        segment = np.repeat(np.arange(len(starts)), lengths)
+        index = np.arange(lengths.sum()) - np.repeat(offsets, lengths) + np.repeat(starts + 1, lengths)
+        distances = _segment_distances(points[index], points[starts[segment]], points[ends[segment]])
+        largest = np.maximum.reduceat(distances, offsets)
+        # First farthest point of each segment
+        candidates = np.flatnonzero(distances == largest[segment])
+        _, first = np.unique(segment[candidates], return_index=True)
+        farthest = index[candidates[first]]
+        split = largest > tolerance
+        if forced:
+            split[:] = True
+            forced = False
+        keep[farthest[split]] = True
+        starts, ends, farthest = starts[split], ends[split], farthest[split]
+        starts, ends = np.concatenate([starts, farthest]), np.concatenate([farthest, ends])
+
+    kept = np.flatnonzero(keep)
+    return kept[kept < num_points] if closed else kept
+
+
+def polyline_deviation(points, kept, closed=True):
+    """Largest distance of the points to the polyline through points[kept] (kept sorted, containing 0)."""
+    if closed:
+        points = np.concatenate([points, points[:1]])
+        kept = np.append(kept, len(points) - 1)
+    segment = np.searchsorted(kept, np.arange(len(points)), side='right') - 1
+    segment = np.minimum(segment, len(kept) - 2)
+    return float(_segment_distances(points, points[kept[segment]], points[kept[segment + 1]]).max(initial=0))
+
+
+def _arc_through(points, tolerance):
+    """
+    Bulge of the circular arc from the first to the last point closest to the points in between, if every point lies
+    within tolerance of it, else None.
+
+    The center lies on the bisector of the chord, at the position minimizing the algebraic distances
+    |p - c|^2 - r^2 of the points (linear in the position along the bisector). The distance of a point to the arc is
+    its radial distance within the angular span of the arc and its distance to the closest end outside of it, so
+    noisy points slightly out of order along the arc are accepted.
+
+    Returns:
+        tuple or None: (bulge, largest distance of the points to the arc)
+    """
+    start, end = points[0], points[-1]
+    middle = (start + end) / 2
+    chord = end - start
+    half2 = (chord @ chord) / 4
+    if half2 == 0:
+        return None
+    normal = np.array([-chord[1], chord[0]]) / math.sqrt(4 * half2)
+    relative = points - middle
+    along = 2 * relative @ normal
+    squares = np.einsum('ij,ij->i', relative, relative) - half2
+    if not np.any(along):
+        return None
+    center = middle + (squares @ along) / (along @ along) * normal
+    radius = np.linalg.norm(start - center)
+    distances = np.abs(np.linalg.norm(points - center, axis=1) - radius)
+    if distances.max() > tolerance:
+        return None
+    # Counterclockwise when the points are mostly right of the chord
+    direction = 1.0 if along.sum() < 0 else -1.0
+    angles = np.arctan2(points[:, 1] - center[1], points[:, 0] - center[0])
+    swept = np.mod(direction * (angles - angles[0]), 2 * np.pi)
+    angle = swept[-1]
+    if angle > MAX_ARC_ANGLE:
+        return None
+    outside = swept > angle
+    if np.any(outside):
+        ends = np.minimum(np.linalg.norm(points[outside] - start, axis=1), np.linalg.norm(points[outside] - end, axis=1))
+        distances[outside] = ends
+    deviation = float(distances.max())
+    if deviation > tolerance:
+        return None
+    return direction * math.tan(angle / 4), deviation
+
+
+def fit_arcs(points, kept, tolerance):
+    """
+    Replace runs of at least MIN_ARC_SEGMENTS simplified segments by circular arcs through the original points.
+
+    From each vertex, the longest run of segments whose original points all lie within tolerance of an arc is
+    searched by doubling then bisection, and replaced by one arc if found.
+
+    Args:
+        points: Points of the closed loop
+        kept: Sorted indices of the simplified polyline (douglas_peucker)
+        tolerance: Largest distance of an original point to its arc
+
+    Returns:
+        tuple: (vertex indices, bulge of the segment starting at each vertex, largest deviation of the arcs)
+    """
+    closed_points = np.concatenate([points, points[:1]])
+    ends = np.append(kept, len(points))
+    vertices, bulges = [], []
+    deviation = 0.0
+    position = 0
+    last = len(ends) - 1
+
+    def arc(first, stop):
+        return _arc_through(closed_points[ends[first]:ends[stop] + 1], tolerance)
+
+    while position < last:
+        vertices.append(ends[position])
+        best = None
+        step = MIN_ARC_SEGMENTS
+        failed = None
+        while position + step <= last:
+            fit = arc(position, position + step)
+            if fit is None:
+                failed = position + step
+                break
+            best = (position + step, fit)
+            step *= 2
+        if best is not None:
+            low, high = best[0] + 1, min(failed if failed is not None else last + 1, last + 1) - 1
+            while low <= high:
+                middle = (low + high) // 2
+                fit = arc(position, middle)
+                if fit is None:
+                    high = middle - 1
+                else:
+                    best = (middle, fit)
+                    low = middle + 1
+            position, (bulge, arc_deviation) = best[0], best[1]
+            bulges.append(bulge)
+            deviation = max(deviation, arc_deviation)
+        else:
+            segment = closed_points[ends[position]:ends[position + 1] + 1]
+            deviation = max(deviation, float(_segment_distances(segment, np.repeat(segment[:1], len(segment), 0),
+                                                                np.repeat(segment[-1:], len(segment), 0)).max()))
+            bulges.append(0.0)
+            position += 1
+    return np.array(vertices, dtype=np.int64), np.array(bulges), deviation
+
+
+def simplify_outlines(unwrap, bounds, tolerance, arcs=False):
+    """
+    Simplify the boundary loops of an unwrap before export.
+
+    Args:
+        unwrap: 2D coordinates of all vertices
+        bounds: List of boundary loops (vertex ids)
+        tolerance: Largest distance (in unwrap units, mm for the exports) of a boundary vertex to the simplified
+            outline
+        arcs: Also replace runs of segments by circular arcs (DXF bulges, SVG arc commands)
+
+    Returns:
+        tuple: (bounds, bulges, stats), the simplified loops as vertex ids of unwrap, the bulge of every segment of
+            each loop if arcs is set (else None), and stats {'tolerance', 'points_before', 'points_after',
+            'reduction_percent', 'max_deviation', 'arcs'}
+    """
+    if tolerance is None or tolerance < 0:
+        raise ValueError(f"The simplification tolerance must be a positive distance, got {tolerance}")
+    simplified, loop_bulges = [], [] if arcs else None
+    points_before = points_after = num_arcs = 0
+    deviation = 0.0
+    for bound in bounds:
+        bound = np.asarray(bound)
+        points = unwrap[bound].astype(np.float64)
+        kept = douglas_peucker(points, tolerance)
+        if arcs and len(kept) > MIN_LOOP_POINTS:
+            kept, bulges, loop_deviation = fit_arcs(points, kept, tolerance)
+            loop_bulges.append(bulges)
+            num_arcs += int(np.count_nonzero(bulges))
+        else:
+            loop_deviation = polyline_deviation(points, kept)
+            if arcs:
+                loop_bulges.append(np.zeros(len(kept)))
+        simplified.append(bound[kept])
+        deviation = max(deviation, loop_deviation)
+        points_before += len(bound)
+        points_after += len(kept)
+    stats = {
+        'tolerance': tolerance,
+        'points_before': points_before,
+        'points_after': points_after,
+        'reduction_percent': 100.0 * (1 - points_after / points_before) if points_before else 0.0,
+        'max_deviation': deviation,
+        'arcs': num_arcs,
+    }
+    return simplified, loop_bulges, stats
@@ -0,0 +1,212 @@
+from functools import cached_property
+
+import numpy as np
+
+
+class MeshTopology:
+    """
+    Topology and 3D geometry of a mesh, built once after loading and shared by the whole pipeline.
+
+    Every property is computed on first access and cached on the instance. Adjacencies are stored as CSR arrays
+    (indptr, indices): the neighbors of item i are indices[indptr[i]:indptr[i + 1]].
+
+    Args:
+        vertices: Mesh vertices array
+        faces: Mesh faces array
+    """
+
+    # Cached properties depending only on the faces, shared by with_vertices
+    CONNECTIVITY = ('_edge_index', 'edges', 'face_edges', 'edge_faces', 'vertex_faces', 'face_faces', 'boundary_edges',
+                    'boundary_loops', 'boundary_face_mask')
+
+    def __init__(self, vertices, faces):
+        self.vertices = vertices
+        self.faces = faces
+
+    def with_vertices(self, vertices, changed=None):
+        """
+        Topology of the same faces with moved vertices, sharing the connectivity computed so far.
+
+        Args:
+            vertices: New vertices array
+            changed: Ids of the moved vertices, face areas and normals are then only recomputed for their faces.
+                None recomputes every geometric property on first access
+
+        Returns:
+            MeshTopology
+        """
+        topology = MeshTopology(vertices, self.faces)
+        for name in self.CONNECTIVITY:
+            if name in self.__dict__:
+                topology.__dict__[name] = self.__dict__[name]
+        if changed is not None and '_face_geometry' in self.__dict__:
+            from .geometry import face_geometry
+
+            face_ids = self.faces_of_vertices(changed)
+            areas, normals = (array.copy() for array in self._face_geometry)
+            areas[face_ids], normals[face_ids] = face_geometry(vertices, self.faces[face_ids])
+            topology.__dict__['_face_geometry'] = areas, normals
+        return topology
+
+    @property
+    def num_vertices(self):
+        return len(self.vertices)
+
+    @property
+    def num_faces(self):
+        return len(self.faces)
+
+    @property
+    def index_dtype(self):
+        """dtype of the index arrays: int32 for int32 faces (low-memory mode), int64 otherwise."""
+        return np.dtype(np.int32) if self.faces.dtype == np.int32 else np.dtype(np.int64)
+
+    @cached_property
+    def _edge_index(self):
+        half_edges = self.faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+        low = half_edges.min(axis=1).astype(np.int64)
+        high = half_edges.max(axis=1).astype(np.int64)
+        keys, first, inverse, counts = np.unique(low * self.num_vertices + high, return_index=True,
+                                                 return_inverse=True, return_counts=True)
+        return half_edges, first, inverse.ravel().astype(self.index_dtype, copy=False), counts
+
+    @cached_property
+    def edges(self):
+        """Undirected edges (#E by 2), oriented as in the first face using them."""
+        half_edges, first, _, _ = self._edge_index
+        return np.ascontiguousarray(half_edges[first])
+
+    @cached_property
+    def face_edges(self):
+        """#F by 3 edge ids of each face, edge k goes from vertex k to vertex k + 1."""
+        return self._edge_index[2].reshape(-1, 3)
+
+    @cached_property
+    def edge_faces(self):
+        """CSR (indptr, indices) of the faces using each edge."""
+        order = np.argsort(self._edge_index[2], kind='stable')
+        indptr = np.concatenate([[0], np.cumsum(self._edge_index[3])])
+        return indptr, order // 3
+
+    @cached_property
+    def vertex_faces(self):
+        """CSR (indptr, indices) of the faces using each vertex."""
+        flat = self.faces.ravel()
+        order = np.argsort(flat, kind='stable')
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(flat, minlength=self.num_vertices))])
+        return indptr, order // 3
+
+    def faces_of_vertices(self, vertex_ids):
+        """Sorted ids of the faces using any of vertex_ids."""
+        indptr, indices = self.vertex_faces
+        vertex_ids = np.asarray(vertex_ids, dtype=np.int64)
+        counts = indptr[vertex_ids + 1] - indptr[vertex_ids]
+        starts = np.repeat(indptr[vertex_ids] - np.cumsum(counts) + counts, counts)
+        return np.unique(indices[starts + np.arange(counts.sum())])
+
+    @cached_property
+    def face_faces(self):
+        """CSR (indptr, indices) of the faces sharing an edge with each face."""
+        import scipy.sparse as sp
+
+        incidence = sp.csr_matrix((np.ones(3 * self.num_faces, dtype=np.int32), self.face_edges.ravel(),
+                                   np.arange(0, 3 * self.num_faces + 1, 3)),
+                                  shape=(self.num_faces, len(self.edges)))
+        adjacency = (incidence @ incidence.T).tocsr()
+        adjacency.setdiag(0)
+        adjacency.eliminate_zeros()
+        adjacency.sort_indices()
+        return adjacency.indptr.astype(self.index_dtype), adjacency.indices.astype(self.index_dtype)
+
+    def face_neighbors(self, face_id):
+        indptr, indices = self.face_faces
+        return indices[indptr[face_id]:indptr[face_id + 1]]
+
+    def vertex_neighbors(self, vertex_id):
+        """Ids of the vertices sharing an edge with vertex_id."""
+        neighbors = np.unique(self.faces[self.faces_of_vertices([vertex_id])])
+        return neighbors[neighbors != vertex_id]
+
+    @cached_property
+    def boundary_edges(self):
+        """Directed boundary edges (#E by 2), the edges used by a single face, oriented as in their face."""
+        half_edges, _, inverse, counts = self._edge_index
+        return half_edges[counts[inverse] == 1]
+
+    @cached_property
+    def boundary_loops(self):
+        """Boundary loops as int arrays of vertex ids, see igl_api.get_all_bounds."""
+        from .igl_api import bounds_from_edges
+        return bounds_from_edges(self.faces, self.boundary_edges)
+
+    @cached_property
+    def boundary_face_mask(self):
+        """Boolean mask of the faces having at least one vertex on a boundary loop."""
+        on_boundary = np.zeros(self.num_vertices, dtype=bool)
+        on_boundary[self.boundary_edges.ravel()] = True
+        return on_boundary[self.faces].any(axis=1)
+
+    @cached_property
+    def _face_geometry(self):
+        from .geometry import face_geometry
+        return face_geometry(self.vertices, self.faces)
+
+    @property
+    def face_areas(self):
+        """3D area of each face."""
+        return self._face_geometry[0]
+
+    @property
+    def face_normals(self):
+        """Unit normal of each face (zero for degenerate faces)."""
+        return self._face_geometry[1]
+
+    @cached_property
+    def edge_lengths(self):
+        """3D length of each edge of edges."""
+        return np.linalg.norm(self.vertices[self.edges[:, 1]] - self.vertices[self.edges[:, 0]], axis=1)
+
+    @cached_property
+    def lscm_solver(self):
+        """Factorized lscm.LSCMSolver of the mesh, None if the system cannot be factorized."""
+        from .lscm import LSCMSolver
+        try:
+            return LSCMSolver(self.vertices, self.faces)
+        except RuntimeError:
+            return None
+
+    @cached_property
+    def deformation_scorer(self):
+        """score.DeformationScorer of the mesh, reused by every optimization attempt."""
+        from .score import DeformationScorer
+        return DeformationScorer(self.vertices, self.faces, self)
+
+    @cached_property
+    def distortion_metrics(self):
+        """metrics.DistortionMetrics of the mesh, scoring optimization attempts on any objective."""
+        from .metrics import DistortionMetrics
+        return DistortionMetrics(self.vertices, self.faces, self)
+
+    def _array_sizes(self):
+        sizes = [('vertices', self.vertices.nbytes), ('faces', self.faces.nbytes)]
+        for name, value in self.__dict__.items():
+            if name in ('vertices', 'faces'):
+                continue
+            arrays = value if isinstance(value, (tuple, list)) else (value,)
+            size = sum(array.nbytes for array in arrays if isinstance(array, np.ndarray))
+            if size:
+                sizes.append((name.lstrip('_'), size))
+        return sizes
+
+    @property
+    def nbytes(self):
+        """Memory held by the mesh arrays and the properties computed so far (the LSCM factorization excluded)."""
+        return sum(size for _, size in self._array_sizes())
+
+    def memory_report(self):
+        """Summary line and one line per array with its size, largest first."""
+        sizes = sorted(self._array_sizes(), key=lambda item: -item[1])
+        lines = [f"Mesh topology memory: {self.nbytes / 2 ** 20:.1f} MiB "
+                 f"({self.num_vertices} vertices, {self.num_faces} faces)"]
+        lines += [f"  {name}: {size / 2 ** 20:.1f} MiB" for name, size in sizes]
+        return "\n".join(lines)
@@ -1,5 +1,6 @@
 import argparse
 import os
+import sys
 
 from flatten_surface import flatten_surface
 
@@ -14,9 +15,20 @@ Examples:
   python main.py --optimize                        # Interactive selection with optimization (50 attempts)
   python main.py --optimize --attempts 100         # Interactive selection with 100 optimization attempts
   python main.py input.stl --optimize              # Optimize specific file
+  python main.py input.stl --optimize --jobs 4     # Spread optimization attempts over 4 processes
+  python main.py input.stl --optimize --strategy local --max-seconds 60  # Graph descent with a time budget
+  python main.py input.stl --optimize --attempts 2000 --resume  # Checkpointed, continues a killed run
+  python main.py scan.stl --optimize --coarse-faces 20000  # Search a decimated proxy of a large scan
   python main.py input.stl --face-id 25            # Use specific face ID (no optimization)
+  python main.py input.stl --two-point             # Two pinned vertices, the unwrap scaled to the mesh
+  python main.py closed.stl --charts auto --jobs 4 # Split into charts by normals, flattened in parallel
   python main.py input.stl --no-display            # Skip visualization window
+  python main.py input.stl --no-display --dpi 50   # Headless, small PNG preview only
   python main.py input.stl --output-dxf custom.dxf # Custom DXF output path
+  python main.py scan.stl --simplify-tol 0.05 --fit-arcs  # Outlines within 0.05 mm, with arcs
+  python main.py batch panels/ --optimize          # Flatten every STL of a directory (see: main.py batch -h)
+  python main.py nest manifest.json --width 1500   # Pack the outlines of a batch run on a roll (see: main.py nest -h)
+  python main.py scan.stl --artifact scan.npz      # Also keep the result, re-exported by: main.py export scan.npz
 """
     )
     
@@ -41,6 +53,89 @@ Examples:
         help='Number of optimization attempts (default: 50, only used with --optimize)'
     )
     
+    parser.add_argument(
+        '--strategy',
+        choices=['random', 'local', 'anneal'],
+        default='random',
+        help='Candidate search: random brute force, local descent or simulated annealing over adjacent faces '
+             '(default: random)'
+    )
+    
+    parser.add_argument(
+        '--objective',
+        choices=['area', 'length', 'angle', 'max'],
+        default='area',
+        help='Distortion minimized by the optimization: RMS area change, edge length stretch, angle change, '
+             'or the largest of the three (default: area)'
+    )
+    
+    parser.add_argument(
+        '--coarse-faces',
+        type=int,
+        default=None,
+        metavar='N',
+        help='Run the search on a proxy decimated to about N faces, then only evaluate the faces closest to the '
+             'best proxy faces on the full mesh (for large meshes)'
+    )
+    
+    parser.add_argument(
+        '--charts',
+        metavar='auto|PATH',
+        help='Split the mesh into charts flattened in parallel: "auto" clusters face normals, or a face-group file '
+             '(one chart per face, or JSON {name: [face ids]}); exported with one layer per chart'
+    )
+    
+    parser.add_argument(
+        '--chart-angle',
+        type=float,
+        default=None,
+        metavar='DEG',
+        help='Largest normal deviation within an automatic chart (default: 60)'
+    )
+    
+    parser.add_argument(
+        '--patience',
+        type=int,
+        default=None,
+        metavar='N',
+        help='Stop the optimization after N attempts without improvement'
+    )
+    
+    parser.add_argument(
+        '--max-seconds',
+        type=float,
+        default=None,
+        metavar='S',
+        help='Wall-clock budget of the optimization, the best face found so far is used'
+    )
+    
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=None,
+        help='Seed of the optimization candidate selection, seeded runs are reproducible and cached'
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        metavar='DIR',
+        help='Directory of the result cache (default: $XDG_CACHE_HOME/flatten_surface)'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Neither read nor write the result cache'
+    )
+    
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Number of processes evaluating optimization attempts (default: 1, 0 uses all CPU cores)'
+    )
+    
     parser.add_argument(
         '--face-id', 
         type=int, 
@@ -49,6 +144,34 @@ Examples:
         help='Face ID to use for initial fixed points (default: 0, ignored if --optimize is used)'
     )
     
+    parser.add_argument(
+        '--two-point',
+        action='store_true',
+        help='Pin a vertex and the boundary vertex farthest from it instead of a face, and scale the unwrap to the '
+             'mesh dimensions in closed form (with --optimize, the first pinned vertex is searched)'
+    )
+    
+    parser.add_argument(
+        '--scale',
+        choices=['area', 'length', 'total'],
+        default='area',
+        help='With --two-point, scale the unwrap to minimize the RMS area change, the RMS edge stretch, or to keep '
+             'the total area (default: area)'
+    )
+    
+    parser.add_argument(
+        '--checkpoint',
+        metavar='PATH',
+        help='Save the optimization history and best face to PATH every few seconds and when it stops'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue the optimization saved by --checkpoint (default: same as STL with .checkpoint.json extension), '
+             'with its seed, skipping the attempts already done'
+    )
+    
     parser.add_argument(
         '--output-svg',
         metavar='PATH', 
@@ -61,16 +184,342 @@ Examples:
         help='Output path for DXF export (default: same as STL with .dxf extension)'
     )
     
+    parser.add_argument(
+        '--output-png',
+        metavar='PATH',
+        help='Output path of the PNG preview (default: same as STL with .png extension)'
+    )
+    
+    parser.add_argument(
+        '--no-png',
+        action='store_true',
+        help='Do not write the PNG preview'
+    )
+    
+    parser.add_argument(
+        '--dpi',
+        type=int,
+        default=100,
+        metavar='N',
+        help='Resolution of the PNG preview (default: 100)'
+    )
+    
+    parser.add_argument(
+        '--simplify-tol',
+        type=float,
+        default=None,
+        metavar='MM',
+        help='Simplify the SVG/DXF outlines, keeping every boundary vertex within MM of them (default: no simplification)'
+    )
+    
+    parser.add_argument(
+        '--fit-arcs',
+        action='store_true',
+        help='With --simplify-tol, also replace runs of segments by circular arcs (DXF bulges, SVG arcs)'
+    )
+    
+    parser.add_argument(
+        '--artifact',
+        metavar='PATH',
+        help='Also write the mesh, UVs, per-face metrics, boundary loops and optimization history to this binary '
+             'artifact (.npz), see: main.py export -h'
+    )
+    
+    parser.add_argument(
+        '--loader',
+        choices=['auto', 'native', 'trimesh'],
+        default='auto',
+        help='Mesh loader: native memory-mapped STL reader, trimesh, or auto (native for STL with trimesh fallback)'
+    )
+    
+    parser.add_argument(
+        '--merge-tol',
+        type=float,
+        default=None,
+        metavar='D',
+        help='Merge STL vertices closer than D (native loader, default: exact duplicates only)'
+    )
+    
+    parser.add_argument(
+        '--low-memory',
+        action='store_true',
+        help='Load float32 vertices and int32 faces and keep them up to the export, halves the memory of huge meshes'
+    )
+    
     parser.add_argument(
         '--no-display',
         action='store_true',
-        help='Skip showing the visualization window (still saves PNG file)'
+        help='Skip showing the visualization window (still saves the PNG preview)'
+    )
+    
+    parser.add_argument(
+        '--quiet',
+        action='store_true',
+        help='Only print errors'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        metavar='PATH',
+        help='Write the stage and per-candidate timings and memory samples as a Chrome trace (chrome://tracing, Perfetto)'
     )
     
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.fit_arcs and args.simplify_tol is None:
+        parser.error("--fit-arcs needs --simplify-tol")
+    if args.two_point and args.coarse_faces is not None:
+        parser.error("--coarse-faces searches pinned faces, it does not apply to --two-point")
+    return args
+
+
+def parse_batch_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="main.py batch",
+        description="Flatten many STL files in one process pool and write a JSON manifest",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python main.py batch panels/                          # Every STL of a directory, outputs next to the inputs
+  python main.py batch "orders/**/*.stl" --optimize     # Glob pattern (quoted), with optimization
+  python main.py batch panels/ --output-dir out/ --jobs 8 --manifest out/order.json
+"""
+    )
+    parser.add_argument('inputs', nargs='+', help='Directories, glob patterns or STL files')
+    parser.add_argument('--output-dir', metavar='DIR', help='Directory of the SVG/DXF outputs (default: next to each STL)')
+    parser.add_argument('--manifest', metavar='PATH',
+                        help='JSON manifest path (default: manifest.json in the output directory or current directory)')
+    parser.add_argument('--jobs', type=int, default=0, metavar='N', help='Number of worker processes (default: all CPU cores)')
+    parser.add_argument('--optimize', action='store_true', help='Enable optimization of initial fixed points')
+    parser.add_argument('--attempts', type=int, default=50, metavar='N', help='Number of optimization attempts (default: 50)')
+    parser.add_argument('--strategy', choices=['random', 'local', 'anneal'], default='random',
+                        help='Candidate search (default: random)')
+    parser.add_argument('--objective', choices=['area', 'length', 'angle', 'max'], default='area',
+                        help='Distortion minimized by the optimization (default: area)')
+    parser.add_argument('--coarse-faces', type=int, default=None, metavar='N',
+                        help='Search a proxy decimated to about N faces first')
+    parser.add_argument('--patience', type=int, default=None, metavar='N',
+                        help='Stop the optimization after N attempts without improvement')
+    parser.add_argument('--max-seconds', type=float, default=None, metavar='S',
+                        help='Wall-clock budget of the optimization of each file')
+    parser.add_argument('--face-id', type=int, default=0, metavar='ID',
+                        help='Face ID for initial fixed points (default: 0, ignored if --optimize is used)')
+    parser.add_argument('--two-point', action='store_true',
+                        help='Pin a vertex and the boundary vertex farthest from it, scaled to the mesh (see main.py -h)')
+    parser.add_argument('--scale', choices=['area', 'length', 'total'], default='area',
+                        help='Scale normalization of --two-point (default: area)')
+    parser.add_argument('--loader', choices=['auto', 'native', 'trimesh'], default='auto',
+                        help='Mesh loader (default: auto, native STL reader with trimesh fallback)')
+    parser.add_argument('--merge-tol', type=float, default=None, metavar='D',
+                        help='Merge STL vertices closer than D (native loader, default: exact duplicates only)')
+    parser.add_argument('--low-memory', action='store_true',
+                        help='float32 vertices and int32 faces, halves the memory of huge meshes')
+    parser.add_argument('--png', action='store_true', help='Also write a PNG preview of every file')
+    parser.add_argument('--dpi', type=int, default=100, metavar='N', help='Resolution of the PNG previews (default: 100)')
+    parser.add_argument('--simplify-tol', type=float, default=None, metavar='MM',
+                        help='Simplify the outlines, keeping every boundary vertex within MM of them')
+    parser.add_argument('--fit-arcs', action='store_true',
+                        help='With --simplify-tol, also replace runs of segments by circular arcs')
+    parser.add_argument('--artifact', action='store_true',
+                        help='Also write the result artifact of every file (.npz next to its SVG)')
+    args = parser.parse_args(argv)
+    if args.fit_arcs and args.simplify_tol is None:
+        parser.error("--fit-arcs needs --simplify-tol")
+    if args.two_point and args.coarse_faces is not None:
+        parser.error("--coarse-faces searches pinned faces, it does not apply to --two-point")
+    return args
+
+
+def batch_main(argv):
+    from flatten_surface.batch import run_batch
+
+    args = parse_batch_args(argv)
+    manifest = run_batch(
+        args.inputs,
+        output_dir=args.output_dir,
+        manifest_path=args.manifest,
+        workers=args.jobs,
+        face_id=args.face_id,
+        optimize=args.optimize,
+        max_attempts=args.attempts,
+        strategy=args.strategy,
+        objective=args.objective,
+        coarse_faces=args.coarse_faces,
+        patience=args.patience,
+        max_seconds=args.max_seconds,
+        loader=args.loader,
+        merge_tolerance=args.merge_tol,
+        low_memory=args.low_memory,
+        png=args.png,
+        png_dpi=args.dpi,
+        simplify_tolerance=args.simplify_tol,
+        fit_arcs=args.fit_arcs,
+        pins='two-point' if args.two_point else 'face',
+        scale=args.scale,
+        artifact=args.artifact
+    )
+    return 0 if manifest['summary']['failed'] == 0 else 1
+
+
+def parse_nest_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="main.py nest",
+        description="Pack flattened outlines onto a sheet of given width and write one combined SVG/DXF",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python main.py nest out/manifest.json --width 1500         # Every part of a batch run
+  python main.py nest parts/ --width 1400 --gap 5 --rotations 8 --output-dxf roll.dxf
+  python main.py nest a.dxf b.dxf b.dxf --width 600 --report nest.json
+"""
+    )
+    parser.add_argument('inputs', nargs='+',
+                        help='DXF files, result artifacts (.npz), directories of DXF files, glob patterns or batch '
+                             'manifests')
+    parser.add_argument('--width', type=float, required=True, metavar='MM', help='Sheet (roll) width')
+    parser.add_argument('--gap', type=float, default=2.0, metavar='MM',
+                        help='Distance between parts and to the sheet sides (default: 2)')
+    parser.add_argument('--rotations', type=int, default=4, metavar='N',
+                        help='Orientations tried per part, evenly spaced over a full turn (default: 4, 1 for none)')
+    parser.add_argument('--tolerance', type=float, default=0.1, metavar='MM',
+                        help='Simplification of the collision outlines (default: 0.1)')
+    parser.add_argument('--output-svg', default='nest.svg', metavar='PATH', help='Combined SVG (default: nest.svg)')
+    parser.add_argument('--output-dxf', default='nest.dxf', metavar='PATH', help='Combined DXF (default: nest.dxf)')
+    parser.add_argument('--report', metavar='PATH', help='Write the placements and statistics as JSON')
+    parser.add_argument('--quiet', action='store_true', help='Only print errors')
+    return parser.parse_args(argv)
+
+
+def nest_main(argv):
+    import json
+
+    from flatten_surface.nesting import export_nesting, load_parts, nest
+
+    args = parse_nest_args(argv)
+    parts = load_parts(args.inputs)
+    if not parts:
+        print("Error: no part to nest")
+        return 1
+    nesting = nest(parts, args.width, args.gap, args.rotations, args.tolerance, verbose=not args.quiet)
+    outputs = export_nesting(nesting, args.output_svg, args.output_dxf)
+    report = {key: value for key, value in nesting.items() if key not in ('loops', 'bulges', 'layers')}
+    report['outputs'] = outputs
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+    if not args.quiet:
+        print(f"Nested {len(nesting['placements'])}/{len(parts)} parts on {args.width:g} x {nesting['length']:.1f} mm, "
+              f"utilization {100 * nesting['utilization']:.1f}%, {nesting['seconds']:.2f}s "
+              f"({nesting['collision_tests']} collision tests)")
+    for name in nesting['unplaced']:
+        print(f"Error: {name} is wider than the sheet, not placed")
+    return 0 if not nesting['unplaced'] else 1
+
+
+def parse_export_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="main.py export",
+        description="Regenerate the SVG/DXF/PNG outputs of a flatten result from its artifact (--artifact), "
+                    "without the mesh file",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python main.py export scan.npz                              # scan.svg, scan.dxf and scan.png next to it
+  python main.py export scan.npz --scale-factor 1.02 --no-png # Outlines 2% larger (material shrinkage)
+  python main.py export scan.npz --simplify-tol 0.1 --fit-arcs --output-dxf cut.dxf
+  python main.py export scan.npz --info                       # Header and fields, nothing is written
+"""
+    )
+    parser.add_argument('artifact', help='Result artifact (.npz)')
+    parser.add_argument('--output-svg', metavar='PATH', help='SVG output (default: same as artifact with .svg extension)')
+    parser.add_argument('--output-dxf', metavar='PATH', help='DXF output (default: same as artifact with .dxf extension)')
+    parser.add_argument('--output-png', metavar='PATH', help='PNG preview (default: same as artifact with .png extension)')
+    parser.add_argument('--no-png', action='store_true', help='Do not write the PNG preview')
+    parser.add_argument('--dpi', type=int, default=100, metavar='N', help='Resolution of the PNG preview (default: 100)')
+    parser.add_argument('--scale-factor', type=float, default=1.0, metavar='F',
+                        help='Scale the unwrap by F before export (default: 1)')
+    parser.add_argument('--simplify-tol', type=float, default=None, metavar='MM',
+                        help='Simplify the outlines, keeping every boundary vertex within MM of them')
+    parser.add_argument('--fit-arcs', action='store_true',
+                        help='With --simplify-tol, also replace runs of segments by circular arcs')
+    parser.add_argument('--info', action='store_true', help='Print the header and fields of the artifact and exit')
+    args = parser.parse_args(argv)
+    if args.fit_arcs and args.simplify_tol is None:
+        parser.error("--fit-arcs needs --simplify-tol")
+    return args
+
+
+def export_main(argv):
+    import json
+
+    from flatten_surface.artifact import export_artifact, open_artifact
+
+    args = parse_export_args(argv)
+    try:
+        if args.info:
+            header = open_artifact(args.artifact).header
+            print(json.dumps(header, indent=2))
+            return 0
+        stem = os.path.splitext(args.artifact)[0]
+        outputs = export_artifact(args.artifact, args.output_svg or stem + ".svg", args.output_dxf or stem + ".dxf",
+                                  None if args.no_png else args.output_png or stem + ".png", args.scale_factor,
+                                  args.simplify_tol, args.fit_arcs, args.dpi)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    for kind in ('svg', 'dxf', 'png'):
+        if kind in outputs:
+            print(f"{kind.upper()} written to {outputs[kind]}")
+    return 0
+
+
+def parse_serve_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="main.py serve",
+        description="Keep meshes, topology and LSCM factorizations warm and answer flatten/score/export requests",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python main.py serve                    # JSON-lines requests on stdin, responses on stdout
+  python main.py serve --http 8765        # HTTP server on 127.0.0.1:8765
+
+Request: {"id": 1, "op": "flatten", "path": "part.stl", "face_id": 12, "svg": "part.svg"}
+"""
+    )
+    parser.add_argument('--http', type=int, nargs='?', const=8765, default=None, metavar='PORT',
+                        help='Serve HTTP on PORT (default: 8765) instead of stdin')
+    parser.add_argument('--host', default='127.0.0.1', help='HTTP address (default: 127.0.0.1)')
+    parser.add_argument('--max-meshes', type=int, default=8, metavar='N', help='Meshes kept loaded (default: 8)')
+    parser.add_argument('--threads', type=int, default=0, metavar='N',
+                        help='Requests handled at the same time on stdin (default: all CPU cores)')
+    parser.add_argument('--quiet', action='store_true', help='Do not log HTTP requests')
+    return parser.parse_args(argv)
+
+
+def serve_main(argv):
+    from flatten_surface.service import FlattenService, serve_http, serve_stdin
+
+    args = parse_serve_args(argv)
+    service = FlattenService(args.max_meshes)
+    service.warm_up()
+    if args.http is not None:
+        serve_http(service, args.host, args.http, verbose=not args.quiet)
+    else:
+        serve_stdin(service, args.threads)
+    return 0
+
+
+SUBCOMMANDS = {
+    'batch': batch_main,
+    'export': export_main,
+    'nest': nest_main,
+    'serve': serve_main,
+}
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        exit(SUBCOMMANDS[sys.argv[1]](sys.argv[2:]))
+
     args = parse_args()
     
     # Determine STL path
@@ -83,14 +532,18 @@ if __name__ == "__main__":
         # If no file specified, will trigger file dialog in flatten_surface
         stl_path = None
     
-    print(f"STL Surface Flattening Tool")
-    print(f"===========================")
-    if args.optimize:
-        print(f"Optimization: ENABLED ({args.attempts} attempts)")
-    else:
-        print(f"Optimization: disabled")
-        print(f"Using face ID: {args.face_id}")
-    print()
+    if not args.quiet:
+        print(f"STL Surface Flattening Tool")
+        print(f"===========================")
+        if args.optimize:
+            print(f"Optimization: ENABLED ({args.strategy} search, {args.objective} objective, {args.attempts} attempts, "
+                  f"{args.jobs} jobs{', two-point pins' if args.two_point else ''})")
+        elif args.two_point:
+            print(f"Optimization: none, two-point pins ({args.scale} scale)")
+        else:
+            print(f"Optimization: disabled")
+            print(f"Using face ID: {args.face_id}")
+        print()
     
     # Run the flattening process
     try:
@@ -98,20 +551,48 @@ if __name__ == "__main__":
             path_stl=stl_path,
             path_svg=args.output_svg,
             path_dxf=args.output_dxf,
+            path_png=args.output_png,
+            skip_png=args.no_png,
+            png_dpi=args.dpi,
+            checkpoint_path=args.checkpoint,
+            resume=args.resume,
             vertice_init_id=args.face_id,
             optimize_initial_points_flag=args.optimize,
             max_optimization_attempts=args.attempts,
-            skip_display=args.no_display
+            skip_display=args.no_display,
+            workers=args.jobs,
+            optimization_strategy=args.strategy,
+            patience=args.patience,
+            max_seconds=args.max_seconds,
+            seed=args.seed,
+            cache_dir=args.cache_dir,
+            use_cache=not args.no_cache,
+            loader=args.loader,
+            merge_tolerance=args.merge_tol,
+            verbose=not args.quiet,
+            objective=args.objective,
+            coarse_faces=args.coarse_faces,
+            charts=args.charts,
+            chart_angle=args.chart_angle,
+            profile_path=args.profile,
+            low_memory=args.low_memory,
+            simplify_tolerance=args.simplify_tol,
+            fit_arcs=args.fit_arcs,
+            pins='two-point' if args.two_point else 'face',
+            scale=args.scale,
+            path_artifact=args.artifact
         )
         
-        print("\nFlattening completed successfully!")
-        if args.optimize and results['optimization_results']:
-            opt = results['optimization_results']
-            print(f"Optimization Results:")
-            print(f"  - Default distortion: {opt['default_distortion']:.4f}")
-            print(f"  - Optimized distortion: {opt['best_distortion']:.4f}")
-            print(f"  - Improvement: {opt['improvement_percent']:.1f}%")
-            print(f"  - Best face ID: {opt['best_face_id']}")
+        if not args.quiet:
+            print("\nFlattening completed successfully!")
+            if args.optimize and results['optimization_results']:
+                opt = results['optimization_results']
+                print(f"Optimization Results:")
+                print(f"  - Default distortion: {opt['default_distortion']:.4f}")
+                print(f"  - Optimized distortion: {opt['best_distortion']:.4f}")
+                print(f"  - Improvement: {opt['improvement_percent']:.1f}%")
+                print(f"  - Best {'anchor vertex' if args.two_point else 'face ID'}: {opt['best_face_id']}")
+                print(f"  - Seed: {opt['seed']} (reproduce with --seed {opt['seed']})")
         
     except KeyboardInterrupt:
         print("\nOperation cancelled by user.")
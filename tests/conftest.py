@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATA = os.path.join(ROOT, 'data')
+
+
+def data_path(name):
+    return os.path.join(DATA, name)
+
+
+@pytest.fixture(scope='session')
+def _eighth_of_a_sphere():
+    from flatten_surface import load
+
+    return load(data_path('eighth_of_a_sphere.STL'))
+
+
+@pytest.fixture
+def sphere_mesh(_eighth_of_a_sphere):
+    """(vertices, faces) of data/eighth_of_a_sphere.STL, copies a test may modify."""
+    vertices, faces = _eighth_of_a_sphere
+    return vertices.copy(), faces.copy()
+
+
+@pytest.fixture
+def small_sphere():
+    """Synthetic eighth of a sphere of about 200 faces, non-developable."""
+    from benchmarks.meshes import sphere_patch
+
+    return sphere_patch(200)
@@ -0,0 +1,93 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from conftest import data_path
+from flatten_surface import export_artifact, flatten_surface as main, open_artifact
+from flatten_surface.artifact import ARTIFACT_VERSION, write_artifact
+
+
+@pytest.fixture
+def artifact_path(tmp_path):
+    path = str(tmp_path / 'result.npz')
+    result = main(data_path('eighth_of_a_sphere.STL'), str(tmp_path / 'out.svg'), str(tmp_path / 'out.dxf'),
+                  optimize_initial_points_flag=True, max_optimization_attempts=5, skip_display=True, skip_png=True,
+                  use_cache=False, verbose=False, seed=0, path_artifact=path)
+    return path, result
+
+
+def test_artifact_round_trips_the_result(artifact_path):
+    path, result = artifact_path
+    assert result['artifact'] == path
+    # Shared like the SVG and DXF outputs, not private to the writer as a temporary file
+    assert os.stat(path).st_mode & 0o777 == 0o644
+    artifact = open_artifact(path)
+    assert artifact.header['version'] == ARTIFACT_VERSION
+    assert artifact.header['info']['face_id_used'] == result['face_id_used']
+    np.testing.assert_array_equal(artifact['vertices'], result['vertices'])
+    np.testing.assert_array_equal(artifact['faces'], result['faces'])
+    np.testing.assert_array_equal(artifact['unwrap'], result['unwrap'])
+    bounds = result['topology'].boundary_loops
+    assert len(artifact.bounds) == len(bounds)
+    for loop, bound in zip(artifact.bounds, bounds):
+        np.testing.assert_array_equal(loop, bound)
+    metrics = artifact.face_metrics()
+    assert set(metrics) == set(result['distortion_metrics'])
+    np.testing.assert_allclose(metrics['area'], result['topology'].distortion_metrics.per_face(result['unwrap'])['area'])
+    history = artifact.optimization_results['optimization_history']
+    assert history == [(int(f), float(d)) for f, d in result['optimization_results']['optimization_history']]
+
+
+def test_fields_are_memory_mapped_on_demand(artifact_path):
+    path, result = artifact_path
+    artifact = open_artifact(path)
+    unwrap = artifact['unwrap']
+    assert isinstance(unwrap, np.memmap) and not unwrap.flags.writeable
+    assert set(artifact._fields) == {'unwrap'}
+    in_memory = open_artifact(path, mmap=False)['unwrap']
+    assert not isinstance(in_memory, np.memmap)
+    np.testing.assert_array_equal(unwrap, in_memory)
+    # Readable as a plain .npz too
+    with np.load(path) as data:
+        np.testing.assert_array_equal(data['unwrap'], unwrap)
+    with pytest.raises(KeyError):
+        artifact['face_unknown']
+
+
+def test_export_from_the_artifact_alone(artifact_path, tmp_path):
+    path, _ = artifact_path
+    outputs = export_artifact(path, str(tmp_path / 'again.svg'), str(tmp_path / 'again.dxf'))
+    with open(outputs['svg']) as f, open(tmp_path / 'out.svg') as expected:
+        assert f.read() == expected.read()
+    with open(outputs['dxf']) as f, open(tmp_path / 'out.dxf') as expected:
+        assert f.read() == expected.read()
+    assert outputs['simplification'] is None
+
+    scaled = export_artifact(path, path_svg=str(tmp_path / 'scaled.svg'), scale=2.0, simplify_tolerance=0.1)
+    assert scaled['simplification']['max_deviation'] <= 0.1
+    assert 'dxf' not in scaled
+
+
+def test_other_files_are_rejected(tmp_path):
+    other = tmp_path / 'other.npz'
+    np.savez(other, values=np.arange(3))
+    with pytest.raises(ValueError, match='not a'):
+        open_artifact(str(other))
+    text = tmp_path / 'text.npz'
+    text.write_text('not a zip')
+    with pytest.raises(ValueError, match='Unreadable'):
+        open_artifact(str(text))
+
+    # Artifacts of a newer version are refused
+    newer = str(tmp_path / 'newer.npz')
+    write_artifact(newer, np.zeros((3, 3)), np.array([[0, 1, 2]]), np.zeros((3, 2)), [np.arange(3)])
+    with np.load(newer) as data:
+        arrays = {name: data[name] for name in data.files}
+    header = json.loads(str(arrays['header']))
+    header['version'] = ARTIFACT_VERSION + 1
+    arrays['header'] = np.array(json.dumps(header))
+    np.savez(newer, **arrays)
+    with pytest.raises(ValueError, match='version'):
+        open_artifact(newer)
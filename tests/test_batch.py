@@ -0,0 +1,30 @@
+import json
+import os
+import shutil
+
+from conftest import data_path
+from flatten_surface.batch import run_batch
+
+
+def test_batch_writes_outputs_and_records_failures(tmp_path):
+    inputs = tmp_path / 'inputs'
+    inputs.mkdir()
+    shutil.copy(data_path('S_flat.STL'), inputs / 'S_flat.STL')
+    shutil.copy(data_path('test.STL'), inputs / 'test.STL')
+    (inputs / 'broken.stl').write_bytes(b'not an stl')
+    output_dir = tmp_path / 'out'
+
+    manifest = run_batch([str(inputs)], str(output_dir), workers=2, verbose=False)
+
+    with open(output_dir / 'manifest.json') as f:
+        assert json.load(f)['summary'] == manifest['summary']
+    assert manifest['summary']['files'] == 3
+    assert manifest['summary']['failed'] == 1
+    entries = {os.path.basename(entry['input']): entry for entry in manifest['files']}
+    assert entries['broken.stl']['status'] == 'error'
+    for name in ('S_flat.STL', 'test.STL'):
+        entry = entries[name]
+        assert entry['status'] == 'ok'
+        assert entry['distortion'] < 1e-6
+        assert os.path.getsize(entry['outputs']['svg']) > 0
+        assert os.path.getsize(entry['outputs']['dxf']) > 0
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from benchmarks import pipeline
+from benchmarks.meshes import SURFACES
+from flatten_surface import flatten
+
+
+@pytest.mark.parametrize('surface', sorted(SURFACES))
+def test_surfaces_have_about_the_requested_size(surface):
+    vertices, faces = SURFACES[surface](1000)
+    assert 0.9 * 1000 <= len(faces) <= 1.1 * 1000
+    assert faces.min() == 0 and faces.max() == len(vertices) - 1
+    corners = vertices[faces]
+    assert (np.linalg.norm(np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]), axis=1) > 0).all()
+
+
+@pytest.mark.parametrize('surface, developable', [('cylinder', True), ('developable_strip', True),
+                                                  ('sphere_patch', False), ('saddle', False)])
+def test_developable_surfaces_flatten_without_distortion(surface, developable):
+    vertices, faces = SURFACES[surface](1000)
+    distortion = flatten(vertices, faces, verbose=False)['distortion']
+    assert (distortion < 1e-6) == developable
+
+
+def test_run_case_times_every_stage(tmp_path):
+    case = pipeline.run_case('saddle', 1000, 2, str(tmp_path))
+    assert case['status'] == 'ok'
+    assert list(case['stages']) == ['load', 'get_all_bounds', 'init_unfold', 'unfold', 'unfold_warm',
+                                    'compute_deformation', 'optimize_initial_points', 'export_svg', 'export_dxf']
+    assert all(timing['seconds'] >= 0 and timing['peak_rss_mib'] > 0 for timing in case['stages'].values())
+
+
+def test_compare_reports_slower_stages():
+    def results(seconds):
+        return {'cases': [{'surface': 'saddle', 'faces': 1000, 'status': 'ok',
+                           'stages': {'load': {'seconds': seconds}, 'unfold': {'seconds': 1.0}}}]}
+
+    assert pipeline.compare(results(2.0), results(1.0), 0.25, 0.05) == [('saddle', 1000, 'load', 1.0, 2.0)]
+    assert pipeline.compare(results(1.2), results(1.0), 0.25, 0.05) == []
+    # Slowdowns below min_seconds are noise
+    assert pipeline.compare(results(0.02), results(0.01), 0.25, 0.05) == []
@@ -0,0 +1,72 @@
+import importlib
+import os
+
+import numpy as np
+
+from conftest import data_path
+from flatten_surface.cache import ResultCache, mesh_hash, params_key
+
+
+# The package exports main() as flatten_surface, which shadows the module
+pipeline = importlib.import_module('flatten_surface.flatten_surface')
+
+
+def test_result_round_trip_and_corrupted_entry(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    key = params_key('mesh', 'result', {'face_id': 3})
+    assert cache.get_result(key) is None
+    unwrap = np.random.default_rng(0).random((10, 2))
+    history = [(3, 1.5), (7, float('inf'))]
+    cache.put_result(key, 3, unwrap, np.arange(4.0), {'best_face_id': 3, 'optimization_history': history})
+    cached = cache.get_result(key)
+    assert cached['face_id_used'] == 3
+    np.testing.assert_array_equal(cached['unwrap'], unwrap)
+    assert cached['optimization_results']['optimization_history'] == history
+
+    with open(os.path.join(str(tmp_path), key + '.npz'), 'wb') as f:
+        f.write(b'truncated')
+    assert cache.get_result(key) is None
+
+
+def test_history_is_merged(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    key = params_key('mesh', 'history', {'objective': 'area'})
+    cache.put_history(key, [(1, 2.0), (2, 3.0)])
+    cache.put_history(key, [(2, 3.0), (5, 1.0)])
+    assert cache.get_history(key) == {1: 2.0, 2: 3.0, 5: 1.0}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    unwrap = np.zeros((1000, 2))
+    keys = [params_key('mesh', 'result', {'face_id': face_id}) for face_id in range(3)]
+    for face_id, key in enumerate(keys):
+        cache.put_result(key, face_id, unwrap, np.zeros(10))
+        os.utime(os.path.join(str(tmp_path), key + '.npz'), (face_id, face_id))
+    entry_size = os.path.getsize(os.path.join(str(tmp_path), keys[0] + '.npz'))
+    cache.max_bytes = 2 * entry_size
+    cache.evict()
+    assert cache.get_result(keys[0]) is None
+    assert cache.get_result(keys[1]) is not None and cache.get_result(keys[2]) is not None
+
+
+def test_mesh_hash_depends_on_content(sphere_mesh):
+    vertices, faces = sphere_mesh
+    key = mesh_hash(vertices, faces)
+    assert mesh_hash(vertices.copy(), faces.copy()) == key
+    vertices[0, 0] += 1e-9
+    assert mesh_hash(vertices, faces) != key
+
+
+def test_main_reuses_the_cached_result(tmp_path, monkeypatch):
+    options = dict(path_svg=str(tmp_path / 'out.svg'), path_dxf=str(tmp_path / 'out.dxf'), skip_display=True,
+                   skip_png=True, verbose=False, cache_dir=str(tmp_path / 'cache'), vertice_init_id=5)
+    first = pipeline.main(data_path('eighth_of_a_sphere.STL'), **options)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("flatten called on a cached result")
+
+    monkeypatch.setattr(pipeline, 'flatten', fail)
+    second = pipeline.main(data_path('eighth_of_a_sphere.STL'), **options)
+    np.testing.assert_array_equal(second['unwrap'], first['unwrap'])
+    assert second['face_id_used'] == 5
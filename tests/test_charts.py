@@ -0,0 +1,89 @@
+import json
+
+import numpy as np
+import pytest
+
+from benchmarks.meshes import _grid, write_stl
+from flatten_surface import MeshTopology, flatten_surface as main
+from flatten_surface import charts as charts_module
+from flatten_surface.artifact import open_artifact
+from flatten_surface.charts import flatten_charts, layout_charts, read_face_groups, segment_by_normals
+
+
+@pytest.fixture
+def folded_sheet():
+    """Flat 50 by 50 sheet folded at a right angle along s = 0.5, and the s parameter of each face centroid."""
+    s, t, faces = _grid(400)
+    vertices = np.stack([50 * np.minimum(s, 0.5), 50 * t, 50 * np.maximum(s - 0.5, 0)], axis=1)
+    return vertices, faces, s[faces].mean(axis=1)
+
+
+def test_segment_by_normals_splits_at_the_fold(folded_sheet):
+    vertices, faces, face_s = folded_sheet
+    side = face_s > 0.5
+    labels = segment_by_normals(MeshTopology(vertices, faces), max_angle=30)
+    assert labels.max() == 1
+    # One chart per side of the fold
+    assert len(np.unique(labels[side])) == len(np.unique(labels[~side])) == 1
+    assert labels[side][0] != labels[~side][0]
+
+
+def test_read_face_groups(tmp_path):
+    path = tmp_path / 'groups.json'
+    path.write_text(json.dumps({'b': [1, 3], 'a': [0, 2]}))
+    assert read_face_groups(str(path), 4).tolist() == [1, 0, 1, 0]
+    path = tmp_path / 'groups.txt'
+    path.write_text("7 7 3\n3")
+    assert read_face_groups(str(path), 4).tolist() == [1, 1, 0, 0]
+    with pytest.raises(ValueError):
+        read_face_groups(str(path), 5)
+    path = tmp_path / 'partial.json'
+    path.write_text(json.dumps({'a': [0, 1]}))
+    with pytest.raises(ValueError):
+        read_face_groups(str(path), 4)
+
+
+def test_layout_keeps_charts_apart_and_marks_failed_ones(folded_sheet):
+    vertices, faces, face_s = folded_sheet
+    # Four bands across the sheet, the last one failed
+    labels = np.minimum(face_s * 4, 3).astype(np.int64)
+    charts = flatten_charts(vertices, faces, labels, verbose=False)
+    charts[-1] = {'error': 'failed', 'face_ids': charts[-1]['face_ids'], 'vertex_ids': charts[-1]['vertex_ids']}
+    layout = layout_charts(vertices, faces, charts)
+
+    failed = labels == 3
+    assert (layout['faces'][failed] == -1).all() and np.isnan(layout['deformation'][failed]).all()
+    assert (layout['faces'][~failed] >= 0).all()
+    assert np.abs(layout['deformation'][~failed]).max() < 1e-6
+    assert layout['vertex_offsets'][-1] == -1
+    boxes = [(layout['unwrap'][layout['faces'][labels == chart]].reshape(-1, 2).min(axis=0),
+              layout['unwrap'][layout['faces'][labels == chart]].reshape(-1, 2).max(axis=0)) for chart in range(3)]
+    for first in range(3):
+        for second in range(first + 1, 3):
+            (low1, high1), (low2, high2) = boxes[first], boxes[second]
+            assert (high1 < low2).any() or (high2 < low1).any()
+
+
+def test_failed_charts_are_left_out_of_the_outputs(folded_sheet, tmp_path, monkeypatch):
+    vertices, faces, _ = folded_sheet
+    path_stl = str(tmp_path / 'folded.stl')
+    write_stl(path_stl, vertices, faces)
+    flatten_all = charts_module.flatten_charts
+
+    def fail_last_chart(*args, **kwargs):
+        results = flatten_all(*args, **kwargs)
+        results[-1] = {'error': 'failed', 'face_ids': results[-1]['face_ids'],
+                       'vertex_ids': results[-1]['vertex_ids']}
+        return results
+
+    monkeypatch.setattr(charts_module, 'flatten_charts', fail_last_chart)
+    result = main(path_stl, str(tmp_path / 'folded.svg'), str(tmp_path / 'folded.dxf'), skip_display=True,
+                  path_png=str(tmp_path / 'folded.png'), charts='auto', chart_angle=30, verbose=False,
+                  path_artifact=str(tmp_path / 'folded.npz'))
+
+    assert [('error' in chart) for chart in result['charts']] == [False, True]
+    artifact = open_artifact(str(tmp_path / 'folded.npz'))
+    assert artifact.header['num_faces'] == len(result['charts'][0]['face_ids'])
+    assert (np.asarray(artifact['faces']) >= 0).all()
+    assert np.isfinite(artifact['face_area']).all()
+    assert (tmp_path / 'folded.png').stat().st_size > 0
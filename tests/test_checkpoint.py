@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from flatten_surface import optimize_initial_points
+from flatten_surface.search import CandidateSearch
+
+
+def interrupt_after(monkeypatch, attempts):
+    """Make the search raise KeyboardInterrupt once attempts faces are recorded, as a Ctrl-C would."""
+    record = CandidateSearch._record
+
+    def interrupted(search, *args):
+        if len(search.history) == attempts:
+            raise KeyboardInterrupt
+        record(search, *args)
+
+    monkeypatch.setattr(CandidateSearch, '_record', interrupted)
+
+
+@pytest.mark.parametrize('strategy', ['random', 'anneal'])
+def test_resumed_run_equals_an_uninterrupted_one(sphere_mesh, tmp_path, monkeypatch, strategy):
+    vertices, faces = sphere_mesh
+    path = str(tmp_path / 'run.checkpoint.json')
+    options = dict(verbose=False, seed=3, strategy=strategy, checkpoint_path=path)
+    with monkeypatch.context() as patch:
+        interrupt_after(patch, 20)
+        with pytest.raises(KeyboardInterrupt):
+            optimize_initial_points(vertices, faces, 40, **options)
+    with open(path) as f:
+        assert len(json.load(f)['history']) == 20
+
+    resumed = optimize_initial_points(vertices, faces, 40, resume=True, **options)
+    expected = optimize_initial_points(vertices, faces, 40, verbose=False, seed=3, strategy=strategy)
+    # Every checkpointed face is replayed, the other 20 are evaluated
+    assert resumed['resumed_attempts'] == 20
+    assert resumed['reused_attempts'] == 20
+    assert resumed['optimization_history'] == expected['optimization_history']
+    assert resumed['best_face_id'] == expected['best_face_id']
+
+
+def test_mismatched_checkpoints_are_refused(small_sphere, sphere_mesh, tmp_path):
+    path = str(tmp_path / 'run.checkpoint.json')
+    optimize_initial_points(*small_sphere, 5, verbose=False, seed=3, checkpoint_path=path)
+    with pytest.raises(ValueError, match='seed'):
+        optimize_initial_points(*small_sphere, 5, verbose=False, seed=4, checkpoint_path=path, resume=True)
+    with pytest.raises(ValueError, match='objective'):
+        optimize_initial_points(*small_sphere, 5, verbose=False, objective='angle', checkpoint_path=path, resume=True)
+    with pytest.raises(ValueError, match='pins'):
+        optimize_initial_points(*small_sphere, 5, verbose=False, pins='two-point', checkpoint_path=path, resume=True)
+    with pytest.raises(ValueError, match='strategy'):
+        optimize_initial_points(*small_sphere, 5, verbose=False, strategy='anneal', checkpoint_path=path, resume=True)
+    # The anneal and local schedules depend on the number of attempts
+    with pytest.raises(ValueError, match='max_attempts'):
+        optimize_initial_points(*small_sphere, 10, verbose=False, checkpoint_path=path, resume=True)
+    with pytest.raises(ValueError, match='patience'):
+        optimize_initial_points(*small_sphere, 5, verbose=False, patience=3, checkpoint_path=path, resume=True)
+    with pytest.raises(ValueError, match='another mesh'):
+        optimize_initial_points(*sphere_mesh, 5, verbose=False, checkpoint_path=path, resume=True)
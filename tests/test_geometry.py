@@ -0,0 +1,41 @@
+import numpy as np
+
+from flatten_surface.geometry import boundary_edges, boundary_loops
+
+
+def _check_loops(loops, edges):
+    directed = {tuple(edge) for edge in edges.tolist()}
+    assert sum(len(loop) for loop in loops) == len(edges)
+    for loop in loops:
+        assert all((int(a), int(b)) in directed for a, b in zip(loop, np.roll(loop, -1)))
+
+
+def test_boundary_loops_of_a_patch_with_a_hole(small_sphere):
+    _, faces = small_sphere
+    # Remove the faces around the vertex in the middle of the 11 by 11 grid: an outer loop and the loop of the hole
+    center = 5 * 11 + 5
+    assert (faces == center).any(axis=1).sum() == 6
+    faces = faces[~(faces == center).any(axis=1)]
+    edges = boundary_edges(faces)
+    loops = boundary_loops(edges)
+    assert len(loops) == 2
+    assert sorted(len(loop) for loop in loops)[0] == 6
+    _check_loops(loops, edges)
+
+
+def test_boundary_loops_split_at_a_nonmanifold_vertex():
+    # Two triangles touching at vertex 0 only
+    faces = np.array([[0, 1, 2], [0, 3, 4]])
+    edges = boundary_edges(faces)
+    loops = boundary_loops(edges, faces)
+    assert sorted(sorted(loop.tolist()) for loop in loops) == [[0, 1, 2], [0, 3, 4]]
+    _check_loops(loops, edges)
+
+
+def test_boundary_loops_split_at_a_pinched_vertex_whatever_the_face_order():
+    # Two fans of two triangles touching at vertex 0 (a bow-tie), in an order where sorting the edges merges the loops
+    faces = np.array([[0, 1, 2], [0, 5, 6], [0, 2, 3], [0, 4, 5]])
+    edges = boundary_edges(faces)
+    loops = boundary_loops(edges, faces)
+    assert sorted(sorted(loop.tolist()) for loop in loops) == [[0, 1, 2, 3], [0, 4, 5, 6]]
+    _check_loops(loops, edges)
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from conftest import data_path
+from flatten_surface import MeshTopology, flatten, import_export, load
+from flatten_surface.import_export import export_outlines, merge_vertices, read_stl
+
+
+def _sorted_triangles(vertices, faces):
+    triangles = np.asarray(vertices, dtype=np.float64)[faces].reshape(len(faces), -1)
+    return triangles[np.lexsort(triangles.T[::-1])]
+
+
+@pytest.mark.parametrize('name', ['eighth_of_a_sphere.STL', 'S_flat.STL'])
+def test_native_loader_matches_trimesh(name):
+    vertices, faces = load(data_path(name), loader='native')
+    expected_vertices, expected_faces = load(data_path(name), loader='trimesh')
+    assert len(vertices) == len(expected_vertices)
+    np.testing.assert_array_equal(_sorted_triangles(vertices, faces),
+                                  _sorted_triangles(expected_vertices, expected_faces))
+
+
+def test_ascii_stl_matches_binary(tmp_path, small_sphere):
+    from benchmarks.meshes import write_stl
+
+    vertices, faces = small_sphere
+    vertices = vertices.astype(np.float32).astype(np.float64)
+    write_stl(str(tmp_path / 'binary.stl'), vertices, faces)
+    lines = ['solid test']
+    for triangle in vertices[faces]:
+        lines += ['facet normal 0 0 0', 'outer loop']
+        lines += [f'vertex {float(x)!r} {float(y)!r} {float(z)!r}' for x, y, z in triangle]
+        lines += ['endloop', 'endfacet']
+    (tmp_path / 'ascii.stl').write_text('\n'.join(lines + ['endsolid test']))
+    np.testing.assert_array_equal(read_stl(str(tmp_path / 'ascii.stl')), read_stl(str(tmp_path / 'binary.stl')))
+    ascii_vertices, ascii_faces = load(str(tmp_path / 'ascii.stl'), loader='native')
+    assert len(ascii_vertices) == len(vertices)
+    np.testing.assert_array_equal(ascii_vertices[ascii_faces], vertices[faces])
+
+
+def test_merge_tolerance_welds_close_corners():
+    triangles = np.array([[[0, 0, 0], [1, 0, 0], [0, 1, 0]],
+                          [[1, 0, 1e-7], [0, 1, 0], [1, 1, 0]]], dtype=np.float64)
+    assert len(merge_vertices(triangles)[0]) == 5
+    vertices, faces = merge_vertices(triangles, tolerance=1e-4)
+    assert len(vertices) == 4
+    assert faces.tolist() == [[0, 1, 2], [1, 2, 3]]
+
+
+def test_invalid_file_is_rejected_by_the_native_loader(tmp_path):
+    (tmp_path / 'bad.stl').write_bytes(b'\x00' * 100)
+    with pytest.raises(ValueError):
+        load(str(tmp_path / 'bad.stl'), loader='native')
+
+
+def _svg_paths(path_svg):
+    import xml.etree.ElementTree as ET
+
+    root = ET.parse(path_svg).getroot()
+    return root, root.findall('.//{http://www.w3.org/2000/svg}path')
+
+
+def _dxf_loops(path_dxf):
+    import ezdxf
+
+    return [(polyline, np.array([(vertex.dxf.location.x, vertex.dxf.location.y) for vertex in polyline.vertices]))
+            for polyline in ezdxf.readfile(path_dxf).modelspace().query('POLYLINE')]
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_exports_round_trip_the_outlines(tmp_path, sphere_mesh, dtype):
+    vertices, faces = sphere_mesh
+    unwrap = flatten(vertices, faces, verbose=False)['unwrap'].astype(dtype)
+    bounds = MeshTopology(vertices, faces).boundary_loops
+    paths = export_outlines(unwrap, bounds, str(tmp_path / 'out.svg'), str(tmp_path / 'out.dxf'))
+    origin = unwrap[np.concatenate(bounds)].min(axis=0)
+
+    loops = _dxf_loops(paths['dxf'])
+    assert len(loops) == len(bounds)
+    for (polyline, points), bound in zip(loops, bounds):
+        assert polyline.is_closed and polyline.dxf.layer.startswith('BOUNDARY_')
+        # Coordinates are written with enough digits to read back the exact values
+        np.testing.assert_array_equal(points.astype(dtype), unwrap[bound] - origin)
+
+    _, svg_paths = _svg_paths(paths['svg'])
+    assert len(svg_paths) == len(bounds)
+    for path, bound in zip(svg_paths, bounds):
+        commands = path.get('d').split()
+        assert len(commands) == len(bound) + 1 and commands[-1] == 'Z'
+        points = np.array([command.lstrip('ML').split(',') for command in commands[:-1]], dtype=np.float64)
+        # The same loop shifted by the margin
+        np.testing.assert_allclose(points - points[0], unwrap[bound] - unwrap[bound[0]],
+                                   atol=1e-9 if dtype == np.float64 else 1e-4)
+
+
+def test_exports_group_loops_by_layer(tmp_path):
+    unwrap = np.array([[0, 0], [1, 0], [1, 1], [3, 0], [4, 0], [4, 1], [6, 0], [7, 0], [7, 1]], dtype=np.float64)
+    bounds = [np.array([0, 1, 2]), np.array([3, 4, 5]), np.array([6, 7, 8])]
+    paths = export_outlines(unwrap, bounds, str(tmp_path / 'out.svg'), str(tmp_path / 'out.dxf'),
+                            layers=['chart_1', 'chart_2', 'chart_1'])
+    assert [polyline.dxf.layer for polyline, _ in _dxf_loops(paths['dxf'])] == ['chart_1', 'chart_2', 'chart_1']
+    root, _ = _svg_paths(paths['svg'])
+    groups = root.findall('{http://www.w3.org/2000/svg}g')
+    assert [(group.get('id'), len(group)) for group in groups] == [('chart_1', 2), ('chart_2', 1)]
+
+
+def test_long_loops_are_written_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(import_export, 'EXPORT_CHUNK', 7)
+    angles = np.linspace(0, 2 * np.pi, 40, endpoint=False)
+    unwrap = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+    paths = export_outlines(unwrap, [np.arange(len(angles))], str(tmp_path / 'out.svg'), str(tmp_path / 'out.dxf'))
+    np.testing.assert_array_equal(_dxf_loops(paths['dxf'])[0][1], unwrap - unwrap.min(axis=0))
+    assert len(_svg_paths(paths['svg'])[1][0].get('d').split()) == len(angles) + 1
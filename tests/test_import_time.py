@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+from benchmarks.import_time import measure
+from conftest import ROOT
+
+# Seconds the package may add to the import of numpy, its only eager dependency (about 50 ms measured)
+IMPORT_MARGIN = 0.25
+
+
+def numpy_import_seconds(repeat):
+    probe = "import time; start = time.perf_counter(); import numpy; print(time.perf_counter() - start)"
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    return min(float(subprocess.run([sys.executable, '-c', probe], env=env, cwd=ROOT, capture_output=True, text=True,
+                                    check=True).stdout) for _ in range(repeat))
+
+
+def test_import_does_not_load_heavy_dependencies():
+    seconds, modules = measure(3)
+    assert modules == []
+    # Relative to numpy on the same machine, so a slow CI runner does not fail it
+    assert seconds < numpy_import_seconds(3) + IMPORT_MARGIN
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from flatten_surface import IncrementalFlattener, MeshTopology, flatten, reflatten
+
+
+def bump(vertices, center, height=0.5, rings=2):
+    """Vertices with those around center raised along the normal of the sphere patch."""
+    edited = vertices.copy()
+    moved = np.argsort(np.linalg.norm(vertices - vertices[center], axis=1))[:1 + 6 * rings]
+    edited[moved] *= 1 + height / np.linalg.norm(vertices[center])
+    return edited, moved
+
+
+def test_warm_update_matches_a_full_flatten(sphere_mesh):
+    vertices, faces = sphere_mesh
+    flattener = IncrementalFlattener(flatten(vertices, faces, 10, verbose=False))
+    for center in (400, 600):
+        vertices, moved = bump(vertices, center)
+        result = flattener.update(vertices)
+        assert set(result['changed']) == set(moved)
+        expected = flatten(vertices, faces, 10, verbose=False)
+        np.testing.assert_allclose(result['unwrap'], expected['unwrap'], atol=1e-6)
+        assert abs(result['distortion'] - expected['distortion']) < 1e-6
+
+
+def test_edits_of_the_callers_array_in_place_are_found(sphere_mesh):
+    vertices, faces = sphere_mesh
+    flattener = IncrementalFlattener(flatten(vertices, faces, 10, verbose=False))
+    edited, moved = bump(vertices, 400)
+    # The topology of the result holds the caller's array
+    vertices[:] = edited
+    result = flattener.update(vertices)
+    assert set(result['changed']) == set(moved)
+    np.testing.assert_allclose(result['unwrap'], flatten(edited, faces, 10, verbose=False)['unwrap'], atol=1e-6)
+
+
+def test_local_update_only_moves_the_region(sphere_mesh):
+    vertices, faces = sphere_mesh
+    previous = flatten(vertices, faces, 10, verbose=False)
+    edited, moved = bump(vertices, 400)
+    result = reflatten(previous, changed=moved, positions=edited[moved], method='local', rings=2)
+    assert result['method'] == 'local'
+    topology = MeshTopology(vertices, faces)
+    region = moved
+    for _ in range(2):
+        region = np.unique(faces[topology.faces_of_vertices(region)])
+    unchanged = np.setdiff1d(np.arange(len(vertices)), region)
+    np.testing.assert_array_equal(result['unwrap'][unchanged], previous['unwrap'][unchanged])
+
+
+def test_two_point_results_are_rejected(small_sphere):
+    with pytest.raises(ValueError):
+        IncrementalFlattener(flatten(*small_sphere, verbose=False, pins='two-point'))
+    with pytest.raises(ValueError):
+        reflatten(flatten(*small_sphere, verbose=False), method='nearest', changed=[0], positions=[[0, 0, 0]])
@@ -0,0 +1,39 @@
+import numpy as np
+
+from conftest import data_path
+from flatten_surface import MeshTopology, flatten, load
+from flatten_surface.geometry import face_geometry
+
+
+def test_low_memory_load_dtypes():
+    vertices, faces = load(data_path('eighth_of_a_sphere.STL'), low_memory=True)
+    assert vertices.dtype == np.float32 and faces.dtype == np.int32
+    reference_vertices, reference_faces = load(data_path('eighth_of_a_sphere.STL'))
+    np.testing.assert_array_equal(faces, reference_faces)
+    np.testing.assert_allclose(vertices, reference_vertices, rtol=1e-6)
+
+
+def test_face_geometry_chunks_match_one_pass(sphere_mesh):
+    vertices, faces = sphere_mesh
+    areas, normals = face_geometry(vertices, faces)
+    chunked_areas, chunked_normals = face_geometry(vertices, faces, chunk_faces=100)
+    np.testing.assert_array_equal(areas, chunked_areas)
+    np.testing.assert_array_equal(normals, chunked_normals)
+    areas32, normals32 = face_geometry(vertices.astype(np.float32), faces)
+    assert areas32.dtype == normals32.dtype == np.float32
+    np.testing.assert_allclose(areas32, areas, rtol=1e-5)
+
+
+def test_low_memory_flatten_stays_float32_and_close_to_float64():
+    vertices, faces = load(data_path('eighth_of_a_sphere.STL'))
+    vertices32, faces32 = load(data_path('eighth_of_a_sphere.STL'), low_memory=True)
+    reference = flatten(vertices, faces, verbose=False)
+    result = flatten(vertices32, faces32, verbose=False)
+
+    assert result['unwrap'].dtype == np.float32
+    assert result['topology'].face_areas.dtype == np.float32
+    scale = np.abs(reference['unwrap']).max()
+    assert np.abs(result['unwrap'] - reference['unwrap']).max() < 1e-5 * scale
+    assert abs(result['distortion'] - reference['distortion']) < 1e-3
+    overall = MeshTopology(vertices, faces).distortion_metrics.overall(result['unwrap'].astype(np.float64))
+    np.testing.assert_allclose(overall['area'], reference['distortion'], atol=1e-3)
@@ -0,0 +1,16 @@
+import numpy as np
+import pytest
+
+from flatten_surface.igl_api import init_unfold
+from flatten_surface.lscm import LSCMSolver
+
+
+@pytest.mark.parametrize('face_id', [0, 57, 120])
+def test_solver_matches_igl_lscm_for_any_pinned_face(small_sphere, face_id):
+    import igl
+
+    vertices, faces = small_sphere
+    solver = LSCMSolver(vertices, faces)
+    init_points_ids, init_points_pos, _ = init_unfold(vertices, faces, face_id)
+    expected = igl.lscm(vertices, faces.astype(np.int64), init_points_ids, init_points_pos)[0]
+    np.testing.assert_allclose(solver.solve(init_points_ids, init_points_pos), expected, atol=1e-8)
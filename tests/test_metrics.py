@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from flatten_surface.metrics import DistortionMetrics
+
+
+@pytest.fixture
+def flat_mesh(small_sphere):
+    """A grid lying in the xy plane, its isometric unwrap being its x, y coordinates."""
+    vertices, faces = small_sphere
+    rng = np.random.default_rng(2)
+    vertices = np.column_stack([rng.random(2) + np.indices((11, 11)).reshape(2, -1).T * 3.0, np.zeros(121)])
+    return vertices, faces
+
+
+def test_isometric_unwrap_has_no_distortion(flat_mesh):
+    vertices, faces = flat_mesh
+    overall = DistortionMetrics(vertices, faces).overall(vertices[:, :2])
+    # The anisotropy goes through the square root of a difference of squares, exact to about 1e-8 only
+    assert overall == pytest.approx({'area': 0, 'length': 0, 'angle': 0, 'conformal': 0}, abs=1e-5)
+
+
+def test_uniform_scale_changes_area_and_length_only(flat_mesh):
+    vertices, faces = flat_mesh
+    per_face = DistortionMetrics(vertices, faces).per_face(1.5 * vertices[:, :2])
+    np.testing.assert_allclose(per_face['area'], 125.0)
+    np.testing.assert_allclose(per_face['length'], 50.0)
+    np.testing.assert_allclose(per_face['angle'], 0, atol=1e-9)
+    np.testing.assert_allclose(per_face['conformal'], 0, atol=1e-5)
+
+
+def test_stretch_along_one_axis_is_anisotropic(flat_mesh):
+    vertices, faces = flat_mesh
+    metrics = DistortionMetrics(vertices, faces)
+    per_face = metrics.per_face(vertices[:, :2] * [2.0, 1.0])
+    np.testing.assert_allclose(per_face['area'], 100.0)
+    np.testing.assert_allclose(per_face['conformal'], 100.0)
+    assert np.all(np.abs(per_face['angle']) > 1)
+    unwrap = vertices[:, :2] * [2.0, 1.0]
+    assert metrics.objective(unwrap, 'max') == max(metrics.overall(unwrap, ('area', 'length', 'angle')).values())
+
+
+def test_unknown_metric_or_objective_is_rejected(flat_mesh):
+    vertices, faces = flat_mesh
+    metrics = DistortionMetrics(vertices, faces)
+    with pytest.raises(ValueError):
+        metrics.per_face(vertices[:, :2], ('area', 'shear'))
+    with pytest.raises(ValueError):
+        metrics.objective(vertices[:, :2], 'conformal')
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from flatten_surface.import_export import export_dxf
+from flatten_surface.nesting import BoxTree, FLAT_QUERY, nest, polygon_area, read_dxf_part
+
+
+def rectangle(width, height):
+    return np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float64)
+
+
+def circle(radius, points=64):
+    angles = np.linspace(0, 2 * np.pi, points, endpoint=False)
+    return radius * np.stack([np.cos(angles), np.sin(angles)], axis=1)
+
+
+def outline_distance(a, b):
+    """Smallest distance between two closed outlines, from the vertices of each to the edges of the other."""
+    def vertex_distances(points, loop):
+        starts, ends = loop, np.roll(loop, -1, axis=0)
+        chord = ends - starts
+        t = np.clip(np.einsum('pij,ij->pi', points[:, None] - starts, chord) / np.einsum('ij,ij->i', chord, chord),
+                    0, 1)
+        return np.linalg.norm(starts + t[..., None] * chord - points[:, None], axis=2).min()
+
+    return min(vertex_distances(a, b), vertex_distances(b, a))
+
+
+def inside(point, loop):
+    starts, ends = loop, np.roll(loop, -1, axis=0)
+    straddle = (starts[:, 1] > point[1]) != (ends[:, 1] > point[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crossing = starts[:, 0] + (point[1] - starts[:, 1]) * (ends[:, 0] - starts[:, 0]) / (ends[:, 1] - starts[:, 1])
+    return np.count_nonzero(straddle & (point[0] < crossing)) % 2 == 1
+
+
+def test_box_tree_matches_a_brute_force_query():
+    rng = np.random.default_rng(0)
+    low = rng.uniform(0, 100, (3 * FLAT_QUERY, 2))
+    boxes = np.concatenate([low, low + rng.uniform(0, 5, low.shape)], axis=1)
+    tree = BoxTree(boxes[:FLAT_QUERY])
+    for box in boxes[FLAT_QUERY:]:
+        tree.insert(box)
+    assert len(tree) == len(boxes)
+    for query in boxes[:50] + [-2, -2, 2, 2]:
+        expected = np.flatnonzero((boxes[:, 0] <= query[2]) & (boxes[:, 2] >= query[0]) &
+                                  (boxes[:, 1] <= query[3]) & (boxes[:, 3] >= query[1]))
+        assert sorted(tree.query(query)) == expected.tolist()
+
+
+def test_nested_parts_keep_the_gap_and_stay_on_the_sheet():
+    ring = [circle(20), circle(10)[::-1]]
+    l_shape = np.array([[0, 0], [40, 0], [40, 10], [10, 10], [10, 30], [0, 30]], dtype=np.float64)
+    parts = ([{'name': f'ring_{i}', 'loops': ring} for i in range(2)] +
+             [{'name': f'L_{i}', 'loops': [l_shape]} for i in range(3)] +
+             [{'name': f'plate_{i}', 'loops': [rectangle(25, 15)]} for i in range(3)] +
+             [{'name': 'wide', 'loops': [rectangle(200, 150)]}])
+    gap = 2.0
+    nesting = nest(parts, 100, gap=gap, tolerance=0.05, resolution=0.1)
+
+    assert nesting['unplaced'] == ['wide']
+    assert len(nesting['placements']) == 8
+    expected_area = sum(abs(polygon_area(loop)) * (1 if i == 0 else -1) for i, loop in enumerate(ring)) * 2 + \
+        3 * abs(polygon_area(l_shape)) + 3 * 25 * 15
+    assert nesting['parts_area'] == pytest.approx(expected_area)
+    assert nesting['utilization'] == pytest.approx(expected_area / (100 * nesting['length']))
+
+    outlines = {}
+    for loop, layer in zip(nesting['loops'], nesting['layers']):
+        outlines.setdefault(layer, []).append(loop)
+        assert (loop >= gap - 1e-9).all() and (loop[:, 0] <= 100 - gap + 1e-9).all()
+        assert (loop[:, 1] <= nesting['length'] - gap + 1e-9).all()
+    # Rigid motions: the areas of the loops do not change
+    assert sorted(abs(polygon_area(loop)) for loop in nesting['loops']) == pytest.approx(
+        sorted(abs(polygon_area(loop)) for part in parts[:-1] for loop in part['loops']))
+    layers = list(outlines)
+    for i, first in enumerate(layers):
+        for second in layers[i + 1:]:
+            a, b = outlines[first][0], outlines[second][0]
+            assert outline_distance(a, b) >= gap - 1e-6
+            # Not inside the other part, holes included
+            assert not inside(a[0], b) and not inside(b[0], a)
+
+
+def test_dxf_parts_round_trip(tmp_path):
+    loop = rectangle(30, 10)
+    path = str(tmp_path / 'part.dxf')
+    export_dxf(loop, [np.arange(4)], path, bulges=[np.array([0, 0.5, 0, 0])])
+    part = read_dxf_part(path)
+    assert part['name'] == 'part'
+    np.testing.assert_array_equal(part['loops'][0], loop)
+    np.testing.assert_array_equal(part['bulges'][0], [0, 0.5, 0, 0])
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from flatten_surface import MeshTopology, optimize_initial_points
+
+
+def test_workers_do_not_change_the_search(small_sphere):
+    vertices, faces = small_sphere
+    serial = optimize_initial_points(vertices, faces, 24, verbose=False, workers=1, seed=3)
+    pooled = optimize_initial_points(vertices, faces, 24, verbose=False, workers=2, seed=3)
+    assert pooled['optimization_history'] == serial['optimization_history']
+    assert pooled['best_face_id'] == serial['best_face_id']
+    assert len(pooled['candidate_timings']) == 24
+    assert pooled['best_distortion'] == min(distortion for _, distortion in pooled['optimization_history'])
+
+
+@pytest.mark.parametrize('strategy', ['local', 'anneal'])
+def test_graph_strategies_walk_the_face_adjacency(sphere_mesh, strategy):
+    vertices, faces = sphere_mesh
+    topology = MeshTopology(vertices, faces)
+    attempts = 60
+    results = optimize_initial_points(vertices, faces, attempts, verbose=False, seed=5, strategy=strategy,
+                                      topology=topology)
+    history = [face_id for face_id, _ in results['optimization_history']]
+    assert len(history) <= attempts
+    # After the coarse seeds, every candidate is a neighbor of an evaluated face
+    num_seeds = attempts // 4
+    for index in range(num_seeds, len(history)):
+        assert np.isin(topology.face_neighbors(history[index]), history[:index]).any()
+    again = optimize_initial_points(vertices, faces, attempts, verbose=False, seed=5, strategy=strategy)
+    assert again['optimization_history'] == results['optimization_history']
+
+
+def test_unknown_strategy_is_rejected(small_sphere):
+    with pytest.raises(ValueError, match='strategy'):
+        optimize_initial_points(*small_sphere, 10, verbose=False, strategy='exhaustive')
+
+
+def test_coarse_search_refines_the_best_proxy_faces(sphere_mesh):
+    vertices, faces = sphere_mesh
+    results = optimize_initial_points(vertices, faces, 40, verbose=False, seed=1, coarse_faces=300)
+    coarse = results['coarse']
+    assert coarse['proxy_faces'] <= 300
+    assert coarse['proxy_attempts'] == 40
+    # Only the faces mapped from the best proxy faces are evaluated on the mesh
+    assert len(results['optimization_history']) == coarse['candidates'] < 40
+    assert results['best_distortion'] < results['default_distortion']
+
+
+def test_coarse_search_is_skipped_on_small_meshes(small_sphere):
+    results = optimize_initial_points(*small_sphere, 10, verbose=False, seed=1, coarse_faces=1000)
+    assert results['coarse'] is None
+    assert len(results['optimization_history']) == 10
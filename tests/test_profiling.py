@@ -0,0 +1,64 @@
+import builtins
+import json
+import subprocess
+import sys
+import time
+
+from conftest import ROOT, data_path
+from flatten_surface import flatten, flatten_surface as main
+from flatten_surface.profiling import Profiler, peak_rss
+
+
+def test_stages_accumulate():
+    profiler = Profiler()
+    for _ in range(2):
+        with profiler.stage('sleep'):
+            time.sleep(0.01)
+    stage = profiler.metrics()['stages']['sleep']
+    assert stage['calls'] == 2
+    assert stage['wall_seconds'] >= 0.02
+    assert stage['rss_mib'] > 0
+    assert len(profiler.metrics()['memory_samples']) == 2
+
+
+def test_flatten_records_stages_and_candidates(small_sphere):
+    result = flatten(*small_sphere, optimize=True, max_attempts=5, verbose=False, seed=0)
+    metrics = result['metrics']
+    assert {'optimize', 'unfold', 'score'} <= set(metrics['stages'])
+    history = result['optimization_results']['optimization_history']
+    assert sorted(candidate['face_id'] for candidate in metrics['candidates']) == \
+        sorted(face_id for face_id, _ in history)
+    assert all(0 <= candidate['start'] <= metrics['wall_seconds'] for candidate in metrics['candidates'])
+
+
+def test_main_writes_a_chrome_trace(tmp_path):
+    trace_path = tmp_path / 'trace.json'
+    result = main(data_path('S_flat.STL'), str(tmp_path / 'out.svg'), str(tmp_path / 'out.dxf'),
+                  optimize_initial_points_flag=True, max_optimization_attempts=3, skip_display=True, skip_png=True,
+                  use_cache=False, verbose=False, seed=0, profile_path=str(trace_path))
+    with open(trace_path) as f:
+        events = json.load(f)['traceEvents']
+    stages = {event['name'] for event in events if event.get('cat') == 'stage'}
+    assert set(result['metrics']['stages']) == stages
+    assert {'load', 'export'} <= stages
+    assert len([event for event in events if event.get('cat') == 'candidate']) == 3
+
+
+def test_package_imports_without_the_resource_module():
+    # As on Windows: no resource module and no /proc
+    code = "import sys; sys.modules['resource'] = None; import flatten_surface"
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+
+
+def test_peak_rss_without_proc_nor_resource(monkeypatch):
+    open_file = builtins.open
+
+    def no_proc(path, *args, **kwargs):
+        if str(path).startswith('/proc/'):
+            raise FileNotFoundError(path)
+        return open_file(path, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, 'open', no_proc)
+    assert peak_rss() > 0
+    monkeypatch.setitem(sys.modules, 'resource', None)
+    assert peak_rss() == 0
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from flatten_surface import flatten
+from flatten_surface.render import PANEL_SIZE, cluster_decimate, rasterize_faces, render_preview
+
+
+def test_cluster_decimate_bounds_the_face_count(sphere_mesh):
+    vertices, faces = sphere_mesh
+    proxy_vertices, proxy_faces = cluster_decimate(vertices, faces, 300)
+    assert 0 < len(proxy_faces) <= 300
+    assert proxy_faces.max() < len(proxy_vertices)
+    assert cluster_decimate(vertices, faces, len(faces))[1] is faces
+
+
+def test_rasterize_faces():
+    points = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=np.float64)
+    faces = np.array([[0, 1, 2], [0, 2, 3]])
+    image = rasterize_faces(points, faces, [1.0, 3.0], (4, 8), (0, 2, 0, 1))
+    rows, columns = np.meshgrid(np.arange(4), np.arange(4), indexing='ij')
+    # Pixel centers under the diagonal are in the first face, above it in the second, off the square outside
+    assert (image[:4, :4][columns > rows] == 1).all()
+    assert (image[:4, :4][columns < rows] == 3).all()
+    assert np.isnan(image[:, 4:]).all()
+
+
+@pytest.mark.parametrize('max_faces', [100000, 300])
+def test_render_preview_writes_every_panel(sphere_mesh, tmp_path, max_faces):
+    from matplotlib.image import imread
+
+    vertices, faces = sphere_mesh
+    result = flatten(vertices, faces, optimize=True, max_attempts=3, verbose=False, seed=0)
+    path = str(tmp_path / 'preview.png')
+    assert render_preview(path, vertices, faces, result['unwrap'], result['deformation'],
+                          result['optimization_results'], result['topology'].boundary_loops, dpi=50,
+                          max_faces=max_faces) == path
+    assert imread(path).shape[:2] == (PANEL_SIZE[1] * 50, 3 * PANEL_SIZE[0] * 50)
+
+    render_preview(path, vertices, faces, dpi=50)
+    assert imread(path).shape[:2] == (PANEL_SIZE[1] * 50, PANEL_SIZE[0] * 50)
+    with pytest.raises(ValueError):
+        render_preview(path, vertices, faces, panels=['mesh', 'texture'])
@@ -0,0 +1,37 @@
+import logging
+
+import numpy as np
+
+from flatten_surface import compute_deformation, compute_overall_distortion
+from flatten_surface.score import DeformationScorer
+
+
+def _reference_deformation(vertices, faces, unwrap):
+    edges_3d = vertices[faces[:, [1, 2]]] - vertices[faces[:, [0, 0]]]
+    edges_2d = unwrap[faces[:, [1, 2]]] - unwrap[faces[:, [0, 0]]]
+    areas_3d = np.linalg.norm(np.cross(edges_3d[:, 0], edges_3d[:, 1]), axis=1)
+    areas_2d = np.abs(edges_2d[:, 0, 0] * edges_2d[:, 1, 1] - edges_2d[:, 0, 1] * edges_2d[:, 1, 0])
+    return (areas_2d - areas_3d) / areas_3d * 100
+
+
+def test_scorer_matches_the_direct_computation(small_sphere):
+    vertices, faces = small_sphere
+    scorer = DeformationScorer(vertices, faces)
+    rng = np.random.default_rng(1)
+    unwraps = [vertices[:, :2] + rng.normal(scale=0.1, size=(len(vertices), 2)) for _ in range(3)]
+    for unwrap in unwraps:
+        expected = _reference_deformation(vertices, faces, unwrap)
+        np.testing.assert_allclose(scorer.deformation(unwrap), expected, rtol=1e-9)
+        # The buffers reused across calls do not leak the previous unwrap
+        assert np.isclose(scorer.distortion(unwrap), compute_overall_distortion(expected), rtol=1e-9)
+
+
+def test_area_summary_only_goes_to_the_logger(small_sphere, capsys, caplog):
+    vertices, faces = small_sphere
+    unwrap = vertices[:, :2]
+    compute_deformation(vertices, faces, unwrap)
+    assert capsys.readouterr().out == ''
+    logger = logging.getLogger('flatten_surface.test')
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        compute_deformation(vertices, faces, unwrap, logger=logger)
+    assert any(record.getMessage().startswith('3D Area') for record in caplog.records)
@@ -0,0 +1,65 @@
+import io
+import json
+import shutil
+
+import numpy as np
+
+from conftest import data_path
+from flatten_surface import flatten, load
+from flatten_surface.service import FlattenService, serve_stdin
+
+
+def test_requests_reuse_the_loaded_mesh(tmp_path):
+    service = FlattenService()
+    path = data_path('eighth_of_a_sphere.STL')
+    flattened = service.handle({'op': 'flatten', 'id': 1, 'path': path, 'face_id': 5,
+                                'svg': str(tmp_path / 'out.svg')})
+    assert flattened['ok'] and flattened['id'] == 1
+    assert flattened['result']['face_id_used'] == 5
+    assert (tmp_path / 'out.svg').stat().st_size > 0
+    vertices, faces = load(path)
+    assert abs(flattened['result']['distortion'] - flatten(vertices, faces, 5, verbose=False)['distortion']) < 1e-9
+
+    # The same content under another path is the same mesh, its unwrap from face 5 is kept
+    copy = tmp_path / 'copy.STL'
+    shutil.copy(path, copy)
+    scored = service.handle({'op': 'score', 'path': str(copy), 'face_id': 5})
+    assert scored['result']['distortion'] == flattened['result']['distortion']
+    stats = service.handle({'op': 'stats'})['result']
+    assert (stats['hits'], stats['misses']) == (1, 1)
+    assert stats['meshes'][0]['solver'] and stats['meshes'][0]['unwraps'] == [5]
+
+
+def test_failed_requests_are_reported(tmp_path):
+    service = FlattenService()
+    assert not service.handle({'op': 'unknown'})['ok']
+    assert not service.handle({'op': 'flatten'})['ok']
+    response = service.handle({'op': 'score', 'path': data_path('S_flat.STL'), 'unwrap': [[0, 0]]})
+    assert not response['ok'] and 'unwrap must be' in response['error']
+    assert not service.handle({'op': 'load', 'path': data_path('missing.STL')})['ok']
+    # A file failing to load is not kept
+    broken = tmp_path / 'broken.stl'
+    broken.write_bytes(b'not an stl')
+    assert not service.handle({'op': 'load', 'path': str(broken)})['ok']
+    assert [mesh['faces'] for mesh in service.handle({'op': 'stats'})['result']['meshes']] == \
+        [len(load(data_path('S_flat.STL'))[1])]
+
+
+def test_lru_eviction(tmp_path):
+    service = FlattenService(max_meshes=1)
+    for name in ('S_flat.STL', 'test.STL'):
+        assert service.handle({'op': 'load', 'path': data_path(name)})['ok']
+    meshes = service.handle({'op': 'stats'})['result']['meshes']
+    assert len(meshes) == 1 and meshes[0]['faces'] == len(load(data_path('test.STL'))[1])
+    assert service.handle({'op': 'evict'})['result'] == {'evicted': 1}
+
+
+def test_serve_stdin_answers_each_line():
+    lines = [json.dumps({'op': 'load', 'id': 'a', 'path': data_path('S_flat.STL')}), 'not json',
+             json.dumps({'op': 'score', 'id': 'b', 'path': data_path('S_flat.STL'), 'face_id': 0})]
+    stdout = io.StringIO()
+    serve_stdin(FlattenService(), threads=2, stdin=io.StringIO("\n".join(lines) + "\n"), stdout=stdout)
+    responses = {response['id']: response for response in map(json.loads, stdout.getvalue().splitlines())}
+    assert set(responses) == {'a', 'b', None}
+    assert responses['a']['ok'] and not responses[None]['ok']
+    assert np.isclose(responses['b']['result']['distortion'], 0, atol=1e-6)
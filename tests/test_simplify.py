@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from flatten_surface import simplify_outlines
+from flatten_surface.import_export import export_outlines
+
+
+def loop_distances(points, outline):
+    """Distance of each point to the closed polygon through outline."""
+    starts, ends = outline, np.roll(outline, -1, axis=0)
+    chord = ends - starts
+    t = np.clip(np.einsum('pij,ij->pi', points[:, None] - starts, chord) / np.einsum('ij,ij->i', chord, chord), 0, 1)
+    return np.linalg.norm(starts + t[..., None] * chord - points[:, None], axis=2).min(axis=1)
+
+
+@pytest.fixture
+def noisy_circle():
+    rng = np.random.default_rng(0)
+    angles = np.sort(rng.uniform(0, 2 * np.pi, 500))
+    radii = 50 + rng.normal(0, 0.01, len(angles))
+    return np.stack([radii * np.cos(angles), radii * np.sin(angles)], axis=1)
+
+
+@pytest.mark.parametrize('tolerance', [0.05, 0.5])
+def test_polylines_stay_within_tolerance(noisy_circle, tolerance):
+    bound = np.arange(len(noisy_circle))
+    bounds, bulges, stats = simplify_outlines(noisy_circle, [bound], tolerance)
+    assert bulges is None
+    assert bounds[0][0] == 0 and (np.diff(bounds[0]) > 0).all()
+    assert stats['points_before'] == 500 and stats['points_after'] == len(bounds[0]) < 150
+    deviation = loop_distances(noisy_circle, noisy_circle[bounds[0]]).max()
+    assert deviation <= tolerance
+    assert stats['max_deviation'] == pytest.approx(deviation)
+
+
+def test_square_keeps_its_corners():
+    side = np.linspace(0, 10, 50, endpoint=False)
+    zeros, tens = np.zeros_like(side), np.full_like(side, 10)
+    points = np.concatenate([np.stack(pair, axis=1) for pair in
+                             ((side, zeros), (tens, side), (10 - side, tens), (zeros, 10 - side))])
+    bounds, _, stats = simplify_outlines(points, [np.arange(len(points))], 1e-9)
+    assert bounds[0].tolist() == [0, 50, 100, 150]
+    assert stats['max_deviation'] < 1e-9
+
+
+def test_arcs_follow_the_circle(tmp_path, noisy_circle):
+    import ezdxf
+
+    bounds, bulges, stats = simplify_outlines(noisy_circle, [np.arange(len(noisy_circle))], 0.05, arcs=True)
+    assert stats['arcs'] > 0 and stats['max_deviation'] <= 0.05
+    assert stats['points_after'] < simplify_outlines(noisy_circle, [np.arange(len(noisy_circle))], 0.05)[2][
+        'points_after']
+    # Radius of each arc from its chord and bulge
+    outline = noisy_circle[bounds[0]]
+    chords = np.linalg.norm(np.roll(outline, -1, axis=0) - outline, axis=1)
+    arcs = bulges[0] != 0
+    radii = chords[arcs] / (2 * np.sin(2 * np.arctan(np.abs(bulges[0][arcs]))))
+    np.testing.assert_allclose(radii, 50, atol=0.1)
+
+    path = export_outlines(noisy_circle, bounds, path_dxf=str(tmp_path / 'out.dxf'), bulges=bulges)['dxf']
+    polyline = next(iter(ezdxf.readfile(path).modelspace().query('POLYLINE')))
+    np.testing.assert_array_equal([vertex.dxf.bulge for vertex in polyline.vertices], bulges[0])
+
+
+def test_invalid_tolerance_is_rejected(noisy_circle):
+    with pytest.raises(ValueError):
+        simplify_outlines(noisy_circle, [np.arange(len(noisy_circle))], -1)
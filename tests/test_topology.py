@@ -0,0 +1,39 @@
+import numpy as np
+
+from flatten_surface import MeshTopology
+from flatten_surface.geometry import face_geometry
+
+
+def test_face_adjacency_matches_shared_edges(small_sphere):
+    vertices, faces = small_sphere
+    topology = MeshTopology(vertices, faces)
+    edge_faces = {}
+    for face_id, face in enumerate(faces.tolist()):
+        for a, b in zip(face, face[1:] + face[:1]):
+            edge_faces.setdefault((min(a, b), max(a, b)), []).append(face_id)
+    for face_id in range(len(faces)):
+        expected = sorted({other for a, b in zip(faces[face_id], np.roll(faces[face_id], -1))
+                           for other in edge_faces[(min(a, b), max(a, b))] if other != face_id})
+        assert topology.face_neighbors(face_id).tolist() == expected
+
+
+def test_faces_of_vertices(small_sphere):
+    vertices, faces = small_sphere
+    topology = MeshTopology(vertices, faces)
+    vertex_ids = [0, 17, 60]
+    expected = np.flatnonzero(np.isin(faces, vertex_ids).any(axis=1))
+    assert topology.faces_of_vertices(vertex_ids).tolist() == expected.tolist()
+
+
+def test_with_vertices_shares_connectivity_and_updates_geometry(small_sphere):
+    vertices, faces = small_sphere
+    topology = MeshTopology(vertices, faces)
+    neighbors = topology.face_faces
+    areas = topology.face_areas.copy()
+    moved = vertices.copy()
+    moved[60] += [1.0, 2.0, 0.5]
+    updated = topology.with_vertices(moved, [60])
+    assert updated.face_faces is neighbors
+    np.testing.assert_allclose(updated.face_areas, face_geometry(moved, faces)[0])
+    # The original topology keeps its geometry
+    np.testing.assert_array_equal(topology.face_areas, areas)
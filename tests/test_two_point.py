@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from benchmarks.meshes import developable_strip
+from flatten_surface import MeshTopology, flatten, optimize_initial_points
+from flatten_surface.igl_api import init_two_point_unfold, normalize_scale, two_point_candidates, unfold
+
+
+def test_pins_pair_the_anchor_with_the_farthest_boundary_vertex(small_sphere):
+    vertices, faces = small_sphere
+    candidates = two_point_candidates(vertices, faces)
+    assert set(candidates) == set(np.concatenate(MeshTopology(vertices, faces).boundary_loops))
+    anchor = int(candidates[3])
+    ids, positions, _ = init_two_point_unfold(vertices, faces, anchor=anchor)
+    distances = np.linalg.norm(vertices[candidates] - vertices[anchor], axis=1)
+    assert ids.tolist() == [anchor, candidates[np.argmax(distances)]]
+    assert np.linalg.norm(positions[1] - positions[0]) == pytest.approx(distances.max())
+
+
+def test_pin_positions_do_not_change_the_scaled_unwrap(sphere_mesh):
+    vertices, faces = sphere_mesh
+    topology = MeshTopology(vertices, faces)
+    ids, positions, _ = init_two_point_unfold(vertices, faces, topology)
+    reference = topology.distortion_metrics.overall(
+        normalize_scale(vertices, faces, unfold(vertices, faces, ids, positions, topology=topology), 'area',
+                        topology)[0])
+    # Any other placement of the same two pins is a similarity of the unwrap
+    other = unfold(vertices, faces, ids, np.array([[3.0, -7.0], [-40.0, 12.0]]), topology=topology)
+    scaled = topology.distortion_metrics.overall(normalize_scale(vertices, faces, other, 'area', topology)[0])
+    for name, value in reference.items():
+        assert scaled[name] == pytest.approx(value, abs=1e-8)
+
+
+@pytest.mark.parametrize('scale', ['area', 'length'])
+def test_best_fit_scale_minimizes_its_measure(sphere_mesh, scale):
+    vertices, faces = sphere_mesh
+    result = flatten(vertices, faces, verbose=False, pins='two-point', scale=scale)
+    metrics = result['topology'].distortion_metrics
+    assert metrics.best_fit_scale(result['unwrap'], scale) == pytest.approx(1)
+    if scale == 'area':
+        best = metrics.overall(result['unwrap'], ('area',))['area']
+        for factor in (0.99, 1.01):
+            assert metrics.overall(result['unwrap'] * factor, ('area',))['area'] > best
+
+
+def test_developable_mesh_gets_its_real_dimensions():
+    vertices, faces = developable_strip(1000)
+    result = flatten(vertices, faces, verbose=False, pins='two-point')
+    assert result['face_id_used'] is None and result['scale_factor'] is not None
+    assert result['distortion'] < 1e-6
+    assert max(result['distortion_metrics'].values()) < 1e-4
+
+
+def test_anchor_search_improves_on_the_default_pins(sphere_mesh):
+    vertices, faces = sphere_mesh
+    default = flatten(vertices, faces, verbose=False, pins='two-point')
+    searched = flatten(vertices, faces, optimize=True, max_attempts=30, verbose=False, pins='two-point', seed=0)
+    optimization = searched['optimization_results']
+    assert optimization['pins'] == 'two-point'
+    assert optimization['default_distortion'] == pytest.approx(default['distortion'])
+    assert searched['distortion'] == pytest.approx(optimization['best_distortion'])
+    assert searched['distortion'] <= default['distortion']
+    assert searched['init_points_ids'][0] == optimization['best_face_id']
+
+
+def test_two_point_search_options(small_sphere):
+    topology = MeshTopology(*small_sphere)
+    with pytest.raises(ValueError):
+        optimize_initial_points(*small_sphere, 5, verbose=False, pins='two-point', coarse_faces=50)
+    # Graph strategies walk the vertex adjacency between anchors
+    results = optimize_initial_points(*small_sphere, 12, verbose=False, pins='two-point', strategy='local', seed=0,
+                                      topology=topology)
+    assert len(results['optimization_history']) == 12
+    edges = {tuple(sorted(edge)) for face in small_sphere[1] for edge in zip(face, np.roll(face, -1))}
+    for vertex_id in (0, 60):
+        assert set(topology.vertex_neighbors(vertex_id)) == \
+            {b if a == vertex_id else a for a, b in edges if vertex_id in (a, b)}